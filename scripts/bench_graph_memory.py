@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from money_map.core.compact_graph import build_compact_graph
+from money_map.core.graph_model import build_base_graph
+from money_map.core.load import load_app_data
+from money_map.core.model import AppData
+
+
+def synthesize_variants(data: AppData, count: int) -> AppData:
+    base = data.variants
+    variants = [
+        base[idx % len(base)].model_copy(update={"id": f"{base[idx % len(base)].id}.synthetic_{idx}"})
+        for idx in range(count)
+    ]
+    return data.model_copy(update={"variants": variants})
+
+
+def measure(label: str, build: Callable[[], object]) -> tuple[object, int, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<14} retained={current / 1_048_576:8.1f} MiB "
+        f"peak={peak / 1_048_576:8.1f} MiB build={elapsed:6.2f} s"
+    )
+    return result, current, peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение памяти GraphModel и CompactGraphModel.")
+    parser.add_argument("--variants", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = synthesize_variants(load_app_data(), args.variants)
+    print(f"Вариантов: {len(data.variants)}")
+
+    model, model_bytes, _, _ = measure("GraphModel", lambda: build_base_graph(data))
+    print(f"  узлов={len(model.nodes)} рёбер={len(model.edges)}")
+    del model
+    compact, compact_bytes, _, _ = measure("CompactGraph", lambda: build_compact_graph(data))
+    print(f"  узлов={compact.node_count} рёбер={compact.edge_count}")
+    print(f"Экономия памяти: x{model_bytes / max(compact_bytes, 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from money_map.core.graph_model import GraphEdge, GraphModel, GraphNode, extract_neighborhood
+
+
+def synthetic_graph(edge_target: int, seed: int = 7) -> GraphModel:
+    rng = random.Random(seed)
+    model = GraphModel.empty()
+    cells = [f"cell:C{idx}" for idx in range(8)]
+    ways = [f"way:W{idx}" for idx in range(14)]
+    bridges = [f"bridge:B{idx}" for idx in range(40)]
+    for node_id in cells + ways + bridges:
+        model.add_node(GraphNode(id=node_id, label=node_id, type=node_id.split(":", 1)[0]))
+    for source in cells:
+        for target in rng.sample(cells, 3):
+            if source != target:
+                model.add_edge(
+                    GraphEdge(
+                        id=f"transition:{source}->{target}",
+                        source=source,
+                        target=target,
+                        label="transition",
+                        type="transition",
+                    )
+                )
+    for bridge in bridges:
+        for cell in rng.sample(cells, 2):
+            model.add_edge(
+                GraphEdge(
+                    id=f"bridge_for_transition:{bridge}:{cell}",
+                    source=bridge,
+                    target=cell,
+                    label="bridge_for_transition",
+                    type="bridge_for_transition",
+                )
+            )
+
+    variant_idx = 0
+    while len(model.edges) < edge_target:
+        variant_id = f"variant:V{variant_idx}"
+        model.add_node(GraphNode(id=variant_id, label=variant_id, type="variant"))
+        targets = [
+            ("variant_of_way", rng.choice(ways)),
+            *[("variant_fits_cell", cell) for cell in rng.sample(cells, 2)],
+            *[("variant_uses_bridge", bridge) for bridge in rng.sample(bridges, 2)],
+        ]
+        for edge_type, target in targets:
+            model.add_edge(
+                GraphEdge(
+                    id=f"{edge_type}:{variant_idx}:{target}",
+                    source=variant_id,
+                    target=target,
+                    label=edge_type,
+                    type=edge_type,
+                )
+            )
+        variant_idx += 1
+    return model
+
+
+def legacy_subgraph(model: GraphModel, selected_id: str, depth: int, max_nodes: int) -> set[str]:
+    # Прежний алгоритм ui.views.graph._build_subgraph: list.pop(0) и полный проход по рёбрам.
+    visited: set[str] = set()
+    queue: list[tuple[str, int]] = [(selected_id, 0)]
+    while queue:
+        node_id, dist = queue.pop(0)
+        if node_id in visited:
+            continue
+        visited.add(node_id)
+        if dist >= depth:
+            continue
+        for edge_id in model.incident_edges.get(node_id, set()):
+            edge = model.edges_by_id[edge_id]
+            neighbor = edge.target if edge.source == node_id else edge.source
+            if neighbor not in visited:
+                queue.append((neighbor, dist + 1))
+    if len(visited) > max_nodes:
+        ranked = sorted(visited, key=lambda node_id: len(model.adjacency.get(node_id, set())), reverse=True)
+        visited = {selected_id} | set(ranked[: max_nodes - 1])
+    return {
+        edge.id
+        for edge in model.edges
+        if edge.source in visited and edge.target in visited
+    }
+
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк выборки окрестности графа.")
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-nodes", type=int, default=60)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    model = synthetic_graph(args.edges)
+    print(
+        f"Граф: узлов={len(model.nodes)} рёбер={len(model.edges)} "
+        f"(построение {time.perf_counter() - started:.1f} с)"
+    )
+
+    cases = [
+        ("variant, depth=1", "variant:V100", 1),
+        ("variant, depth=2", "variant:V100", 2),
+        ("bridge, depth=1", "bridge:B0", 1),
+    ]
+    for label, center, depth in cases:
+        new_ms = timed(
+            lambda: extract_neighborhood(model, center, depth=depth, max_nodes=args.max_nodes),
+            args.repeat,
+        )
+        old_ms = timed(lambda: legacy_subgraph(model, center, depth, args.max_nodes), args.repeat)
+        print(f"{label:<18} extract_neighborhood={new_ms:9.1f} мс  прежний BFS={old_ms:9.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import gc
+import resource
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from money_map.ui import components
+from money_map.ui.logic.session_model import measure_state
+
+APP_PATH = Path(__file__).resolve().parents[1] / "src" / "money_map" / "ui" / "app.py"
+TOUR = ("Обзор", "Матрица", "Варианты (конкретика)", "Граф", "Поиск", "Сравнение")
+
+
+def rss_mib() -> float:
+    # Текущий RSS процесса; если /proc недоступен — пиковый из getrusage.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_session(index: int, pages: tuple[str, ...]) -> AppTest:
+    app = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    app.run()
+    for number, page in enumerate(pages):
+        app.session_state["nav_section"] = page
+        if page == "Сравнение":
+            app.session_state["nav_mode"] = "Сравнение"
+            app.session_state[components.SESSION_MODEL_KEY].add_compare("cell", "A1")
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"сессия {index}, страница {page}: {app.exception[0].value}")
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Память сервера при N одновременных сессиях интерфейса.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--step", type=int, default=10)
+    args = parser.parse_args()
+
+    snapshot = components.data_snapshot()
+    shared = (snapshot, snapshot.data, components.variant_catalog(snapshot.data))
+    # Прогрев: общие кеши (каталог, граф, маршруты) строятся один раз и не относятся к сессиям.
+    open_session(-1, TOUR)
+    gc.collect()
+    baseline = rss_mib()
+    print(f"После прогрева: RSS={baseline:8.1f} MiB")
+
+    sessions: list[AppTest] = []
+    started = time.perf_counter()
+    while len(sessions) < args.sessions:
+        sessions.append(open_session(len(sessions), TOUR))
+        if len(sessions) % args.step == 0 or len(sessions) == args.sessions:
+            gc.collect()
+            current = rss_mib()
+            sizes = [measure_state(app.session_state.to_dict().items(), shared=shared) for app in sessions]
+            average = sum(size.total for size in sizes) / len(sizes)
+            print(
+                f"сессий={len(sessions):4d} RSS={current:8.1f} MiB "
+                f"прирост на сессию={(current - baseline) / len(sessions):6.2f} MiB "
+                f"состояние: среднее={average / 1024:6.1f} КБ "
+                f"максимум={max(size.total for size in sizes) / 1024:6.1f} КБ"
+            )
+    print(f"Время: {time.perf_counter() - started:.1f} s")
+    heaviest = max(
+        (measure_state(app.session_state.to_dict().items(), shared=shared) for app in sessions),
+        key=lambda size: size.total,
+    )
+    print("Крупнейшие ключи сессии:")
+    for key, size in heaviest.top(5):
+        print(f"  {key:<40} {size / 1024:8.1f} КБ")
+
+
+if __name__ == "__main__":
+    main()
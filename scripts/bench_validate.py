@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections import Counter
+
+from money_map.core.load import load_app_data
+from money_map.core.model import AppData
+from money_map.core.validate import VARIANT_CHUNK_SIZE, iter_findings
+
+
+def synthesize_variants(data: AppData, count: int, broken_every: int) -> AppData:
+    base = data.variants
+    variants = []
+    for idx in range(count):
+        source = base[idx % len(base)]
+        update = {"id": f"{source.id}.synthetic_{idx}"}
+        if broken_every and idx % broken_every == 0:
+            update["sell_tags"] = [*source.sell_tags, "unknown_sell"]
+        variants.append(source.model_copy(update=update))
+    return data.model_copy(update={"variants": variants})
+
+
+def run(data: AppData, workers: int, chunk_size: int) -> tuple[float, Counter[str]]:
+    started = time.perf_counter()
+    counts: Counter[str] = Counter(
+        finding.rule_id for finding in iter_findings(data, workers=workers, chunk_size=chunk_size)
+    )
+    return time.perf_counter() - started, counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк валидации данных на синтетических вариантах.")
+    parser.add_argument("--variants", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=VARIANT_CHUNK_SIZE)
+    parser.add_argument("--broken-every", type=int, default=1000, help="Каждый N-й вариант с ошибкой")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    data = synthesize_variants(load_app_data(), args.variants, args.broken_every)
+    print(f"Вариантов: {len(data.variants)} (подготовка {time.perf_counter() - started:.1f} с)")
+
+    sequential, counts = run(data, 1, args.chunk_size)
+    print(f"1 процесс:      {sequential:6.2f} с  {len(data.variants) / sequential:10.0f} вариантов/с")
+    if args.workers > 1:
+        parallel, parallel_counts = run(data, args.workers, args.chunk_size)
+        print(
+            f"{args.workers} процесса(ов): {parallel:6.2f} с  {len(data.variants) / parallel:10.0f} вариантов/с"
+            f"  ускорение x{sequential / parallel:.1f}"
+        )
+        assert parallel_counts == counts
+    for rule_id, count in sorted(counts.items()):
+        print(f"  {rule_id:<28} {count}")
+
+
+if __name__ == "__main__":
+    main()
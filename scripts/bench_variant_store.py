@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, List
+
+from money_map.core.load import load_app_data
+from money_map.core.model import Variant
+from money_map.core.variant_index import build_variant_index, iter_rows
+from money_map.core.variant_store import build_variant_store
+
+
+def synthesize_variants(base: List[Variant], count: int) -> List[Variant]:
+    # Полные копии через dump/validate: у model_copy списки общие с исходником и память занижается.
+    dumps = [variant.model_dump() for variant in base]
+    variants = []
+    for idx in range(count):
+        payload = dict(dumps[idx % len(dumps)])
+        payload["id"] = f"{payload['id']}.synthetic_{idx}"
+        variants.append(Variant.model_validate(payload))
+    return variants
+
+
+def measure_memory(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+
+def best_of(repeat: int, action: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Память и скорость фильтра: список моделей против колоночного хранилища.")
+    parser.add_argument("--variants", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = load_app_data().variants
+    variants, models_bytes = measure_memory(lambda: synthesize_variants(base, args.variants))
+    store, store_bytes = measure_memory(lambda: build_variant_store(variants))
+    count = len(variants)
+    print(f"Вариантов: {count}")
+    print(f"Память, модели:    {models_bytes / count:8.0f} байт/вариант")
+    print(f"Память, хранилище: {store_bytes / count:8.0f} байт/вариант")
+
+    index, index_bytes = measure_memory(lambda: build_variant_index(store))
+    print(f"Память, индекс:    {index_bytes / count:8.0f} байт/вариант")
+
+    sample = variants[0]
+    risk, activity, cell = sample.risk_level, sample.activity, sample.matrix_cells[0]
+
+    def filter_models() -> List[str]:
+        return [
+            variant.id
+            for variant in variants
+            if variant.risk_level == risk and variant.activity == activity and cell in variant.matrix_cells
+        ]
+
+    def filter_store() -> List[str]:
+        rows = store.rows_equal("risk_level", risk)
+        rows = store.rows_equal("activity", activity, rows)
+        rows = store.rows_containing("matrix_cells", cell, rows)
+        return [store.text["id"].value(row) for row in rows]
+
+    def filter_index() -> List[str]:
+        mask = index.equals(risk_level=risk, activity=activity) & index.bitmap("matrix_cells", cell)
+        return [store.text["id"].value(row) for row in iter_rows(mask)]
+
+    assert filter_models() == filter_store() == filter_index()
+    models_time = best_of(args.repeat, filter_models)
+    store_time = best_of(args.repeat, filter_store)
+    index_time = best_of(args.repeat, filter_index)
+    print(f"Фильтр, модели:    {models_time * 1000:8.1f} мс")
+    print(f"Фильтр, хранилище: {store_time * 1000:8.1f} мс  (x{models_time / store_time:.1f})")
+    print(f"Фильтр, индекс:    {index_time * 1000:8.1f} мс  (x{models_time / index_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
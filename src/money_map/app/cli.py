@@ -1,17 +1,24 @@
 from __future__ import annotations
 
 import importlib.util
+import json
 import subprocess
 import sys
+import time
+from dataclasses import asdict
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import typer
+import yaml
+from pydantic import ValidationError as PydanticValidationError
 from rich.console import Console
 from rich.table import Table
 
 from money_map.core.classify import classify_by_tags, classify_by_text
-from money_map.core.graph import build_graph, outgoing_bridges, shortest_path
+from money_map.core.graph import outgoing_bridges, shortest_path
+from money_map.core.graph_analytics import GraphAnalytics, reachable_nodes, top_hubs
+from money_map.core.graph_model import GraphModel, cell_node_id
 from money_map.core.load import load_app_data
 from money_map.core.query import (
     get_cell,
@@ -24,7 +31,16 @@ from money_map.core.query import (
     list_taxonomy,
     search_text,
 )
-from money_map.core.validate import validate_app_data
+from money_map.core.relations import build_bridge_relations
+from money_map.core.route_planner import CRITERIA, CRITERIA_LABELS, PlannedRoute, build_route_planner
+from money_map.core.routing import alternative_routes, transition_edges
+from money_map.core.snapshot import (
+    build_snapshot,
+    data_fingerprint,
+    snapshot_graph_analytics,
+    snapshot_graph_model,
+)
+from money_map.core.validate import Finding, ValidationState, ValidationSummary, iter_findings, limit_findings
 from money_map.render.ascii import render_full_ascii
 from money_map.render.graphviz import render_graphviz, render_taxonomy_graphviz
 from money_map.render.json_export import write_index_json
@@ -41,17 +57,110 @@ app = typer.Typer(help="Money Map CLI")
 console = Console()
 
 
+VALIDATE_FORMATS = ("text", "json", "jsonl")
+
+
 @app.command()
-def validate() -> None:
+def validate(
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        help="Следить за файлами данных и при изменении перепроверять только изменённое",
+    ),
+    interval: float = typer.Option(1.0, "--interval", help="Период опроса файлов в секундах"),
+    fail_fast: bool = typer.Option(False, "--fail-fast", help="Остановиться на первой ошибке"),
+    max_errors: Optional[int] = typer.Option(
+        None,
+        "--max-errors",
+        min=1,
+        help="Остановиться после N ошибок",
+    ),
+    output_format: str = typer.Option("text", "--format", help="Формат вывода: text, json или jsonl"),
+) -> None:
     """Проверить целостность данных."""
-    data = load_app_data()
-    errors = validate_app_data(data)
-    if errors:
-        console.print("[red]Найдены ошибки данных:[/red]")
-        for err in errors:
-            console.print(f"- {err}")
+    if output_format not in VALIDATE_FORMATS:
+        console.print(f"[red]Неизвестный формат: {output_format}. Доступны: {', '.join(VALIDATE_FORMATS)}[/red]")
+        raise typer.Exit(code=2)
+    limit = 1 if fail_fast else max_errors
+    if watch:
+        _watch_validate(interval, limit)
+        return
+    summary = ValidationSummary()
+    findings = limit_findings(iter_findings(load_app_data()), summary, limit)
+    if output_format == "text":
+        _print_findings_text(findings, summary)
+    elif output_format == "jsonl":
+        for finding in findings:
+            typer.echo(json.dumps({"type": "finding", **asdict(finding)}, ensure_ascii=False))
+        typer.echo(json.dumps({"type": "summary", **_summary_payload(summary)}, ensure_ascii=False))
+    else:
+        # Замечания пишутся в массив по одному, чтобы не держать весь отчёт в памяти.
+        typer.echo('{"findings": [', nl=False)
+        for index, finding in enumerate(findings):
+            typer.echo(("," if index else "") + json.dumps(asdict(finding), ensure_ascii=False), nl=False)
+        summary_json = json.dumps(_summary_payload(summary), ensure_ascii=False)
+        typer.echo("], " + summary_json[1:])
+    if summary.total:
         raise typer.Exit(code=1)
-    console.print("[green]Данные корректны.[/green]")
+
+
+def _summary_payload(summary: ValidationSummary) -> dict:
+    return {
+        "ok": not summary.total,
+        "total": summary.total,
+        "truncated": summary.truncated,
+        "counts": dict(sorted(summary.counts.items())),
+    }
+
+
+def _print_findings_text(findings: Iterable[Finding], summary: ValidationSummary) -> None:
+    for finding in findings:
+        if summary.total == 1:
+            console.print("[red]Найдены ошибки данных:[/red]")
+        console.print(f"- {finding.message}", markup=False)
+    if not summary.total:
+        console.print("[green]Данные корректны.[/green]")
+        return
+    if summary.truncated:
+        console.print(f"Проверка остановлена после {summary.total} ошибок.")
+    table = Table(title="Ошибки по правилам")
+    table.add_column("Правило")
+    table.add_column("Ошибок", justify="right")
+    for rule_id, count in sorted(summary.counts.items()):
+        table.add_row(rule_id, str(count))
+    console.print(table)
+
+
+def _watch_validate(interval: float, max_errors: Optional[int] = None) -> None:
+    state = ValidationState()
+    version = None
+    console.print("Слежение за данными, Ctrl+C — выход.")
+    try:
+        while True:
+            current = data_fingerprint()
+            if current != version:
+                version = current
+                try:
+                    data = load_app_data()
+                except (OSError, yaml.YAMLError, PydanticValidationError) as exc:
+                    console.print(f"[red]Не удалось загрузить данные: {exc}[/red]")
+                else:
+                    started = time.perf_counter()
+                    summary = ValidationSummary()
+                    with state.lock:
+                        errors = list(limit_findings(iter_findings(data, state=state), summary, max_errors))
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    details = f"перепроверено сущностей: {state.rechecked}, {elapsed_ms:.1f} мс"
+                    if errors:
+                        shown = f"{len(errors)}+" if summary.truncated else str(len(errors))
+                        console.print(f"[red]Найдены ошибки данных ({shown}); {details}[/red]")
+                        for err in errors:
+                            console.print(f"- {err.message}", markup=False)
+                    else:
+                        console.print(f"[green]Данные корректны; {details}[/green]")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return
 
 
 @app.command()
@@ -129,13 +238,25 @@ def tax(item_id: str) -> None:
 def bridges(from_cell: Optional[str] = None, to_cell: Optional[str] = None) -> None:
     data = load_app_data()
     items = list_bridges(data, from_cell=from_cell, to_cell=to_cell)
+    relations = build_bridge_relations(data)
     table = Table(title="Мосты")
     table.add_column("ID")
     table.add_column("От")
     table.add_column("К")
     table.add_column("Название")
+    table.add_column("Способы", justify="right")
+    table.add_column("Маршруты", justify="right")
+    table.add_column("Варианты", justify="right")
     for bridge in items:
-        table.add_row(bridge.id, bridge.from_cell, bridge.to_cell, bridge.name)
+        table.add_row(
+            bridge.id,
+            bridge.from_cell,
+            bridge.to_cell,
+            bridge.name,
+            str(len(relations.ways_by_bridge.get(bridge.id, ()))),
+            str(len(relations.routes_by_bridge.get(bridge.id, ()))),
+            str(relations.variants_by_bridge.get(bridge.id, 0).bit_count()),
+        )
     console.print(table)
 
 
@@ -240,12 +361,19 @@ def export(command: str = typer.Argument(...)) -> None:
 
 
 @app.command()
-def graph(command: str, start: Optional[str] = None, end: Optional[str] = None) -> None:
+def graph(
+    command: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    weight: List[str] = typer.Option(None, "--weight", help="Вес критерия: effort|risk|uncertainty|hops=число"),
+    pareto: bool = typer.Option(False, "--pareto", help="Показать все Парето-оптимальные маршруты"),
+    node_type: Optional[str] = typer.Option(None, "--type", help="Тип узлов для hubs/reachable"),
+    limit: int = typer.Option(10, "--limit", help="Сколько узлов показать в hubs"),
+) -> None:
     data = load_app_data()
     if command == "show":
-        graph_data = build_graph(data)
         console.print("Рёбра:")
-        for source, target in graph_data.edges():
+        for source, target in transition_edges(data):
             console.print(f"- {source} -> {target}")
         return
     if command == "shortest":
@@ -253,7 +381,80 @@ def graph(command: str, start: Optional[str] = None, end: Optional[str] = None)
             console.print("[red]Нужно указать start и end.[/red]")
             raise typer.Exit(code=1)
         path = shortest_path(data, start, end)
+        if not path:
+            console.print(f"[red]Путь {start} → {end} не найден.[/red]")
+            raise typer.Exit(code=1)
         console.print(" → ".join(path))
+        alternatives = alternative_routes(data, start, end)[1:]
+        if alternatives:
+            console.print("Альтернативы:")
+            for route in alternatives:
+                console.print(f"- {' → '.join(route)}")
+        return
+    if command == "plan":
+        if not start or not end:
+            console.print("[red]Нужно указать start и end.[/red]")
+            raise typer.Exit(code=1)
+        try:
+            weights = _parse_route_weights(weight or [])
+            planner = build_route_planner(data)
+            routes = planner.pareto_routes(start, end, weights) if pareto else planner.best_route(start, end, weights)
+        except ValueError as exc:
+            console.print(f"[red]{exc}[/red]")
+            raise typer.Exit(code=1)
+        if isinstance(routes, PlannedRoute):
+            routes = [routes]
+        if not routes:
+            console.print(f"[red]Путь {start} → {end} не найден.[/red]")
+            raise typer.Exit(code=1)
+        table = Table(title=f"Маршруты {start} → {end}")
+        table.add_column("Ячейки")
+        table.add_column("Мосты")
+        for criterion in CRITERIA:
+            table.add_column(CRITERIA_LABELS[criterion])
+        table.add_column("Итог")
+        for route in routes:
+            table.add_row(
+                " → ".join(route.cells),
+                ", ".join(route.bridge_ids),
+                *[f"{route.cost(criterion):.2f}" for criterion in CRITERIA],
+                f"{route.score:.2f}",
+            )
+        console.print(table)
+        return
+    if command == "hubs":
+        model, analytics = _graph_analytics(data)
+        table = Table(title=f"Ключевые узлы ({node_type})" if node_type else "Ключевые узлы")
+        table.add_column("Узел")
+        table.add_column("Тип")
+        table.add_column("Связей")
+        table.add_column("PageRank")
+        table.add_column("Посредничество")
+        for node_id in top_hubs(analytics, node_type, limit):
+            node = model.nodes_by_id[node_id]
+            table.add_row(
+                node.id,
+                node.type,
+                str(analytics.degree.get(node_id, 0)),
+                f"{analytics.pagerank.get(node_id, 0.0):.4f}",
+                f"{analytics.betweenness.get(node_id, 0.0):.4f}",
+            )
+        console.print(table)
+        return
+    if command == "reachable":
+        if not start:
+            console.print("[red]Нужно указать start.[/red]")
+            raise typer.Exit(code=1)
+        model, analytics = _graph_analytics(data)
+        # Без префикса типа start считается ячейкой.
+        node_id = start if ":" in start else cell_node_id(start)
+        if node_id not in model.nodes_by_id:
+            console.print(f"[red]Узел {node_id} не найден.[/red]")
+            raise typer.Exit(code=1)
+        reachable = reachable_nodes(model, analytics, node_id, node_type)
+        console.print(f"Достижимо из {node_id}: {len(reachable)}")
+        for reachable_id in reachable[:limit]:
+            console.print(f"- {reachable_id}")
         return
     if command == "outgoing":
         if not start:
@@ -268,6 +469,34 @@ def graph(command: str, start: Optional[str] = None, end: Optional[str] = None)
     raise typer.Exit(code=1)
 
 
+def _graph_analytics(data) -> tuple[GraphModel, GraphAnalytics]:
+    version = data_fingerprint()
+    model = snapshot_graph_model(data, version)
+    return model, snapshot_graph_analytics(data, version, model=model)
+
+
+def _parse_route_weights(items: List[str]) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for item in items:
+        criterion, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Вес задаётся как критерий=число: {item}")
+        try:
+            weights[criterion.strip()] = float(value)
+        except ValueError as exc:
+            raise ValueError(f"Вес задаётся как критерий=число: {item}") from exc
+    return weights
+
+
+@app.command()
+def snapshot() -> None:
+    """Собрать снимок данных (граф, его раскладку и аналитику) на диск, чтобы UI открывался сразу."""
+    data = load_app_data()
+    version = data_fingerprint()
+    directory = build_snapshot(data, version)
+    console.print(f"Снимок данных {version} сохранён в {directory}")
+
+
 @app.command()
 def ui() -> None:
     """Запустить Streamlit-интерфейс."""
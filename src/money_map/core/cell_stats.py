@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from money_map.core.model import AppData
+from money_map.core.relations import BridgeRelations, build_bridge_relations
+from money_map.core.routing import routing_table, transition_key
+
+TOP_MECHANISMS = 3
+
+
+@dataclass(frozen=True)
+class CellStats:
+    cell_id: str
+    # id способов в порядке названия.
+    way_ids: Tuple[str, ...]
+    # Индексы в data.bridges, в порядке объявления.
+    outgoing_bridges: Tuple[int, ...]
+    incoming_bridges: Tuple[int, ...]
+    # Куда можно перейти по мостам, по алфавиту.
+    targets: Tuple[str, ...]
+    routes: int
+    variants: int
+    # (id способа, число вариантов в ячейке) по убыванию числа.
+    top_mechanisms: Tuple[Tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class TransitionStats:
+    from_cell: str
+    to_cell: str
+    bridges: Tuple[int, ...]
+    # Маска строк data.variants: варианты, у которых в matrix_cells есть обе ячейки.
+    variant_mask: int
+
+    @property
+    def variants(self) -> int:
+        return self.variant_mask.bit_count()
+
+
+@dataclass(frozen=True)
+class CellAggregates:
+    cells: Dict[str, CellStats]
+    transitions: Dict[str, TransitionStats]
+    # (ячейка, id способа) -> число вариантов.
+    cell_mechanisms: Dict[Tuple[str, str], int]
+
+    def cell(self, cell_id: Optional[str]) -> Optional[CellStats]:
+        return self.cells.get(cell_id) if cell_id else None
+
+    def transition(self, from_cell: str, to_cell: str) -> Optional[TransitionStats]:
+        return self.transitions.get(transition_key(from_cell, to_cell))
+
+
+def build_cell_aggregates(
+    data: AppData,
+    relations: Optional[BridgeRelations] = None,
+) -> CellAggregates:
+    table = routing_table(data)
+    relations = relations or build_bridge_relations(data)
+    cell_ids = [cell.id for cell in data.cells]
+    for cell_id in table.cells:
+        if cell_id not in cell_ids:
+            cell_ids.append(cell_id)
+
+    incoming: Dict[str, List[int]] = {}
+    for index, bridge in enumerate(data.bridges):
+        incoming.setdefault(bridge.to_cell, []).append(index)
+
+    routes = Counter(cell_id for path in data.paths for cell_id in path.sequence)
+
+    mechanisms: Counter[Tuple[str, str]] = Counter()
+    for variant in data.variants:
+        for cell_id in variant.matrix_cells:
+            mechanisms[(cell_id, variant.primary_way_id)] += 1
+
+    top_by_cell: Dict[str, List[Tuple[str, int]]] = {}
+    for (cell_id, way_id), count in sorted(mechanisms.items(), key=lambda item: (-item[1], item[0])):
+        top_by_cell.setdefault(cell_id, []).append((way_id, count))
+
+    def way_order(row: int) -> str:
+        return data.taxonomy[row].name
+
+    cells: Dict[str, CellStats] = {}
+    for cell_id in cell_ids:
+        outgoing = tuple(table.outgoing_bridges.get(cell_id, []))
+        cells[cell_id] = CellStats(
+            cell_id=cell_id,
+            way_ids=tuple(
+                data.taxonomy[row].id
+                for row in sorted(relations.ways_by_cell.get(cell_id, ()), key=way_order)
+            ),
+            outgoing_bridges=outgoing,
+            incoming_bridges=tuple(incoming.get(cell_id, [])),
+            targets=tuple(sorted({data.bridges[index].to_cell for index in outgoing})),
+            routes=routes.get(cell_id, 0),
+            variants=len(data.variants_by_cell_id.get(cell_id, [])),
+            top_mechanisms=tuple(top_by_cell.get(cell_id, [])[:TOP_MECHANISMS]),
+        )
+
+    transitions: Dict[str, TransitionStats] = {}
+    for key in sorted(set(relations.bridges_by_transition) | set(relations.variants_by_transition)):
+        from_cell, to_cell = key.split("->", maxsplit=1)
+        transitions[key] = TransitionStats(
+            from_cell=from_cell,
+            to_cell=to_cell,
+            bridges=relations.bridges_by_transition.get(key, ()),
+            variant_mask=relations.variants_by_transition.get(key, 0),
+        )
+
+    return CellAggregates(cells=cells, transitions=transitions, cell_mechanisms=dict(mechanisms))
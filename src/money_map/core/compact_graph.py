@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+from money_map.core.graph_model import (
+    GraphEdge,
+    GraphModel,
+    GraphNode,
+    iter_base_edges,
+    iter_base_nodes,
+)
+from money_map.core.model import AppData
+
+# Тип висячих узлов: рёбра могут ссылаться на id, для которых нет узла
+# (например, маршрут из linked_route_ids, отсутствующий в paths).
+DANGLING_TYPE = ""
+
+
+class StringTable(Sequence[str]):
+    """Строки в одном общем буфере с массивом смещений вместо списка объектов str."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        parts = list(values)
+        offsets = array("q", [0])
+        total = 0
+        for value in parts:
+            total += len(value)
+            offsets.append(total)
+        self._buffer = "".join(parts)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._buffer[self._offsets[index] : self._offsets[index + 1]]
+
+    def nbytes(self) -> int:
+        return len(self._buffer.encode("utf-8")) + self._offsets.itemsize * len(self._offsets)
+
+
+class CompactGraphModel:
+    """Компактное представление GraphModel: целочисленные id, коды типов и CSR-индексы.
+
+    Атрибуты nodes/edges/nodes_by_id/edges_by_id/adjacency/incident_edges/
+    nodes_by_type/edges_by_type повторяют интерфейс GraphModel, но материализуют
+    объекты только при обращении. Для горячих циклов есть индексный API.
+    """
+
+    def __init__(
+        self,
+        *,
+        node_ids: list[str],
+        node_labels: StringTable,
+        node_types: array,
+        node_type_names: list[str],
+        real_node_count: int,
+        node_meta: dict[int, dict[str, object]],
+        edge_ids: StringTable,
+        edge_sources: array,
+        edge_targets: array,
+        edge_types: array,
+        edge_type_names: list[str],
+        edge_labels: array,
+        edge_label_names: list[str],
+        edge_meta: dict[int, dict[str, object]],
+    ) -> None:
+        self.node_ids = node_ids
+        self.node_labels = node_labels
+        self.node_types = node_types
+        self.node_type_names = node_type_names
+        self.real_node_count = real_node_count
+        self.node_meta_overrides = node_meta
+        self.edge_ids = edge_ids
+        self.edge_sources = edge_sources
+        self.edge_targets = edge_targets
+        self.edge_types = edge_types
+        self.edge_type_names = edge_type_names
+        self.edge_labels = edge_labels
+        self.edge_label_names = edge_label_names
+        self.edge_meta_overrides = edge_meta
+
+        self._node_index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        self._edge_index: dict[str, int] | None = None
+        self._node_type_codes = {name: code for code, name in enumerate(node_type_names)}
+        self._edge_type_codes = {name: code for code, name in enumerate(edge_type_names)}
+
+        self.incidence_offsets, self.incidence_indices = _build_incidence(
+            len(node_ids), edge_sources, edge_targets
+        )
+        self.adjacency_offsets, self.adjacency_indices = _build_adjacency(
+            self.incidence_offsets, self.incidence_indices, edge_sources, edge_targets
+        )
+        self.nodes_of_type_index = _group_by_code(node_types, len(node_type_names), real_node_count)
+        self.edges_of_type_index = _group_by_code(edge_types, len(edge_type_names), len(edge_types))
+
+        self.nodes = _NodeSequence(self)
+        self.edges = _EdgeSequence(self)
+        self.nodes_by_id = _NodesById(self)
+        self.edges_by_id = _EdgesById(self)
+        self.nodes_by_type = _IdsByType(self.node_type_names, self.nodes_of_type_index, self.node_id)
+        self.edges_by_type = _IdsByType(self.edge_type_names, self.edges_of_type_index, self.edge_id)
+        self.adjacency = _Neighbourhood(self, self.adjacency_offsets, self.adjacency_indices, self.node_id)
+        self.incident_edges = _Neighbourhood(
+            self, self.incidence_offsets, self.incidence_indices, self.edge_id
+        )
+
+    @property
+    def node_count(self) -> int:
+        return self.real_node_count
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_sources)
+
+    def node_index(self, node_id: str) -> int | None:
+        return self._node_index.get(node_id)
+
+    def edge_index(self, edge_id: str) -> int | None:
+        if self._edge_index is None:
+            # Строится лениво: обратный индекс рёбер нужен редко и занимает заметную память.
+            self._edge_index = {value: idx for idx, value in enumerate(self.edge_ids)}
+        return self._edge_index.get(edge_id)
+
+    def node_id(self, index: int) -> str:
+        return self.node_ids[index]
+
+    def edge_id(self, index: int) -> str:
+        return self.edge_ids[index]
+
+    def node_type(self, index: int) -> str:
+        return self.node_type_names[self.node_types[index]]
+
+    def edge_type(self, index: int) -> str:
+        return self.edge_type_names[self.edge_types[index]]
+
+    def node_type_code(self, node_type: str) -> int | None:
+        return self._node_type_codes.get(node_type)
+
+    def edge_type_code(self, edge_type: str) -> int | None:
+        return self._edge_type_codes.get(edge_type)
+
+    def degree(self, index: int) -> int:
+        return self.adjacency_offsets[index + 1] - self.adjacency_offsets[index]
+
+    def neighbor_indices(self, index: int) -> memoryview:
+        start, end = self.adjacency_offsets[index], self.adjacency_offsets[index + 1]
+        return memoryview(self.adjacency_indices)[start:end]
+
+    def incident_edge_indices(self, index: int) -> memoryview:
+        start, end = self.incidence_offsets[index], self.incidence_offsets[index + 1]
+        return memoryview(self.incidence_indices)[start:end]
+
+    def other_endpoint(self, edge_index: int, node_index: int) -> int:
+        source = self.edge_sources[edge_index]
+        return self.edge_targets[edge_index] if source == node_index else source
+
+    def node_at(self, index: int) -> GraphNode:
+        node_id = self.node_ids[index]
+        node_type = self.node_type(index)
+        meta = self.node_meta_overrides.get(index)
+        if meta is None:
+            meta = derive_node_meta(node_type, node_id)
+        return GraphNode(id=node_id, label=self.node_labels[index], type=node_type, meta=dict(meta))
+
+    def edge_at(self, index: int) -> GraphEdge:
+        return GraphEdge(
+            id=self.edge_ids[index],
+            source=self.node_ids[self.edge_sources[index]],
+            target=self.node_ids[self.edge_targets[index]],
+            label=self.edge_label_names[self.edge_labels[index]],
+            type=self.edge_type(index),
+            meta=dict(self.edge_meta_overrides.get(index, {})),
+        )
+
+    def nbytes(self) -> int:
+        arrays = (
+            self.node_types,
+            self.edge_sources,
+            self.edge_targets,
+            self.edge_types,
+            self.edge_labels,
+            self.incidence_offsets,
+            self.incidence_indices,
+            self.adjacency_offsets,
+            self.adjacency_indices,
+        )
+        return (
+            sum(item.itemsize * len(item) for item in arrays)
+            + self.node_labels.nbytes()
+            + self.edge_ids.nbytes()
+        )
+
+
+def derive_node_meta(node_type: str, node_id: str) -> dict[str, object]:
+    if node_type == DANGLING_TYPE or ":" not in node_id:
+        return {}
+    key = node_id.split(":", 1)[1]
+    if node_type == "classifier":
+        group, _, classifier_id = key.partition(".")
+        return {"group": group, "classifier_id": classifier_id}
+    return {f"{node_type}_id": key}
+
+
+class _CompactBuilder:
+    def __init__(self) -> None:
+        self.node_ids: list[str] = []
+        self.node_labels: list[str] = []
+        self.node_types = array("B")
+        self.node_type_codes: dict[str, int] = {}
+        self.node_meta: dict[int, dict[str, object]] = {}
+        self.node_index: dict[str, int] = {}
+        self.dangling: list[str] = []
+        self.dangling_index: dict[str, int] = {}
+
+        self.edge_ids: list[str] = []
+        self.edge_seen: set[str] = set()
+        self.edge_sources = array("i")
+        self.edge_targets = array("i")
+        self.edge_types = array("B")
+        self.edge_type_codes: dict[str, int] = {}
+        self.edge_labels = array("I")
+        self.edge_label_codes: dict[str, int] = {}
+        self.edge_meta: dict[int, dict[str, object]] = {}
+
+    def add_node(self, node: GraphNode) -> None:
+        if node.id in self.node_index:
+            return
+        index = len(self.node_ids)
+        self.node_index[node.id] = index
+        self.node_ids.append(node.id)
+        self.node_labels.append(node.label)
+        self.node_types.append(_intern(self.node_type_codes, node.type))
+        if node.meta != derive_node_meta(node.type, node.id):
+            self.node_meta[index] = dict(node.meta)
+
+    def add_edge(self, edge: GraphEdge) -> None:
+        if edge.id in self.edge_seen:
+            return
+        self.edge_seen.add(edge.id)
+        index = len(self.edge_ids)
+        self.edge_ids.append(edge.id)
+        # Висячим концам временно выдаются отрицательные индексы, после
+        # добавления всех узлов они переносятся в хвост массива узлов.
+        self.edge_sources.append(self._endpoint(edge.source))
+        self.edge_targets.append(self._endpoint(edge.target))
+        self.edge_types.append(_intern(self.edge_type_codes, edge.type))
+        self.edge_labels.append(_intern(self.edge_label_codes, edge.label))
+        if edge.meta:
+            self.edge_meta[index] = dict(edge.meta)
+
+    def _endpoint(self, node_id: str) -> int:
+        index = self.node_index.get(node_id)
+        if index is not None:
+            return index
+        index = self.dangling_index.get(node_id)
+        if index is None:
+            index = len(self.dangling)
+            self.dangling_index[node_id] = index
+            self.dangling.append(node_id)
+        return -index - 1
+
+    def finish(self) -> CompactGraphModel:
+        real_node_count = len(self.node_ids)
+        if self.dangling:
+            dangling_code = _intern(self.node_type_codes, DANGLING_TYPE)
+            for node_id in self.dangling:
+                self.node_ids.append(node_id)
+                self.node_labels.append(node_id)
+                self.node_types.append(dangling_code)
+            for endpoints in (self.edge_sources, self.edge_targets):
+                for idx, value in enumerate(endpoints):
+                    if value < 0:
+                        endpoints[idx] = real_node_count - value - 1
+        return CompactGraphModel(
+            node_ids=self.node_ids,
+            node_labels=StringTable(self.node_labels),
+            node_types=self.node_types,
+            node_type_names=_names(self.node_type_codes),
+            real_node_count=real_node_count,
+            node_meta=self.node_meta,
+            edge_ids=StringTable(self.edge_ids),
+            edge_sources=self.edge_sources,
+            edge_targets=self.edge_targets,
+            edge_types=self.edge_types,
+            edge_type_names=_names(self.edge_type_codes),
+            edge_labels=self.edge_labels,
+            edge_label_names=_names(self.edge_label_codes),
+            edge_meta=self.edge_meta,
+        )
+
+
+def build_compact_graph(data: AppData) -> CompactGraphModel:
+    builder = _CompactBuilder()
+    for node in iter_base_nodes(data):
+        builder.add_node(node)
+    for edge in iter_base_edges(data):
+        builder.add_edge(edge)
+    return builder.finish()
+
+
+def compact_graph_from_model(model: GraphModel) -> CompactGraphModel:
+    builder = _CompactBuilder()
+    for node in model.nodes:
+        builder.add_node(node)
+    for edge in model.edges:
+        builder.add_edge(edge)
+    return builder.finish()
+
+
+def _intern(codes: dict[str, int], value: str) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = len(codes)
+        codes[value] = code
+    return code
+
+
+def _names(codes: dict[str, int]) -> list[str]:
+    names = [""] * len(codes)
+    for name, code in codes.items():
+        names[code] = name
+    return names
+
+
+def _build_incidence(node_count: int, sources: array, targets: array) -> tuple[array, array]:
+    counts = array("i", bytes(4 * (node_count + 1)))
+    for edge_index in range(len(sources)):
+        source, target = sources[edge_index], targets[edge_index]
+        counts[source + 1] += 1
+        if target != source:
+            counts[target + 1] += 1
+    offsets = array("i", counts)
+    for idx in range(node_count):
+        offsets[idx + 1] += offsets[idx]
+    cursor = array("i", offsets[:-1])
+    indices = array("i", bytes(4 * offsets[-1]))
+    for edge_index in range(len(sources)):
+        source, target = sources[edge_index], targets[edge_index]
+        indices[cursor[source]] = edge_index
+        cursor[source] += 1
+        if target != source:
+            indices[cursor[target]] = edge_index
+            cursor[target] += 1
+    return offsets, indices
+
+
+def _build_adjacency(
+    incidence_offsets: array,
+    incidence_indices: array,
+    sources: array,
+    targets: array,
+) -> tuple[array, array]:
+    offsets = array("i", [0])
+    indices = array("i")
+    for node in range(len(incidence_offsets) - 1):
+        seen: set[int] = set()
+        for position in range(incidence_offsets[node], incidence_offsets[node + 1]):
+            edge_index = incidence_indices[position]
+            source = sources[edge_index]
+            neighbor = targets[edge_index] if source == node else source
+            if neighbor not in seen:
+                seen.add(neighbor)
+                indices.append(neighbor)
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def _group_by_code(codes: array, code_count: int, limit: int) -> list[array]:
+    groups = [array("i") for _ in range(code_count)]
+    for index in range(limit):
+        groups[codes[index]].append(index)
+    return groups
+
+
+class _NodeSequence(Sequence[GraphNode]):
+    def __init__(self, graph: CompactGraphModel) -> None:
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph.real_node_count
+
+    def __getitem__(self, index: int) -> GraphNode:  # type: ignore[override]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._graph.node_at(index)
+
+
+class _EdgeSequence(Sequence[GraphEdge]):
+    def __init__(self, graph: CompactGraphModel) -> None:
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph.edge_count
+
+    def __getitem__(self, index: int) -> GraphEdge:  # type: ignore[override]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._graph.edge_at(index)
+
+
+class _NodesById(Mapping[str, GraphNode]):
+    def __init__(self, graph: CompactGraphModel) -> None:
+        self._graph = graph
+
+    def __getitem__(self, node_id: str) -> GraphNode:
+        index = self._graph.node_index(node_id)
+        if index is None or index >= self._graph.real_node_count:
+            raise KeyError(node_id)
+        return self._graph.node_at(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.node_ids[: self._graph.real_node_count])
+
+    def __len__(self) -> int:
+        return self._graph.real_node_count
+
+
+class _EdgesById(Mapping[str, GraphEdge]):
+    def __init__(self, graph: CompactGraphModel) -> None:
+        self._graph = graph
+
+    def __getitem__(self, edge_id: str) -> GraphEdge:
+        index = self._graph.edge_index(edge_id)
+        if index is None:
+            raise KeyError(edge_id)
+        return self._graph.edge_at(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.edge_ids)
+
+    def __len__(self) -> int:
+        return self._graph.edge_count
+
+
+class _IdsByType(Mapping[str, set[str]]):
+    def __init__(self, names: list[str], groups: list[array], resolve) -> None:
+        self._codes = {name: code for code, name in enumerate(names) if groups[code]}
+        self._groups = groups
+        self._resolve = resolve
+
+    def __getitem__(self, type_name: str) -> set[str]:
+        code = self._codes.get(type_name)
+        if code is None:
+            raise KeyError(type_name)
+        return {self._resolve(index) for index in self._groups[code]}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+class _Neighbourhood(Mapping[str, set[str]]):
+    def __init__(self, graph: CompactGraphModel, offsets: array, indices: array, resolve) -> None:
+        self._graph = graph
+        self._offsets = offsets
+        self._indices = indices
+        self._resolve = resolve
+
+    def __getitem__(self, node_id: str) -> set[str]:
+        index = self._graph.node_index(node_id)
+        if index is None or self._offsets[index] == self._offsets[index + 1]:
+            raise KeyError(node_id)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return {self._resolve(self._indices[pos]) for pos in range(start, end)}
+
+    def __iter__(self) -> Iterator[str]:
+        offsets = self._offsets
+        for index, node_id in enumerate(self._graph.node_ids):
+            if offsets[index] != offsets[index + 1]:
+                yield node_id
+
+    def __len__(self) -> int:
+        offsets = self._offsets
+        return sum(1 for index in range(len(offsets) - 1) if offsets[index] != offsets[index + 1])
@@ -5,6 +5,7 @@ from typing import List
 import networkx as nx
 
 from money_map.core.model import AppData, BridgeItem
+from money_map.core.routing import bridges_from_cell, shortest_route
 
 
 def build_graph(data: AppData) -> nx.DiGraph:
@@ -17,9 +18,8 @@ def build_graph(data: AppData) -> nx.DiGraph:
 
 
 def outgoing_bridges(data: AppData, cell_id: str) -> List[BridgeItem]:
-    return [bridge for bridge in data.bridges if bridge.from_cell == cell_id]
+    return bridges_from_cell(data, cell_id)
 
 
 def shortest_path(data: AppData, start: str, end: str) -> List[str]:
-    graph = build_graph(data)
-    return nx.shortest_path(graph, start, end)
+    return shortest_route(data, start, end) or []
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from money_map.core.graph_model import GraphModel
+
+HUB_LIMIT = 20
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-6
+PAGERANK_MAX_ITER = 100
+# До этого числа узлов посредничество считается точно, дальше — по выборке источников.
+BETWEENNESS_EXACT_LIMIT = 1000
+BETWEENNESS_SAMPLES = 32
+
+
+@dataclass(frozen=True)
+class GraphAnalytics:
+    degree: dict[str, int]
+    pagerank: dict[str, float]
+    betweenness: dict[str, float]
+    # Сколько источников участвовало в расчёте посредничества; меньше числа узлов — оценка.
+    betweenness_sources: int
+    component_of: dict[str, int]
+    components: list[list[str]]
+    hubs: dict[str, list[str]]
+    # Ячейка -> тип -> узлы, достижимые по направленным переходам (сама ячейка не входит).
+    reachable: dict[str, dict[str, tuple[str, ...]]]
+
+    def rank(self, node_id: str) -> tuple[float, int]:
+        return self.pagerank.get(node_id, 0.0), self.degree.get(node_id, 0)
+
+
+def compute_graph_analytics(
+    model: GraphModel,
+    *,
+    hub_limit: int = HUB_LIMIT,
+    betweenness_samples: Optional[int] = None,
+    seed: int = 0,
+) -> GraphAnalytics:
+    # Граф рассматривается как неориентированный, как и adjacency модели.
+    node_ids = sorted(model.nodes_by_id)
+    index = {node_id: position for position, node_id in enumerate(node_ids)}
+    neighbors = [
+        sorted(index[other] for other in model.adjacency.get(node_id, ()) if other in index and other != node_id)
+        for node_id in node_ids
+    ]
+
+    degree = {node_id: len(neighbors[position]) for position, node_id in enumerate(node_ids)}
+    pagerank_values = _pagerank(neighbors)
+    if betweenness_samples is None:
+        betweenness_samples = len(node_ids) if len(node_ids) <= BETWEENNESS_EXACT_LIMIT else BETWEENNESS_SAMPLES
+    betweenness_values, sources = _betweenness(neighbors, betweenness_samples, seed)
+    components = _components(neighbors)
+
+    pagerank = dict(zip(node_ids, pagerank_values))
+    component_lists = [sorted(node_ids[position] for position in members) for members in components]
+    component_lists.sort(key=lambda members: (-len(members), members[0]))
+    component_of = {
+        node_id: component_index
+        for component_index, members in enumerate(component_lists)
+        for node_id in members
+    }
+
+    hubs = {}
+    for node_type, type_ids in model.nodes_by_type.items():
+        ranked = sorted(type_ids, key=lambda node_id: (-pagerank.get(node_id, 0.0), -degree.get(node_id, 0), node_id))
+        hubs[node_type] = ranked[:hub_limit]
+
+    return GraphAnalytics(
+        degree=degree,
+        pagerank=pagerank,
+        betweenness=dict(zip(node_ids, betweenness_values)),
+        betweenness_sources=sources,
+        component_of=component_of,
+        components=component_lists,
+        hubs=hubs,
+        reachable=_reachable_by_cell(model),
+    )
+
+
+def _pagerank(neighbors: list[list[int]]) -> list[float]:
+    count = len(neighbors)
+    if not count:
+        return []
+    ranks = [1.0 / count] * count
+    degrees = [len(adjacent) for adjacent in neighbors]
+    dangling = [position for position, degree in enumerate(degrees) if not degree]
+    for _ in range(PAGERANK_MAX_ITER):
+        # Граф неориентированный, поэтому вклад можно собирать «по входящим» через тех же соседей.
+        shares = [rank / degree if degree else 0.0 for rank, degree in zip(ranks, degrees)]
+        base = (1.0 - PAGERANK_DAMPING) / count
+        base += PAGERANK_DAMPING * sum(ranks[position] for position in dangling) / count
+        updated = [base + PAGERANK_DAMPING * sum(map(shares.__getitem__, adjacent)) for adjacent in neighbors]
+        error = sum(abs(new - old) for new, old in zip(updated, ranks))
+        ranks = updated
+        if error < count * PAGERANK_TOLERANCE:
+            break
+    return ranks
+
+
+def _betweenness(neighbors: list[list[int]], samples: int, seed: int) -> tuple[list[float], int]:
+    # Алгоритм Брандеса; на больших графах — по случайной выборке источников с масштабированием.
+    count = len(neighbors)
+    centrality = [0.0] * count
+    if count < 3:
+        return centrality, count
+    sources: Iterable[int]
+    if samples >= count:
+        sources = range(count)
+        samples = count
+    else:
+        sources = random.Random(seed).sample(range(count), samples)
+
+    for source in sources:
+        order = [source]
+        paths = [0] * count
+        paths[source] = 1
+        distance = [-1] * count
+        distance[source] = 0
+        for current in order:
+            next_distance = distance[current] + 1
+            current_paths = paths[current]
+            for other in neighbors[current]:
+                if distance[other] < 0:
+                    distance[other] = next_distance
+                    order.append(other)
+                if distance[other] == next_distance:
+                    paths[other] += current_paths
+        # Предшественники не хранятся: это соседи, которые на единицу ближе к источнику.
+        dependency = [0.0] * count
+        for current in reversed(order):
+            previous_distance = distance[current] - 1
+            factor = (1.0 + dependency[current]) / paths[current]
+            for other in neighbors[current]:
+                if distance[other] == previous_distance:
+                    dependency[other] += paths[other] * factor
+            if current != source:
+                centrality[current] += dependency[current]
+
+    # Нормировка как у networkx для неориентированного графа; выборка масштабируется до всех источников.
+    scale = 1.0 / ((count - 1) * (count - 2)) * (count / samples)
+    return [value * scale for value in centrality], samples
+
+
+def _components(neighbors: list[list[int]]) -> list[list[int]]:
+    seen = [False] * len(neighbors)
+    components = []
+    for start in range(len(neighbors)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        members = [start]
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for other in neighbors[current]:
+                if not seen[other]:
+                    seen[other] = True
+                    members.append(other)
+                    queue.append(other)
+        components.append(members)
+    return components
+
+
+def _cell_successors(model: GraphModel, cells: set[str]) -> dict[str, set[str]]:
+    successors: dict[str, set[str]] = {}
+    for edge_id in model.edges_by_type.get("transition", ()):
+        edge = model.edges_by_id[edge_id]
+        successors.setdefault(edge.source, set()).add(edge.target)
+    # Мост задаёт переход и без ребра transition (например, в отфильтрованном графе).
+    bridge_ends: dict[str, dict[str, str]] = {}
+    for edge_id in model.edges_by_type.get("bridge_for_transition", ()):
+        edge = model.edges_by_id[edge_id]
+        bridge_ends.setdefault(edge.source, {})[edge.id.rsplit(":", 1)[-1]] = edge.target
+    for ends in bridge_ends.values():
+        if "from" in ends and "to" in ends:
+            successors.setdefault(ends["from"], set()).add(ends["to"])
+    return {cell_id: targets & cells for cell_id, targets in successors.items() if cell_id in cells}
+
+
+def _reachable_by_cell(model: GraphModel) -> dict[str, dict[str, tuple[str, ...]]]:
+    # Из ячейки достижимы ячейки по направленным переходам, а также всё, что привязано
+    # к ней самой и к достигнутым ячейкам (варианты, способы, мосты, маршруты).
+    cells = model.nodes_by_type.get("cell", set())
+    successors = _cell_successors(model, cells)
+    attached: dict[str, dict[str, set[str]]] = {}
+    for cell_id in cells:
+        by_type = attached.setdefault(cell_id, {})
+        for other in model.adjacency.get(cell_id, ()):
+            node = model.nodes_by_id.get(other)
+            if node is not None and node.type != "cell":
+                by_type.setdefault(node.type, set()).add(other)
+
+    reachable = {}
+    for start in sorted(cells):
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for other in successors.get(queue.popleft(), ()):
+                if other not in seen:
+                    seen.add(other)
+                    queue.append(other)
+        merged: dict[str, set[str]] = {"cell": seen - {start}}
+        for cell_id in seen:
+            for node_type, node_ids in attached[cell_id].items():
+                merged.setdefault(node_type, set()).update(node_ids)
+        reachable[start] = {node_type: tuple(sorted(node_ids)) for node_type, node_ids in merged.items() if node_ids}
+    return reachable
+
+
+def top_hubs(analytics: GraphAnalytics, node_type: Optional[str] = None, limit: int = 10) -> list[str]:
+    if node_type is not None:
+        return analytics.hubs.get(node_type, [])[:limit]
+    merged = [node_id for ranked in analytics.hubs.values() for node_id in ranked]
+    merged.sort(key=lambda node_id: (-analytics.pagerank.get(node_id, 0.0), node_id))
+    return merged[:limit]
+
+
+def reachable_nodes(
+    model: GraphModel,
+    analytics: GraphAnalytics,
+    node_id: str,
+    node_type: Optional[str] = None,
+) -> list[str]:
+    node = model.nodes_by_id.get(node_id)
+    if node is None:
+        return []
+    if node.type == "cell":
+        by_type = analytics.reachable.get(node_id, {})
+        if node_type is not None:
+            return list(by_type.get(node_type, ()))
+        return sorted(member for members in by_type.values() for member in members)
+    # Прочие узлы входят в граф переходов через свои ячейки.
+    starts = [other for other in model.adjacency.get(node_id, ()) if other in analytics.reachable]
+    merged: set[str] = set()
+    for start in starts:
+        by_type = analytics.reachable[start]
+        for members_type, members in by_type.items():
+            if node_type is None or members_type == node_type:
+                merged.update(members)
+        if node_type in (None, "cell"):
+            merged.add(start)
+    merged.discard(node_id)
+    return sorted(merged)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from money_map.core.graph_model import (
+    GraphEdge,
+    GraphModel,
+    GraphNode,
+    bridge_edges,
+    bridge_node,
+    bridge_node_id,
+    cell_node,
+    cell_node_id,
+    route_edges,
+    route_node,
+    route_node_id,
+    transition_edge,
+    transition_pairs,
+    variant_edges,
+    variant_node,
+    variant_node_id,
+    way_edges,
+    way_node,
+    way_node_id,
+)
+from money_map.core.model import AppData, BridgeItem, Cell, PathItem, TaxonomyItem, Variant
+
+T = TypeVar("T", Cell, TaxonomyItem, BridgeItem, PathItem, Variant)
+
+# Рёбра, которые порождает сущность: при её изменении или удалении они пересобираются.
+# Остальные инцидентные рёбра принадлежат другим сущностям и остаются на месте.
+OWNED_EDGE_TYPES = {
+    "cell": frozenset(),
+    "way": frozenset({"has_classifier", "maps_to_cell"}),
+    "bridge": frozenset({"bridge_for_transition", "route_uses_bridge"}),
+    "route": frozenset({"route_contains"}),
+    "variant": frozenset({"variant_of_way", "variant_fits_cell", "variant_uses_bridge"}),
+}
+
+
+@dataclass
+class GraphDiff:
+    cells: list[Cell] = field(default_factory=list)
+    ways: list[TaxonomyItem] = field(default_factory=list)
+    bridges: list[BridgeItem] = field(default_factory=list)
+    routes: list[PathItem] = field(default_factory=list)
+    variants: list[Variant] = field(default_factory=list)
+    removed_cells: list[str] = field(default_factory=list)
+    removed_ways: list[str] = field(default_factory=list)
+    removed_bridges: list[str] = field(default_factory=list)
+    removed_routes: list[str] = field(default_factory=list)
+    removed_variants: list[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not any(
+            (
+                self.cells,
+                self.ways,
+                self.bridges,
+                self.routes,
+                self.variants,
+                self.removed_cells,
+                self.removed_ways,
+                self.removed_bridges,
+                self.removed_routes,
+                self.removed_variants,
+            )
+        )
+
+    @property
+    def touches_transitions(self) -> bool:
+        return bool(self.bridges or self.routes or self.removed_bridges or self.removed_routes)
+
+
+def _changed(old: Iterable[T], new: Iterable[T]) -> tuple[list[T], list[str]]:
+    old_by_id = {item.id: item for item in old}
+    upserted = []
+    new_ids = set()
+    for item in new:
+        new_ids.add(item.id)
+        if old_by_id.get(item.id) != item:
+            upserted.append(item)
+    removed = [item_id for item_id in old_by_id if item_id not in new_ids]
+    return upserted, removed
+
+
+def diff_app_data(old: AppData, new: AppData) -> GraphDiff:
+    cells, removed_cells = _changed(old.cells, new.cells)
+    ways, removed_ways = _changed(old.taxonomy, new.taxonomy)
+    bridges, removed_bridges = _changed(old.bridges, new.bridges)
+    routes, removed_routes = _changed(old.paths, new.paths)
+    variants, removed_variants = _changed(old.variants, new.variants)
+    return GraphDiff(
+        cells=cells,
+        ways=ways,
+        bridges=bridges,
+        routes=routes,
+        variants=variants,
+        removed_cells=removed_cells,
+        removed_ways=removed_ways,
+        removed_bridges=removed_bridges,
+        removed_routes=removed_routes,
+        removed_variants=removed_variants,
+    )
+
+
+def _owned_edge_ids(model: GraphModel, node_id: str, kind: str) -> Iterator[str]:
+    owned = OWNED_EDGE_TYPES[kind]
+    for edge_id in model.incident_edges.get(node_id, ()):
+        if model.edges_by_id[edge_id].type in owned:
+            yield edge_id
+
+
+def _apply_kind(
+    model: GraphModel,
+    kind: str,
+    upserted: list[T],
+    removed: list[str],
+    node_id: Callable[[str], str],
+    build_node: Callable[[T], GraphNode],
+    build_edges: Callable[[T], Iterable[GraphEdge]] | None,
+) -> None:
+    stale = [node_id(item.id) for item in upserted] + [node_id(item_id) for item_id in removed]
+    if not stale:
+        return
+    model.remove_edges([edge_id for stale_id in stale for edge_id in _owned_edge_ids(model, stale_id, kind)])
+    model.remove_nodes(stale)
+    for item in upserted:
+        model.add_node(build_node(item))
+        if build_edges is not None:
+            for edge in build_edges(item):
+                model.add_edge(edge)
+
+
+def _sync_transitions(model: GraphModel, data: AppData) -> None:
+    expected = {
+        transition_edge(from_cell, to_cell).id: (from_cell, to_cell)
+        for from_cell, to_cell in transition_pairs(data.bridges, data.paths)
+    }
+    current = set(model.edges_by_type.get("transition", ()))
+    model.remove_edges(sorted(current - set(expected)))
+    for edge_id in sorted(set(expected) - current):
+        model.add_edge(transition_edge(*expected[edge_id]))
+
+
+def apply_graph_diff(model: GraphModel, diff: GraphDiff, data: AppData) -> GraphModel:
+    # Модель меняется на месте; data — данные уже после изменения.
+    if diff.is_empty():
+        return model
+    _apply_kind(model, "cell", diff.cells, diff.removed_cells, cell_node_id, cell_node, None)
+    _apply_kind(model, "way", diff.ways, diff.removed_ways, way_node_id, way_node, way_edges)
+    _apply_kind(model, "bridge", diff.bridges, diff.removed_bridges, bridge_node_id, bridge_node, bridge_edges)
+    _apply_kind(model, "route", diff.routes, diff.removed_routes, route_node_id, route_node, route_edges)
+    _apply_kind(
+        model, "variant", diff.variants, diff.removed_variants, variant_node_id, variant_node, variant_edges
+    )
+    if diff.touches_transitions:
+        # Переходы выводятся из всех мостов и маршрутов сразу; их немного, поэтому пересчитываются целиком.
+        _sync_transitions(model, data)
+    return model
+
+
+def update_graph_model(model: GraphModel, old: AppData, new: AppData) -> GraphModel:
+    return apply_graph_diff(model, diff_app_data(old, new), new)
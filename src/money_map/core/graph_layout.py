@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from money_map.core.graph_model import GraphModel
+
+# Кольца раскладки от центра к краю; типы, которых нет в списке, идут последними.
+LAYER_ORDER = ("cell", "route", "bridge", "way", "classifier", "variant")
+
+
+def layout_layered_positions(
+    model: GraphModel,
+    layer_order: Sequence[str] = LAYER_ORDER,
+    inner_radius: float = 160,
+    layer_gap: float = 220,
+    ring_gap: float = 70,
+    node_spacing: float = 90,
+) -> Dict[str, Tuple[float, float]]:
+    layers: List[List[str]] = [sorted(model.nodes_by_type.get(node_type, ())) for node_type in layer_order]
+    extra_types = sorted(set(model.nodes_by_type) - set(layer_order))
+    layers.extend(sorted(model.nodes_by_type[node_type]) for node_type in extra_types)
+
+    positions: Dict[str, Tuple[float, float]] = {}
+    directions: Dict[str, Tuple[float, float]] = {}
+    radius = inner_radius
+    for node_ids in layers:
+        if not node_ids:
+            continue
+        ordered = _order_by_neighbors(model, node_ids, directions)
+        rings = max(1, math.ceil(len(ordered) * node_spacing / (2 * math.pi * radius)))
+        step = 2 * math.pi / len(ordered)
+        for index, node_id in enumerate(ordered):
+            angle = step * index - math.pi / 2
+            ring_radius = radius + (index % rings) * ring_gap
+            cos_angle = math.cos(angle)
+            sin_angle = math.sin(angle)
+            directions[node_id] = (cos_angle, sin_angle)
+            positions[node_id] = (round(ring_radius * cos_angle, 1), round(ring_radius * sin_angle, 1))
+        radius += (rings - 1) * ring_gap + layer_gap
+    return positions
+
+
+def _order_by_neighbors(
+    model: GraphModel,
+    node_ids: Iterable[str],
+    directions: Dict[str, Tuple[float, float]],
+) -> List[str]:
+    # Узел ставится под средним углом уже размещённых соседей (барицентр на окружности),
+    # так связанные узлы соседних колец оказываются рядом и рёбра меньше пересекаются.
+    placed: List[Tuple[float, str]] = []
+    unplaced: List[str] = []
+    for node_id in node_ids:
+        sin_sum = 0.0
+        cos_sum = 0.0
+        for neighbor in model.adjacency.get(node_id, ()):
+            direction = directions.get(neighbor)
+            if direction is not None:
+                cos_sum += direction[0]
+                sin_sum += direction[1]
+        if sin_sum or cos_sum:
+            placed.append(((math.atan2(sin_sum, cos_sum) + math.pi / 2) % (2 * math.pi), node_id))
+        else:
+            unplaced.append(node_id)
+    placed.sort()
+    return [node_id for _, node_id in placed] + unplaced
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import heapq
+from collections import deque
 from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Mapping
 
-from money_map.core.model import AppData
+from money_map.core.model import AppData, BridgeItem, Cell, PathItem, TaxonomyItem, Variant
 
 
 @dataclass(frozen=True)
@@ -33,88 +36,131 @@ class GraphModel:
     incident_edges: dict[str, set[str]]
     edges_by_type: dict[str, set[str]]
     nodes_by_type: dict[str, set[str]]
+    # Позиции в nodes/edges строятся при первом удалении, чтобы удалять за O(1).
+    node_positions: dict[str, int] | None = field(default=None, repr=False, compare=False)
+    edge_positions: dict[str, int] | None = field(default=None, repr=False, compare=False)
 
+    @classmethod
+    def empty(cls) -> GraphModel:
+        return cls(
+            nodes=[],
+            edges=[],
+            nodes_by_id={},
+            edges_by_id={},
+            adjacency={},
+            incident_edges={},
+            edges_by_type={},
+            nodes_by_type={},
+        )
 
-def _add_node(
-    nodes: list[GraphNode],
-    nodes_by_id: dict[str, GraphNode],
-    nodes_by_type: dict[str, set[str]],
-    node_id: str,
-    label: str,
-    node_type: str,
-    meta: dict[str, object] | None = None,
-) -> None:
-    if node_id in nodes_by_id:
-        return
-    payload = GraphNode(id=node_id, label=label, type=node_type, meta=meta or {})
-    nodes.append(payload)
-    nodes_by_id[node_id] = payload
-    nodes_by_type.setdefault(node_type, set()).add(node_id)
-
-
-def _add_edge(
-    edges: list[GraphEdge],
-    edges_by_id: dict[str, GraphEdge],
-    edges_by_type: dict[str, set[str]],
-    adjacency: dict[str, set[str]],
-    incident_edges: dict[str, set[str]],
-    edge_id: str,
-    source: str,
-    target: str,
-    label: str,
-    edge_type: str,
-    meta: dict[str, object] | None = None,
-) -> None:
-    if edge_id in edges_by_id:
+    def add_node(self, node: GraphNode) -> None:
+        if node.id in self.nodes_by_id:
+            return
+        if self.node_positions is not None:
+            self.node_positions[node.id] = len(self.nodes)
+        self.nodes.append(node)
+        self.nodes_by_id[node.id] = node
+        self.nodes_by_type.setdefault(node.type, set()).add(node.id)
+
+    def add_edge(self, edge: GraphEdge) -> None:
+        if edge.id in self.edges_by_id:
+            return
+        if self.edge_positions is not None:
+            self.edge_positions[edge.id] = len(self.edges)
+        self.edges.append(edge)
+        self.edges_by_id[edge.id] = edge
+        self.edges_by_type.setdefault(edge.type, set()).add(edge.id)
+        self.adjacency.setdefault(edge.source, set()).add(edge.target)
+        self.adjacency.setdefault(edge.target, set()).add(edge.source)
+        self.incident_edges.setdefault(edge.source, set()).add(edge.id)
+        self.incident_edges.setdefault(edge.target, set()).add(edge.id)
+
+    def remove_edges(self, edge_ids: Iterable[str]) -> None:
+        for edge_id in edge_ids:
+            edge = self.edges_by_id.pop(edge_id, None)
+            if edge is None:
+                continue
+            if self.edge_positions is None:
+                self.edge_positions = {item.id: index for index, item in enumerate(self.edges)}
+            _swap_remove(self.edges, self.edge_positions, edge_id)
+            _discard(self.edges_by_type, edge.type, edge_id)
+            _discard(self.incident_edges, edge.source, edge_id)
+            _discard(self.incident_edges, edge.target, edge_id)
+            if not self._connected(edge.source, edge.target):
+                _discard(self.adjacency, edge.source, edge.target)
+                _discard(self.adjacency, edge.target, edge.source)
+
+    def remove_nodes(self, node_ids: Iterable[str]) -> None:
+        # Рёбра узла не трогаются: как и при полной сборке, они могут ссылаться на отсутствующий узел.
+        for node_id in node_ids:
+            node = self.nodes_by_id.pop(node_id, None)
+            if node is None:
+                continue
+            if self.node_positions is None:
+                self.node_positions = {item.id: index for index, item in enumerate(self.nodes)}
+            _swap_remove(self.nodes, self.node_positions, node_id)
+            _discard(self.nodes_by_type, node.type, node_id)
+
+    def _connected(self, source: str, target: str) -> bool:
+        source_edges = self.incident_edges.get(source, set())
+        target_edges = self.incident_edges.get(target, set())
+        if len(source_edges) > len(target_edges):
+            source_edges, target_edges = target_edges, source_edges
+        for edge_id in source_edges:
+            edge = self.edges_by_id[edge_id]
+            if {edge.source, edge.target} == {source, target}:
+                return True
+        return False
+
+
+def _swap_remove(items: list, positions: dict[str, int], item_id: str) -> None:
+    # На место удалённого встаёт последний элемент: порядок списка не сохраняется.
+    index = positions.pop(item_id)
+    last = items.pop()
+    if index < len(items):
+        items[index] = last
+        positions[last.id] = index
+
+
+def _discard(index: dict[str, set[str]], key: str, value: str) -> None:
+    values = index.get(key)
+    if values is None:
         return
-    payload = GraphEdge(
-        id=edge_id,
-        source=source,
-        target=target,
-        label=label,
-        type=edge_type,
-        meta=meta or {},
-    )
-    edges.append(payload)
-    edges_by_id[edge_id] = payload
-    edges_by_type.setdefault(edge_type, set()).add(edge_id)
-    adjacency.setdefault(source, set()).add(target)
-    adjacency.setdefault(target, set()).add(source)
-    incident_edges.setdefault(source, set()).add(edge_id)
-    incident_edges.setdefault(target, set()).add(edge_id)
+    values.discard(value)
+    if not values:
+        del index[key]
 
 
-def build_base_graph(data: AppData) -> GraphModel:
-    nodes: list[GraphNode] = []
-    edges: list[GraphEdge] = []
-    nodes_by_id: dict[str, GraphNode] = {}
-    edges_by_id: dict[str, GraphEdge] = {}
-    adjacency: dict[str, set[str]] = {}
-    incident_edges: dict[str, set[str]] = {}
-    edges_by_type: dict[str, set[str]] = {}
-    nodes_by_type: dict[str, set[str]] = {}
+def cell_node_id(cell_id: str) -> str:
+    return f"cell:{cell_id}"
+
 
+def way_node_id(way_id: str) -> str:
+    return f"way:{way_id}"
+
+
+def classifier_node_id(group: str, classifier_id: str) -> str:
+    return f"classifier:{group}.{classifier_id}"
+
+
+def bridge_node_id(bridge_id: str) -> str:
+    return f"bridge:{bridge_id}"
+
+
+def route_node_id(route_id: str) -> str:
+    return f"route:{route_id}"
+
+
+def variant_node_id(variant_id: str) -> str:
+    return f"variant:{variant_id}"
+
+
+def iter_base_nodes(data: AppData) -> Iterator[GraphNode]:
     for cell in data.cells:
-        _add_node(
-            nodes,
-            nodes_by_id,
-            nodes_by_type,
-            f"cell:{cell.id}",
-            f"{cell.id} {cell.label}",
-            "cell",
-            {"cell_id": cell.id},
-        )
+        yield cell_node(cell)
 
     for item in data.taxonomy:
-        _add_node(
-            nodes,
-            nodes_by_id,
-            nodes_by_type,
-            f"way:{item.id}",
-            item.name,
-            "way",
-            {"way_id": item.id},
-        )
+        yield way_node(item)
 
     for group_key, items in (
         ("what_sell", data.mappings.sell_items),
@@ -122,238 +168,358 @@ def build_base_graph(data: AppData) -> GraphModel:
         ("value_measure", data.mappings.value_measures),
     ):
         for item_id, mapping in items.items():
-            _add_node(
-                nodes,
-                nodes_by_id,
-                nodes_by_type,
-                f"classifier:{group_key}.{item_id}",
-                mapping.label,
-                "classifier",
-                {"group": group_key, "classifier_id": item_id},
+            yield GraphNode(
+                id=classifier_node_id(group_key, item_id),
+                label=mapping.label,
+                type="classifier",
+                meta={"group": group_key, "classifier_id": item_id},
             )
 
     for bridge in data.bridges:
-        _add_node(
-            nodes,
-            nodes_by_id,
-            nodes_by_type,
-            f"bridge:{bridge.id}",
-            bridge.name,
-            "bridge",
-            {"bridge_id": bridge.id},
-        )
+        yield bridge_node(bridge)
 
     for path in data.paths:
-        _add_node(
-            nodes,
-            nodes_by_id,
-            nodes_by_type,
-            f"route:{path.id}",
-            path.name,
-            "route",
-            {"route_id": path.id},
-        )
+        yield route_node(path)
 
     for variant in data.variants:
-        _add_node(
-            nodes,
-            nodes_by_id,
-            nodes_by_type,
-            f"variant:{variant.id}",
-            variant.title,
-            "variant",
-            {"variant_id": variant.id},
+        yield variant_node(variant)
+
+
+def cell_node(cell: Cell) -> GraphNode:
+    return GraphNode(
+        id=cell_node_id(cell.id),
+        label=f"{cell.id} {cell.label}",
+        type="cell",
+        meta={"cell_id": cell.id},
+    )
+
+
+def way_node(item: TaxonomyItem) -> GraphNode:
+    return GraphNode(id=way_node_id(item.id), label=item.name, type="way", meta={"way_id": item.id})
+
+
+def bridge_node(bridge: BridgeItem) -> GraphNode:
+    return GraphNode(
+        id=bridge_node_id(bridge.id),
+        label=bridge.name,
+        type="bridge",
+        meta={"bridge_id": bridge.id},
+    )
+
+
+def route_node(path: PathItem) -> GraphNode:
+    return GraphNode(
+        id=route_node_id(path.id),
+        label=path.name,
+        type="route",
+        meta={"route_id": path.id},
+    )
+
+
+def variant_node(variant: Variant) -> GraphNode:
+    return GraphNode(
+        id=variant_node_id(variant.id),
+        label=variant.title,
+        type="variant",
+        meta={"variant_id": variant.id},
+    )
+
+
+def way_edges(item: TaxonomyItem) -> Iterator[GraphEdge]:
+    way_id = way_node_id(item.id)
+    for tag in item.sell:
+        yield GraphEdge(
+            id=f"has_classifier:{item.id}:sell:{tag}",
+            source=way_id,
+            target=classifier_node_id("what_sell", tag),
+            label="продаёт",
+            type="has_classifier",
+            meta={"group": "what_sell"},
+        )
+    for tag in item.to_whom:
+        yield GraphEdge(
+            id=f"has_classifier:{item.id}:to:{tag}",
+            source=way_id,
+            target=classifier_node_id("to_whom", tag),
+            label="кому",
+            type="has_classifier",
+            meta={"group": "to_whom"},
+        )
+    for tag in item.value:
+        yield GraphEdge(
+            id=f"has_classifier:{item.id}:value:{tag}",
+            source=way_id,
+            target=classifier_node_id("value_measure", tag),
+            label="ценность",
+            type="has_classifier",
+            meta={"group": "value_measure"},
+        )
+    for cell_id in item.typical_cells:
+        yield GraphEdge(
+            id=f"maps_to_cell:{item.id}:{cell_id}",
+            source=way_id,
+            target=cell_node_id(cell_id),
+            label="типичная ячейка",
+            type="maps_to_cell",
         )
 
-    for item in data.taxonomy:
-        way_id = f"way:{item.id}"
-        for tag in item.sell:
-            target = f"classifier:what_sell.{tag}"
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"has_classifier:{item.id}:sell:{tag}",
-                way_id,
-                target,
-                "продаёт",
-                "has_classifier",
-                {"group": "what_sell"},
-            )
-        for tag in item.to_whom:
-            target = f"classifier:to_whom.{tag}"
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"has_classifier:{item.id}:to:{tag}",
-                way_id,
-                target,
-                "кому",
-                "has_classifier",
-                {"group": "to_whom"},
-            )
-        for tag in item.value:
-            target = f"classifier:value_measure.{tag}"
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"has_classifier:{item.id}:value:{tag}",
-                way_id,
-                target,
-                "ценность",
-                "has_classifier",
-                {"group": "value_measure"},
-            )
-        for cell_id in item.typical_cells:
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"maps_to_cell:{item.id}:{cell_id}",
-                way_id,
-                f"cell:{cell_id}",
-                "типичная ячейка",
-                "maps_to_cell",
-            )
 
+def transition_pairs(bridges: Iterable[BridgeItem], paths: Iterable[PathItem]) -> set[tuple[str, str]]:
     transitions: set[tuple[str, str]] = set()
-    for bridge in data.bridges:
+    for bridge in bridges:
         transitions.add((bridge.from_cell, bridge.to_cell))
-    for path in data.paths:
+    for path in paths:
         for idx in range(len(path.sequence) - 1):
             transitions.add((path.sequence[idx], path.sequence[idx + 1]))
+    return transitions
+
+
+def transition_edge(from_cell: str, to_cell: str) -> GraphEdge:
+    return GraphEdge(
+        id=f"transition:{from_cell}->{to_cell}",
+        source=cell_node_id(from_cell),
+        target=cell_node_id(to_cell),
+        label=f"{from_cell} → {to_cell}",
+        type="transition",
+    )
 
-    for from_cell, to_cell in sorted(transitions):
-        transition_id = f"transition:{from_cell}->{to_cell}"
-        _add_edge(
-            edges,
-            edges_by_id,
-            edges_by_type,
-            adjacency,
-            incident_edges,
-            transition_id,
-            f"cell:{from_cell}",
-            f"cell:{to_cell}",
-            f"{from_cell} → {to_cell}",
-            "transition",
+
+def bridge_edges(bridge: BridgeItem) -> Iterator[GraphEdge]:
+    bridge_id = bridge_node_id(bridge.id)
+    yield GraphEdge(
+        id=f"bridge_for_transition:{bridge.id}:from",
+        source=bridge_id,
+        target=cell_node_id(bridge.from_cell),
+        label="из",
+        type="bridge_for_transition",
+    )
+    yield GraphEdge(
+        id=f"bridge_for_transition:{bridge.id}:to",
+        source=bridge_id,
+        target=cell_node_id(bridge.to_cell),
+        label="в",
+        type="bridge_for_transition",
+    )
+    for route_id in bridge.linked_route_ids:
+        yield GraphEdge(
+            id=f"route_uses_bridge:{route_id}:{bridge.id}",
+            source=route_node_id(route_id),
+            target=bridge_id,
+            label="использует",
+            type="route_uses_bridge",
         )
 
-    for bridge in data.bridges:
-        bridge_id = f"bridge:{bridge.id}"
-        from_cell = f"cell:{bridge.from_cell}"
-        to_cell = f"cell:{bridge.to_cell}"
-        _add_edge(
-            edges,
-            edges_by_id,
-            edges_by_type,
-            adjacency,
-            incident_edges,
-            f"bridge_for_transition:{bridge.id}:from",
-            bridge_id,
-            from_cell,
-            "из",
-            "bridge_for_transition",
+
+def route_edges(path: PathItem) -> Iterator[GraphEdge]:
+    route_id = route_node_id(path.id)
+    for cell_id in path.sequence:
+        yield GraphEdge(
+            id=f"route_contains:{path.id}:{cell_id}",
+            source=route_id,
+            target=cell_node_id(cell_id),
+            label="содержит",
+            type="route_contains",
         )
-        _add_edge(
-            edges,
-            edges_by_id,
-            edges_by_type,
-            adjacency,
-            incident_edges,
-            f"bridge_for_transition:{bridge.id}:to",
-            bridge_id,
-            to_cell,
-            "в",
-            "bridge_for_transition",
+
+
+def variant_edges(variant: Variant) -> Iterator[GraphEdge]:
+    variant_id = variant_node_id(variant.id)
+    yield GraphEdge(
+        id=f"variant_of_way:{variant.id}:{variant.primary_way_id}",
+        source=variant_id,
+        target=way_node_id(variant.primary_way_id),
+        label="вариант",
+        type="variant_of_way",
+    )
+    for cell_id in variant.matrix_cells:
+        yield GraphEdge(
+            id=f"variant_fits_cell:{variant.id}:{cell_id}",
+            source=variant_id,
+            target=cell_node_id(cell_id),
+            label="подходит",
+            type="variant_fits_cell",
         )
-        for route_id in bridge.linked_route_ids:
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"route_uses_bridge:{route_id}:{bridge.id}",
-                f"route:{route_id}",
-                bridge_id,
-                "использует",
-                "route_uses_bridge",
-            )
+    for bridge_id in variant.bridge_ids:
+        yield GraphEdge(
+            id=f"variant_uses_bridge:{variant.id}:{bridge_id}",
+            source=variant_id,
+            target=bridge_node_id(bridge_id),
+            label="использует",
+            type="variant_uses_bridge",
+        )
+
+
+def iter_base_edges(data: AppData) -> Iterator[GraphEdge]:
+    for item in data.taxonomy:
+        yield from way_edges(item)
+
+    for from_cell, to_cell in sorted(transition_pairs(data.bridges, data.paths)):
+        yield transition_edge(from_cell, to_cell)
+
+    for bridge in data.bridges:
+        yield from bridge_edges(bridge)
 
     for path in data.paths:
-        route_id = f"route:{path.id}"
-        for cell_id in path.sequence:
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"route_contains:{path.id}:{cell_id}",
-                route_id,
-                f"cell:{cell_id}",
-                "содержит",
-                "route_contains",
-            )
+        yield from route_edges(path)
 
     for variant in data.variants:
-        variant_id = f"variant:{variant.id}"
-        _add_edge(
-            edges,
-            edges_by_id,
-            edges_by_type,
-            adjacency,
-            incident_edges,
-            f"variant_of_way:{variant.id}:{variant.primary_way_id}",
-            variant_id,
-            f"way:{variant.primary_way_id}",
-            "вариант",
-            "variant_of_way",
-        )
-        for cell_id in variant.matrix_cells:
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"variant_fits_cell:{variant.id}:{cell_id}",
-                variant_id,
-                f"cell:{cell_id}",
-                "подходит",
-                "variant_fits_cell",
-            )
-        for bridge_id in variant.bridge_ids:
-            _add_edge(
-                edges,
-                edges_by_id,
-                edges_by_type,
-                adjacency,
-                incident_edges,
-                f"variant_uses_bridge:{variant.id}:{bridge_id}",
-                variant_id,
-                f"bridge:{bridge_id}",
-                "использует",
-                "variant_uses_bridge",
+        yield from variant_edges(variant)
+
+
+def build_base_graph(data: AppData) -> GraphModel:
+    model = GraphModel.empty()
+    for node in iter_base_nodes(data):
+        model.add_node(node)
+    for edge in iter_base_edges(data):
+        model.add_edge(edge)
+    return model
+
+
+def filter_graph(
+    model: GraphModel,
+    node_types: Iterable[str] | None = None,
+    edge_types: Iterable[str] | None = None,
+) -> GraphModel:
+    allowed_nodes = set(node_types) if node_types is not None else set(model.nodes_by_type)
+    allowed_edges = set(edge_types) if edge_types is not None else set(model.edges_by_type)
+    view = GraphModel.empty()
+    # Узлы и рёбра — неизменяемые dataclass, поэтому представление их не копирует.
+    for node in model.nodes:
+        if node.type in allowed_nodes:
+            view.add_node(node)
+    for edge in model.edges:
+        if (
+            edge.type in allowed_edges
+            and edge.source in view.nodes_by_id
+            and edge.target in view.nodes_by_id
+        ):
+            view.add_edge(edge)
+    return view
+
+
+@dataclass(frozen=True)
+class Neighborhood:
+    center_id: str
+    node_ids: list[str]
+    edge_ids: list[str]
+    highlight_edge_ids: set[str]
+    truncated: bool
+
+
+def extract_neighborhood(
+    model: GraphModel,
+    center_id: str,
+    *,
+    depth: int = 1,
+    max_nodes: int = 60,
+    node_types: Iterable[str] | None = None,
+    edge_types: Iterable[str] | None = None,
+    rank: Mapping[str, float] | None = None,
+) -> Neighborhood:
+    if center_id not in model.nodes_by_id:
+        return Neighborhood(center_id, [], [], set(), False)
+
+    allowed_nodes = set(node_types) if node_types is not None else None
+    allowed_edges = set(edge_types) if edge_types is not None else None
+    nodes_by_id = model.nodes_by_id
+    edges_by_id = model.edges_by_id
+    incident_edges = model.incident_edges
+
+    def node_allowed(node_id: str) -> bool:
+        node = nodes_by_id.get(node_id)
+        return node is not None and (allowed_nodes is None or node.type in allowed_nodes)
+
+    def allowed_incident(node_id: str) -> Iterator[GraphEdge]:
+        for edge_id in incident_edges.get(node_id, ()):
+            edge = edges_by_id[edge_id]
+            if allowed_edges is None or edge.type in allowed_edges:
+                yield edge
+
+    if not node_allowed(center_id):
+        return Neighborhood(center_id, [center_id], [], set(), False)
+
+    # Стоимость обхода определяется рёбрами, инцидентными раскрытым узлам,
+    # а не размером всего графа. Рёбра раскрытых узлов запоминаются сразу.
+    distances: dict[str, int] = {center_id: 0}
+    expanded_edges: list[GraphEdge] = []
+    queue: deque[str] = deque([center_id])
+    while queue:
+        node_id = queue.popleft()
+        dist = distances[node_id]
+        if dist >= depth:
+            continue
+        for edge_id in incident_edges.get(node_id, ()):
+            edge = edges_by_id[edge_id]
+            if allowed_edges is not None and edge.type not in allowed_edges:
+                continue
+            neighbor = edge.target if edge.source == node_id else edge.source
+            if neighbor not in distances:
+                if not node_allowed(neighbor):
+                    continue
+                distances[neighbor] = dist + 1
+                queue.append(neighbor)
+            expanded_edges.append(edge)
+
+    kept = list(distances)
+    truncated = len(kept) > max_nodes
+    if truncated:
+        first_neighbors = [node_id for node_id in kept if distances[node_id] == 1]
+        if 1 + len(first_neighbors) > max_nodes:
+            kept = [center_id] + _top_by_degree(model, first_neighbors, max_nodes - 1, rank)
+        else:
+            remaining = [node_id for node_id in kept if distances[node_id] > 1]
+            kept = (
+                [center_id]
+                + first_neighbors
+                + _top_by_degree(model, remaining, max_nodes - 1 - len(first_neighbors), rank)
             )
 
-    return GraphModel(
-        nodes=nodes,
-        edges=edges,
-        nodes_by_id=nodes_by_id,
-        edges_by_id=edges_by_id,
-        adjacency=adjacency,
-        incident_edges=incident_edges,
-        edges_by_type=edges_by_type,
-        nodes_by_type=nodes_by_type,
+    kept_set = set(kept)
+    edge_ids = {
+        edge.id
+        for edge in expanded_edges
+        if edge.source in kept_set and edge.target in kept_set
+    }
+
+    # Рёбра между нераскрытыми узлами границы находим пересечением множеств
+    # инцидентных рёбер пары: это O(min(степеней)) на стороне C, без обхода хабов.
+    frontier = {node_id for node_id in kept if distances[node_id] >= depth}
+    for node_id in frontier:
+        for neighbor in frontier.intersection(model.adjacency.get(node_id, ())):
+            if neighbor <= node_id:
+                continue
+            shared = incident_edges.get(node_id, set()) & incident_edges.get(neighbor, set())
+            for edge_id in shared:
+                if allowed_edges is None or edges_by_id[edge_id].type in allowed_edges:
+                    edge_ids.add(edge_id)
+
+    highlight_edge_ids = {edge.id for edge in allowed_incident(center_id)}
+    return Neighborhood(
+        center_id=center_id,
+        node_ids=kept,
+        edge_ids=sorted(edge_ids),
+        highlight_edge_ids=highlight_edge_ids,
+        truncated=truncated,
     )
+
+
+def _degree(model: GraphModel, node_id: str) -> int:
+    return len(model.adjacency.get(node_id, ()))
+
+
+def _top_by_degree(
+    model: GraphModel,
+    node_ids: list[str],
+    limit: int,
+    rank: Mapping[str, float] | None = None,
+) -> list[str]:
+    if limit <= 0:
+        return []
+    if rank is not None:
+        # Заранее посчитанная важность (например, PageRank), степень — при равенстве.
+        return heapq.nsmallest(
+            limit,
+            node_ids,
+            key=lambda node_id: (-rank.get(node_id, 0.0), -_degree(model, node_id), node_id),
+        )
+    return heapq.nsmallest(limit, node_ids, key=lambda node_id: (-_degree(model, node_id), node_id))
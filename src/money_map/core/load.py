@@ -24,6 +24,7 @@ from money_map.core.model import (
     Variant,
     WorkFormatDefinition,
 )
+from money_map.core.routing import build_routing_table
 from money_map.domain.activity_tagging import auto_tag_layers, auto_tag_variant
 
 DATA_FILES = {
@@ -48,7 +49,7 @@ def _load_json(path: Path) -> Dict[str, Any]:
         return json.load(handle)
 
 
-def _data_dir() -> Path:
+def resolve_data_dir() -> Path:
     override = os.environ.get("MONEY_MAP_DATA_DIR")
     if override:
         return Path(override)
@@ -198,7 +199,7 @@ def _apply_auto_tagging(
 
 
 def load_app_data() -> AppData:
-    data_dir = _data_dir()
+    data_dir = resolve_data_dir()
     raw: Dict[str, Dict[str, Any]] = {}
     for key, filename in DATA_FILES.items():
         path = data_dir / filename
@@ -223,13 +224,16 @@ def load_app_data() -> AppData:
         for cell_id in variant.matrix_cells:
             variants_by_cell.setdefault(cell_id, []).append(variant)
 
+    cells = [Cell(**item) for item in raw["cells"].get("cells", [])]
+    bridges = [BridgeItem(**item) for item in raw["bridges"].get("bridges", [])]
+
     return AppData(
         axes=[Axis(**item) for item in raw["axes"].get("axes", [])],
-        cells=[Cell(**item) for item in raw["cells"].get("cells", [])],
+        cells=cells,
         taxonomy=[TaxonomyItem(**item) for item in raw["taxonomy"].get("taxonomy", [])],
         mappings=Mappings(**raw["mappings"]),
         paths=[PathItem(**item) for item in raw["paths"].get("paths", [])],
-        bridges=[BridgeItem(**item) for item in raw["bridges"].get("bridges", [])],
+        bridges=bridges,
         diagrams=DiagramConfig(**raw["diagrams"]),
         keywords=Keywords(**raw["keywords"]),
         activity_profiles=activity_profiles,
@@ -242,4 +246,5 @@ def load_app_data() -> AppData:
         variants_by_way_id=variants_by_way,
         variants_by_cell_id=variants_by_cell,
         variant_by_id=variants_by_id,
+        routing=build_routing_table(cells, bridges),
     )
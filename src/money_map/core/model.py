@@ -155,6 +155,16 @@ class Keywords(BaseModel):
     keywords: Dict[str, object]
 
 
+class RoutingTable(BaseModel):
+    # Ячейки и мосты ("id:from->to"), по которым построена таблица; индексы ниже — позиции в этих мостах.
+    source: List[str] = Field(default_factory=list)
+    cells: List[str] = Field(default_factory=list)
+    shortest_paths: Dict[str, List[str]] = Field(default_factory=dict)
+    alternative_paths: Dict[str, List[List[str]]] = Field(default_factory=dict)
+    bridges_by_transition: Dict[str, List[int]] = Field(default_factory=dict)
+    outgoing_bridges: Dict[str, List[int]] = Field(default_factory=dict)
+
+
 class AppData(BaseModel):
     axes: List[Axis]
     cells: List[Cell]
@@ -174,3 +184,4 @@ class AppData(BaseModel):
     variants_by_way_id: Dict[str, List[Variant]] = Field(default_factory=dict)
     variants_by_cell_id: Dict[str, List[Variant]] = Field(default_factory=dict)
     variant_by_id: Dict[str, Variant] = Field(default_factory=dict)
+    routing: RoutingTable = Field(default_factory=RoutingTable)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from money_map.core.model import AppData, BridgeItem, PathItem, TaxonomyItem, Variant
+from money_map.core.routing import routing_table, transition_key
+from money_map.core.variant_index import mask_from_rows
+
+
+@dataclass(frozen=True)
+class BridgeRelations:
+    # Связи мост ↔ способы ↔ маршруты ↔ варианты ↔ переходы. Мосты, способы и маршруты —
+    # индексы в data.bridges / data.taxonomy / data.paths, варианты — маски строк data.variants.
+    bridge_row: Dict[str, int]
+    # Переход "A1->A2" -> мосты в порядке объявления.
+    bridges_by_transition: Dict[str, Tuple[int, ...]]
+    # Ячейка -> переходы с мостами из неё, по алфавиту.
+    transitions_from: Dict[str, Tuple[str, ...]]
+    # Ячейка -> мосты, у которых она начало или конец.
+    bridges_by_cell: Dict[str, Tuple[int, ...]]
+    ways_by_cell: Dict[str, Tuple[int, ...]]
+    # id моста -> способы ячеек начала и конца, без повторов, по названию.
+    ways_by_bridge: Dict[str, Tuple[int, ...]]
+    # id моста -> маршруты, где ячейка начала встречается раньше ячейки конца, по названию.
+    routes_by_bridge: Dict[str, Tuple[int, ...]]
+    # id маршрута -> переходы маршрута по порядку.
+    transitions_by_route: Dict[str, Tuple[str, ...]]
+    # Переход -> варианты, у которых в matrix_cells есть обе ячейки (в любом порядке).
+    variants_by_transition: Dict[str, int]
+    # id моста -> варианты, где мост указан в bridge_ids.
+    variants_by_bridge: Dict[str, int]
+
+    def bridge(self, data: AppData, bridge_id: Optional[str]) -> Optional[BridgeItem]:
+        row = self.bridge_row.get(bridge_id) if bridge_id else None
+        return data.bridges[row] if row is not None else None
+
+    def transition_bridges(self, data: AppData, start: str, end: str) -> List[BridgeItem]:
+        rows = self.bridges_by_transition.get(transition_key(start, end), ())
+        return [data.bridges[row] for row in rows]
+
+    def bridge_ways(self, data: AppData, bridge_id: str) -> List[TaxonomyItem]:
+        return [data.taxonomy[row] for row in self.ways_by_bridge.get(bridge_id, ())]
+
+    def bridge_routes(self, data: AppData, bridge_id: str) -> List[PathItem]:
+        return [data.paths[row] for row in self.routes_by_bridge.get(bridge_id, ())]
+
+    def transition_variants(self, start: str, end: str) -> int:
+        return self.variants_by_transition.get(transition_key(start, end), 0)
+
+
+def _ways_by_cell(ways: Sequence[TaxonomyItem]) -> Dict[str, List[int]]:
+    grouped: Dict[str, List[int]] = {}
+    for row, item in enumerate(ways):
+        for cell_id in item.typical_cells:
+            grouped.setdefault(cell_id, []).append(row)
+    return grouped
+
+
+def _routes_by_transition(paths: Sequence[PathItem]) -> Dict[str, List[int]]:
+    # Пара (a, b) маршрута подходит, если первое вхождение a раньше первого вхождения b.
+    grouped: Dict[str, List[int]] = {}
+    for row, path in enumerate(paths):
+        cells = list(dict.fromkeys(path.sequence))
+        for position, start in enumerate(cells):
+            for end in cells[position + 1 :]:
+                grouped.setdefault(transition_key(start, end), []).append(row)
+    return grouped
+
+
+def _variants_by_transition(variants: Sequence[Variant]) -> Dict[str, int]:
+    rows: Dict[str, List[int]] = {}
+    for row, variant in enumerate(variants):
+        cells = variant.matrix_cells
+        for position, start in enumerate(cells):
+            for end in cells[position + 1 :]:
+                rows.setdefault(transition_key(start, end), []).append(row)
+                rows.setdefault(transition_key(end, start), []).append(row)
+    return {key: mask_from_rows(items, len(variants)) for key, items in rows.items()}
+
+
+def _variants_by_bridge(variants: Sequence[Variant]) -> Dict[str, int]:
+    rows: Dict[str, List[int]] = {}
+    for row, variant in enumerate(variants):
+        for bridge_id in variant.bridge_ids:
+            rows.setdefault(bridge_id, []).append(row)
+    return {key: mask_from_rows(items, len(variants)) for key, items in rows.items()}
+
+
+def build_bridge_relations(data: AppData) -> BridgeRelations:
+    table = routing_table(data)
+    bridges_by_transition = {key: tuple(rows) for key, rows in table.bridges_by_transition.items()}
+
+    transitions_from: Dict[str, List[str]] = {}
+    for key in sorted(bridges_by_transition):
+        transitions_from.setdefault(key.split("->", maxsplit=1)[0], []).append(key)
+
+    bridges_by_cell: Dict[str, List[int]] = {}
+    for row, bridge in enumerate(data.bridges):
+        bridges_by_cell.setdefault(bridge.from_cell, []).append(row)
+        if bridge.to_cell != bridge.from_cell:
+            bridges_by_cell.setdefault(bridge.to_cell, []).append(row)
+
+    ways_by_cell = _ways_by_cell(data.taxonomy)
+    routes_by_transition = _routes_by_transition(data.paths)
+    ways_by_bridge: Dict[str, Tuple[int, ...]] = {}
+    routes_by_bridge: Dict[str, Tuple[int, ...]] = {}
+    for bridge in data.bridges:
+        related = dict.fromkeys(
+            ways_by_cell.get(bridge.from_cell, []) + ways_by_cell.get(bridge.to_cell, []),
+        )
+        ways_by_bridge[bridge.id] = tuple(sorted(related, key=lambda row: data.taxonomy[row].name))
+        routes = routes_by_transition.get(transition_key(bridge.from_cell, bridge.to_cell), [])
+        routes_by_bridge[bridge.id] = tuple(sorted(routes, key=lambda row: data.paths[row].name))
+
+    return BridgeRelations(
+        bridge_row={bridge.id: row for row, bridge in enumerate(data.bridges)},
+        bridges_by_transition=bridges_by_transition,
+        transitions_from={cell_id: tuple(keys) for cell_id, keys in transitions_from.items()},
+        bridges_by_cell={cell_id: tuple(rows) for cell_id, rows in bridges_by_cell.items()},
+        ways_by_cell={cell_id: tuple(rows) for cell_id, rows in ways_by_cell.items()},
+        ways_by_bridge=ways_by_bridge,
+        routes_by_bridge=routes_by_bridge,
+        transitions_by_route={
+            path.id: tuple(
+                transition_key(start, end) for start, end in zip(path.sequence, path.sequence[1:])
+            )
+            for path in data.paths
+        },
+        variants_by_transition=_variants_by_transition(data.variants),
+        variants_by_bridge=_variants_by_bridge(data.variants),
+    )
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from money_map.core.model import AppData, BridgeItem
+from money_map.core.routing import routing_table, transition_key
+
+# Критерии маршрута; у каждого шага (моста) своя стоимость по каждому критерию, меньше — лучше.
+CRITERIA = ("effort", "risk", "uncertainty", "hops")
+CRITERIA_LABELS = {
+    "effort": "Усилия",
+    "risk": "Риск",
+    "uncertainty": "Неопределённость",
+    "hops": "Шаги",
+}
+DEFAULT_WEIGHTS = {"effort": 1.0, "risk": 1.0, "uncertainty": 1.0, "hops": 0.0}
+PLAN_CACHE_SIZE = 256
+
+Costs = Tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class RouteStep:
+    bridge_id: str
+    from_cell: str
+    to_cell: str
+    costs: Costs
+
+
+@dataclass(frozen=True)
+class PlannedRoute:
+    cells: Tuple[str, ...]
+    bridge_ids: Tuple[str, ...]
+    costs: Costs
+    score: float = 0.0
+
+    def cost(self, criterion: str) -> float:
+        return self.costs[CRITERIA.index(criterion)]
+
+
+def normalize_weights(weights: Optional[Mapping[str, float]] = None) -> Costs:
+    merged = dict(DEFAULT_WEIGHTS)
+    for criterion, weight in (weights or {}).items():
+        if criterion not in merged:
+            raise ValueError(f"Неизвестный критерий маршрута: {criterion}")
+        if weight < 0:
+            raise ValueError(f"Вес критерия {criterion} не может быть отрицательным")
+        merged[criterion] = float(weight)
+    return tuple(merged[criterion] for criterion in CRITERIA)
+
+
+def _scalar(costs: Costs, weights: Costs) -> float:
+    return sum(cost * weight for cost, weight in zip(costs, weights))
+
+
+def _dominates(left: Costs, right: Costs) -> bool:
+    # Равные векторы тоже считаем доминированными, чтобы не плодить дубликаты на фронте.
+    return all(a <= b for a, b in zip(left, right))
+
+
+def bridge_costs(bridge: BridgeItem, target_risk: Optional[str], variant_risks: Sequence[str]) -> Costs:
+    target_risk_cost = 1.0 if target_risk == "high" else 0.0
+    high_share = (
+        sum(1 for level in variant_risks if level == "high") / len(variant_risks) if variant_risks else 0.0
+    )
+    effort = float(len(bridge.checks) + len(bridge.mechanisms))
+    uncertainty = 1.0 / (1.0 + len(variant_risks) + len(bridge.effects))
+    return (effort, target_risk_cost + high_share, uncertainty, 1.0)
+
+
+@dataclass
+class RoutePlanner:
+    steps_from: Dict[str, List[RouteStep]]
+    hop_bounds: Dict[str, int]
+    cache_size: int = PLAN_CACHE_SIZE
+    _cache: "OrderedDict[tuple, object]" = field(default_factory=OrderedDict, repr=False)
+    # Планировщик общий для всех сессий (cache_resource), LRU правится под блокировкой.
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _remaining_hops(self, cell_id: str, end: str) -> Optional[int]:
+        if cell_id == end:
+            return 0
+        return self.hop_bounds.get(transition_key(cell_id, end))
+
+    def _cached(self, key: tuple, compute):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        # Поиск вне блокировки: сессии не ждут чужой расчёт, повторный расчёт того же ключа безвреден.
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def best_route(
+        self,
+        start: str,
+        end: str,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> Optional[PlannedRoute]:
+        vector = normalize_weights(weights)
+        return self._cached(("best", start, end, vector), lambda: self._astar(start, end, vector))
+
+    def pareto_routes(
+        self,
+        start: str,
+        end: str,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> List[PlannedRoute]:
+        vector = normalize_weights(weights)
+        front = self._cached(("pareto", start, end), lambda: self._pareto(start, end))
+        ranked = [
+            PlannedRoute(route.cells, route.bridge_ids, route.costs, _scalar(route.costs, vector))
+            for route in front
+        ]
+        return sorted(ranked, key=lambda route: (route.score, len(route.cells), route.bridge_ids))
+
+    def _astar(self, start: str, end: str, weights: Costs) -> Optional[PlannedRoute]:
+        if self._remaining_hops(start, end) is None:
+            return None
+        # Эвристика: оставшееся число переходов по таблице маршрутов, умноженное на самый дешёвый шаг.
+        cheapest = min(
+            (_scalar(step.costs, weights) for steps in self.steps_from.values() for step in steps),
+            default=0.0,
+        )
+        zero = tuple(0.0 for _ in CRITERIA)
+        counter = 0
+        heap: List[tuple] = [(0.0, 0.0, counter, start, (start,), (), zero)]
+        settled: Dict[str, float] = {}
+        while heap:
+            _, score, _, cell_id, cells, bridge_ids, costs = heapq.heappop(heap)
+            if cell_id == end:
+                return PlannedRoute(cells, bridge_ids, costs, score)
+            if cell_id in settled and settled[cell_id] <= score:
+                continue
+            settled[cell_id] = score
+            for step in self.steps_from.get(cell_id, []):
+                if step.to_cell in cells:
+                    continue
+                remaining = self._remaining_hops(step.to_cell, end)
+                if remaining is None:
+                    continue
+                next_score = score + _scalar(step.costs, weights)
+                if step.to_cell in settled and settled[step.to_cell] <= next_score:
+                    continue
+                counter += 1
+                heapq.heappush(
+                    heap,
+                    (
+                        next_score + remaining * cheapest,
+                        next_score,
+                        counter,
+                        step.to_cell,
+                        cells + (step.to_cell,),
+                        bridge_ids + (step.bridge_id,),
+                        tuple(a + b for a, b in zip(costs, step.costs)),
+                    ),
+                )
+        return None
+
+    def _pareto(self, start: str, end: str) -> List[PlannedRoute]:
+        if self._remaining_hops(start, end) is None:
+            return []
+        zero = tuple(0.0 for _ in CRITERIA)
+        labels: Dict[str, List[Costs]] = {start: [zero]}
+        front: List[PlannedRoute] = []
+        counter = 0
+        heap: List[tuple] = [(zero, counter, start, (start,), ())]
+        while heap:
+            costs, _, cell_id, cells, bridge_ids = heapq.heappop(heap)
+            if costs not in labels.get(cell_id, []):
+                # Метку вытеснила доминирующая, найденная позже.
+                continue
+            if cell_id == end:
+                front.append(PlannedRoute(cells, bridge_ids, costs))
+                continue
+            for step in self.steps_from.get(cell_id, []):
+                if step.to_cell in cells or self._remaining_hops(step.to_cell, end) is None:
+                    continue
+                next_costs = tuple(a + b for a, b in zip(costs, step.costs))
+                known = labels.setdefault(step.to_cell, [])
+                if any(_dominates(other, next_costs) for other in known):
+                    continue
+                if any(_dominates(route.costs, next_costs) for route in front):
+                    continue
+                known[:] = [other for other in known if not _dominates(next_costs, other)]
+                known.append(next_costs)
+                counter += 1
+                heapq.heappush(
+                    heap,
+                    (next_costs, counter, step.to_cell, cells + (step.to_cell,), bridge_ids + (step.bridge_id,)),
+                )
+        return front
+
+
+def build_route_planner(data: AppData, cache_size: int = PLAN_CACHE_SIZE) -> RoutePlanner:
+    variant_risks: Dict[str, List[str]] = {}
+    for variant in data.variants:
+        for bridge_id in variant.bridge_ids:
+            variant_risks.setdefault(bridge_id, []).append(variant.risk_level)
+
+    cell_risks = {cell.id: cell.risk for cell in data.cells}
+    steps_from: Dict[str, List[RouteStep]] = {}
+    for bridge in data.bridges:
+        steps_from.setdefault(bridge.from_cell, []).append(
+            RouteStep(
+                bridge_id=bridge.id,
+                from_cell=bridge.from_cell,
+                to_cell=bridge.to_cell,
+                costs=bridge_costs(bridge, cell_risks.get(bridge.to_cell), variant_risks.get(bridge.id, [])),
+            )
+        )
+    hop_bounds = {key: len(path) - 1 for key, path in routing_table(data).shortest_paths.items()}
+    return RoutePlanner(steps_from=steps_from, hop_bounds=hop_bounds, cache_size=cache_size)
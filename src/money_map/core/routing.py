@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import weakref
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from money_map.core.model import AppData, BridgeItem, Cell, RoutingTable
+
+ROUTE_ALTERNATIVES = 3
+
+
+def transition_key(start: str, end: str) -> str:
+    return f"{start}->{end}"
+
+
+def _routing_cells(cells: Sequence[Cell], bridges: Sequence[BridgeItem]) -> List[str]:
+    ordered = [cell.id for cell in cells]
+    known = set(ordered)
+    for bridge in bridges:
+        for cell_id in (bridge.from_cell, bridge.to_cell):
+            if cell_id not in known:
+                known.add(cell_id)
+                ordered.append(cell_id)
+    return ordered
+
+
+def routing_source(cells: Sequence[Cell], bridges: Sequence[BridgeItem]) -> List[str]:
+    return [cell.id for cell in cells] + [f"{bridge.id}:{bridge.from_cell}->{bridge.to_cell}" for bridge in bridges]
+
+
+def _reachable_cells(cell_ids: Sequence[str], successors: Dict[str, List[str]]) -> Dict[str, FrozenSet[str]]:
+    reachable: Dict[str, FrozenSet[str]] = {}
+    for start in cell_ids:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for neighbor in successors.get(stack.pop(), []):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        reachable[start] = frozenset(seen)
+    return reachable
+
+
+def _simple_paths_from(
+    start: str,
+    successors: Dict[str, List[str]],
+    limit: int,
+    reachable: Dict[str, FrozenSet[str]],
+) -> Dict[str, List[List[str]]]:
+    # Обход в ширину по простым путям: пути к каждой цели появляются по неубыванию длины,
+    # при равной длине — в порядке объявления мостов.
+    found: Dict[str, List[List[str]]] = {start: [[start]]}
+    # Цели, набравшие limit маршрутов; в старт простой путь не возвращается.
+    saturated = {start}
+    queue: deque[List[str]] = deque([[start]])
+    while queue:
+        path = queue.popleft()
+        for neighbor in successors.get(path[-1], []):
+            if neighbor in path:
+                continue
+            # Всё, что достижимо через соседа, уже набрало limit маршрутов: продолжения
+            # ветки длиннее найденных и в таблицу не попадут.
+            if reachable[neighbor] <= saturated:
+                continue
+            extended = path + [neighbor]
+            routes = found.setdefault(neighbor, [])
+            if len(routes) < limit:
+                routes.append(extended)
+                if len(routes) == limit:
+                    saturated.add(neighbor)
+            queue.append(extended)
+    return found
+
+
+def build_routing_table(
+    cells: Sequence[Cell],
+    bridges: Sequence[BridgeItem],
+    alternatives: int = ROUTE_ALTERNATIVES,
+) -> RoutingTable:
+    cell_ids = _routing_cells(cells, bridges)
+    successors: Dict[str, List[str]] = {}
+    bridges_by_transition: Dict[str, List[int]] = {}
+    outgoing: Dict[str, List[int]] = {}
+    for index, bridge in enumerate(bridges):
+        bridges_by_transition.setdefault(transition_key(bridge.from_cell, bridge.to_cell), []).append(index)
+        outgoing.setdefault(bridge.from_cell, []).append(index)
+        targets = successors.setdefault(bridge.from_cell, [])
+        if bridge.to_cell not in targets:
+            targets.append(bridge.to_cell)
+
+    reachable = _reachable_cells(cell_ids, successors)
+    shortest_paths: Dict[str, List[str]] = {}
+    alternative_paths: Dict[str, List[List[str]]] = {}
+    for start in cell_ids:
+        for end, routes in _simple_paths_from(start, successors, max(alternatives, 1), reachable).items():
+            key = transition_key(start, end)
+            shortest_paths[key] = routes[0]
+            alternative_paths[key] = routes[:alternatives]
+
+    return RoutingTable(
+        source=routing_source(cells, bridges),
+        cells=cell_ids,
+        shortest_paths=shortest_paths,
+        alternative_paths=alternative_paths,
+        bridges_by_transition=bridges_by_transition,
+        outgoing_bridges=outgoing,
+    )
+
+
+# id(AppData) -> (слабая ссылка, cells, bridges, routing, проверенная или пересобранная таблица).
+# Запись удаляется вместе с объектом, поэтому id не переиспользуется, пока она жива.
+_CHECKED_TABLES: Dict[int, Tuple[weakref.ref, object, object, object, RoutingTable]] = {}
+
+
+def routing_table(data: AppData) -> RoutingTable:
+    # AppData, собранный не через load_app_data или через model_copy с другими мостами,
+    # может прийти без таблицы или с таблицей, индексы которой указывают не на те мосты.
+    # Проверка источника — один раз на объект, пока его поля не переприсвоены.
+    key = id(data)
+    entry = _CHECKED_TABLES.get(key)
+    if entry is not None:
+        ref, cells, bridges, routing, table = entry
+        if ref() is data and cells is data.cells and bridges is data.bridges and routing is data.routing:
+            return table
+    if data.routing.source == routing_source(data.cells, data.bridges):
+        table = data.routing
+    else:
+        table = build_routing_table(data.cells, data.bridges)
+    ref = weakref.ref(data, lambda _, key=key: _CHECKED_TABLES.pop(key, None))
+    _CHECKED_TABLES[key] = (ref, data.cells, data.bridges, data.routing, table)
+    return table
+
+
+def shortest_route(data: AppData, start: str, end: str) -> Optional[List[str]]:
+    route = routing_table(data).shortest_paths.get(transition_key(start, end))
+    return list(route) if route is not None else None
+
+
+def alternative_routes(data: AppData, start: str, end: str) -> List[List[str]]:
+    return [list(route) for route in routing_table(data).alternative_paths.get(transition_key(start, end), [])]
+
+
+def bridges_for_transition(data: AppData, start: str, end: str) -> List[BridgeItem]:
+    indices = routing_table(data).bridges_by_transition.get(transition_key(start, end), [])
+    return [data.bridges[index] for index in indices]
+
+
+def bridges_from_cell(data: AppData, cell_id: str) -> List[BridgeItem]:
+    return [data.bridges[index] for index in routing_table(data).outgoing_bridges.get(cell_id, [])]
+
+
+def transition_edges(data: AppData) -> List[tuple[str, str]]:
+    table = routing_table(data)
+    edges = []
+    for start in table.cells:
+        targets: List[str] = []
+        for index in table.outgoing_bridges.get(start, []):
+            end = data.bridges[index].to_cell
+            if end not in targets:
+                targets.append(end)
+        edges.extend((start, end) for end in targets)
+    return edges
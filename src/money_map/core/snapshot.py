@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from money_map.core import graph_analytics, graph_layout, graph_model
+from money_map.core.graph_analytics import GraphAnalytics, compute_graph_analytics
+from money_map.core.graph_layout import layout_layered_positions
+from money_map.core.graph_model import GraphModel, build_base_graph, filter_graph
+from money_map.core.load import resolve_data_dir
+from money_map.core.model import AppData
+
+T = TypeVar("T")
+
+# Увеличивать при изменении раскладки каталога снимка.
+SNAPSHOT_FORMAT = 2
+
+DATA_SUFFIXES = {".yaml", ".yml", ".json"}
+
+GRAPH_MODEL_ARTIFACT = "graph_model"
+GRAPH_LAYOUT_ARTIFACT = "graph_layout"
+GRAPH_ANALYTICS_ARTIFACT = "graph_analytics"
+
+# Формат каждого артефакта: увеличивать при несовместимых изменениях pickled-классов.
+ARTIFACT_FORMATS = {
+    GRAPH_MODEL_ARTIFACT: 2,
+    GRAPH_LAYOUT_ARTIFACT: 1,
+    GRAPH_ANALYTICS_ARTIFACT: 2,
+}
+
+
+# Модули, чей код определяет содержимое артефактов.
+BUILDER_MODULES = (graph_model, graph_layout, graph_analytics)
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    try:
+        version = metadata.version("money-map")
+    except metadata.PackageNotFoundError:
+        version = "dev"
+    # При editable-установке версия пакета не меняется, поэтому учитываем и исходники сборщиков.
+    digest = hashlib.sha256()
+    for source in (*(module.__file__ for module in BUILDER_MODULES), __file__):
+        digest.update(Path(source).read_bytes())
+    return f"{version}+{digest.hexdigest()[:12]}"
+
+
+def data_fingerprint(data_dir: Optional[Path] = None) -> str:
+    root = data_dir or resolve_data_dir()
+    # Версия кода и форматы в ключе: после обновления не подхватываются снимки старого кода.
+    formats = ",".join(f"{name}={value}" for name, value in sorted(ARTIFACT_FORMATS.items()))
+    digest = hashlib.sha256(
+        f"format:{SNAPSHOT_FORMAT}:artifacts:{formats}:code:{code_version()}".encode("utf-8")
+    )
+    for path in sorted(root.rglob("*")):
+        if path.suffix not in DATA_SUFFIXES or not path.is_file():
+            continue
+        stat = path.stat()
+        relative = path.relative_to(root).as_posix()
+        digest.update(f"{relative}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _cache_root() -> Path:
+    override = os.environ.get("MONEY_MAP_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "money-map" / "snapshots"
+
+
+def snapshot_dir(version: str) -> Path:
+    return _cache_root() / version
+
+
+def artifact_path(version: str, name: str) -> Path:
+    # Вариации артефакта ("graph_layout-<hash>") делят формат базового имени.
+    artifact_format = ARTIFACT_FORMATS.get(name.split("-", maxsplit=1)[0], 1)
+    return snapshot_dir(version) / f"{name}.v{artifact_format}.pickle"
+
+
+def load_artifact(version: str, name: str) -> Optional[object]:
+    path = artifact_path(version, name)
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as handle:
+            return pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def save_artifact(version: str, name: str, value: object) -> bool:
+    directory = snapshot_dir(version)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, artifact_path(version, name))
+    except (OSError, pickle.PicklingError):
+        Path(tmp_name).unlink(missing_ok=True)
+        return False
+    return True
+
+
+def get_or_build_artifact(version: str, name: str, build: Callable[[], T]) -> T:
+    cached = load_artifact(version, name)
+    if cached is not None:
+        return cached  # type: ignore[return-value]
+    value = build()
+    save_artifact(version, name, value)
+    return value
+
+
+def snapshot_graph_model(data: AppData, version: str) -> GraphModel:
+    return get_or_build_artifact(version, GRAPH_MODEL_ARTIFACT, lambda: build_base_graph(data))
+
+
+def graph_layout_artifact_name(
+    node_types: Optional[Iterable[str]] = None,
+    edge_types: Optional[Iterable[str]] = None,
+) -> str:
+    if node_types is None and edge_types is None:
+        return GRAPH_LAYOUT_ARTIFACT
+    # None — «все типы», в отличие от пустого списка.
+    key = "|".join("*" if types is None else repr(sorted(types)) for types in (node_types, edge_types))
+    return f"{GRAPH_LAYOUT_ARTIFACT}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def snapshot_graph_layout(
+    data: AppData,
+    version: str,
+    node_types: Optional[Iterable[str]] = None,
+    edge_types: Optional[Iterable[str]] = None,
+    model: Optional[GraphModel] = None,
+) -> Dict[str, Tuple[float, float]]:
+    def build() -> Dict[str, Tuple[float, float]]:
+        view = model
+        if view is None:
+            view = snapshot_graph_model(data, version)
+            if node_types is not None or edge_types is not None:
+                view = filter_graph(view, node_types, edge_types)
+        return layout_layered_positions(view)
+
+    return get_or_build_artifact(version, graph_layout_artifact_name(node_types, edge_types), build)
+
+
+def snapshot_graph_analytics(
+    data: AppData,
+    version: str,
+    model: Optional[GraphModel] = None,
+) -> GraphAnalytics:
+    def build() -> GraphAnalytics:
+        return compute_graph_analytics(model if model is not None else snapshot_graph_model(data, version))
+
+    return get_or_build_artifact(version, GRAPH_ANALYTICS_ARTIFACT, build)
+
+
+def build_snapshot(data: AppData, version: str) -> Path:
+    model = snapshot_graph_model(data, version)
+    snapshot_graph_layout(data, version, model=model)
+    snapshot_graph_analytics(data, version, model=model)
+    return snapshot_dir(version)
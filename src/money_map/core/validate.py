@@ -1,239 +1,696 @@
 from __future__ import annotations
 
-from typing import List, Set
+import multiprocessing
+import os
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar
 
 from money_map.core.ids import CELL_IDS
-from money_map.core.model import AppData
+from money_map.core.model import (
+    ActivitySubprofileDefinition,
+    AppData,
+    BridgeItem,
+    Cell,
+    PathItem,
+    TaxonomyItem,
+    Variant,
+)
 
 
 EXPECTED_CELL_IDS = set(CELL_IDS)
 
+# Правила по сущностям уходят в пул процессов только на больших объёмах:
+# на сотнях вариантов запуск процессов дороже самой проверки.
+PARALLEL_MIN_VARIANTS = 50_000
+VARIANT_CHUNK_SIZE = 10_000
 
-def validate_app_data(data: AppData) -> List[str]:
-    errors: List[str] = []
-    axis_values = {axis.id: set(axis.values) for axis in data.axes}
-    if {"activity", "scalability", "risk"} - set(axis_values):
-        errors.append("Отсутствуют обязательные оси: activity, scalability, risk.")
 
-    cell_ids = {cell.id for cell in data.cells}
-    if cell_ids != EXPECTED_CELL_IDS:
-        missing = sorted(EXPECTED_CELL_IDS - cell_ids)
-        extra = sorted(cell_ids - EXPECTED_CELL_IDS)
-        if missing:
-            errors.append(f"Не хватает ячеек: {', '.join(missing)}")
-        if extra:
-            errors.append(f"Лишние ячейки: {', '.join(extra)}")
+@dataclass(frozen=True)
+class Finding:
+    rule_id: str
+    entity: str
+    message: str
+
+    def __str__(self) -> str:
+        return self.message
+
+
+@dataclass(frozen=True)
+class ValidationContext:
+    axis_values: Dict[str, Set[str]]
+    cell_ids: Set[str]
+    cell_lookup: Dict[str, Cell]
+    taxonomy_ids: Set[str]
+    profile_ids: Set[str]
+    subprofile_ids: Set[str]
+    work_format_ids: Set[str]
+    entry_level_ids: Set[str]
+    sell_keys: Set[str]
+    to_whom_keys: Set[str]
+    value_keys: Set[str]
+
+
+def build_validation_context(data: AppData) -> ValidationContext:
+    return ValidationContext(
+        axis_values={axis.id: set(axis.values) for axis in data.axes},
+        cell_ids={cell.id for cell in data.cells},
+        cell_lookup={cell.id: cell for cell in data.cells},
+        taxonomy_ids={item.id for item in data.taxonomy},
+        profile_ids={profile.id for profile in data.activity_profiles},
+        subprofile_ids={sub.id for sub in data.activity_subprofiles},
+        work_format_ids={item.id for item in data.work_formats},
+        entry_level_ids={item.id for item in data.entry_levels},
+        sell_keys=set(data.mappings.sell_items),
+        to_whom_keys=set(data.mappings.to_whom_items),
+        value_keys=set(data.mappings.value_measures),
+    )
+
+
+# Справочники, на которые ссылаются правила: имя зависимости -> поля контекста.
+REFERENCE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "axes": ("axis_values",),
+    "cells": ("cell_ids", "cell_lookup"),
+    "taxonomy": ("taxonomy_ids",),
+    "mappings": ("sell_keys", "to_whom_keys", "value_keys"),
+    "profiles": ("profile_ids", "subprofile_ids"),
+    "work_formats": ("work_format_ids",),
+    "entry_levels": ("entry_level_ids",),
+}
+
+# Области правил по сущностям: правило получает одну сущность и контекст.
+ENTITY_SCOPES: Dict[str, Callable[[AppData], Sequence[Any]]] = {
+    "cell": lambda data: data.cells,
+    "way": lambda data: data.taxonomy,
+    "variant": lambda data: data.variants,
+    "route": lambda data: data.paths,
+    "bridge": lambda data: data.bridges,
+    "subprofile": lambda data: data.activity_subprofiles,
+}
+
+DataCheck = Callable[[AppData, ValidationContext], Iterable[Finding]]
+EntityCheck = Callable[[Any, ValidationContext], Iterable[Finding]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    scope: str
+    check: Callable[..., Iterable[Finding]]
+    depends: FrozenSet[str] = frozenset()
 
-    for cell in data.cells:
-        if cell.activity not in axis_values.get("activity", set()):
-            errors.append(f"Ячейка {cell.id}: неверное значение activity {cell.activity}")
-        if cell.scalability not in axis_values.get("scalability", set()):
-            errors.append(f"Ячейка {cell.id}: неверное значение scalability {cell.scalability}")
-        if cell.risk not in axis_values.get("risk", set()):
-            errors.append(f"Ячейка {cell.id}: неверное значение risk {cell.risk}")
 
-    _validate_mappings(data, errors)
-    _validate_taxonomy(data, errors)
-    _validate_variants(data, axis_values, errors)
-    _validate_paths(data, errors)
-    _validate_bridges(data, errors)
-    _validate_activity_profiles(data, errors)
+# Порядок регистрации задаёт порядок сообщений в отчёте.
+RULES: List[Rule] = []
 
-    return errors
 
+CheckT = TypeVar("CheckT", DataCheck, EntityCheck)
 
-def _validate_mappings(data: AppData, errors: List[str]) -> None:
+
+def rule(rule_id: str, scope: str = "data", depends: Iterable[str] = ()) -> Callable[[CheckT], CheckT]:
+    if scope != "data" and scope not in ENTITY_SCOPES:
+        raise ValueError(f"Неизвестная область правила: {scope}")
+    unknown = set(depends) - set(REFERENCE_FIELDS)
+    if unknown:
+        raise ValueError(f"Неизвестные зависимости правила {rule_id}: {', '.join(sorted(unknown))}")
+
+    def register(check: CheckT) -> CheckT:
+        RULES.append(Rule(rule_id, scope, check, frozenset(depends)))
+        return check
+
+    return register
+
+
+def _unknown(values: Iterable[str], known: Set[str]) -> List[str]:
+    # Почти всегда значения корректны, поэтому множество строится только при находке.
+    invalid = [value for value in values if value not in known]
+    return sorted(set(invalid)) if invalid else []
+
+
+@rule("axes.required")
+def _check_required_axes(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
+    if {"activity", "scalability", "risk"} - set(ctx.axis_values):
+        yield Finding("axes.required", "axes", "Отсутствуют обязательные оси: activity, scalability, risk.")
+
+
+@rule("cells.expected")
+def _check_expected_cells(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
+    if ctx.cell_ids == EXPECTED_CELL_IDS:
+        return
+    missing = sorted(EXPECTED_CELL_IDS - ctx.cell_ids)
+    extra = sorted(ctx.cell_ids - EXPECTED_CELL_IDS)
+    if missing:
+        yield Finding("cells.expected", "cells", f"Не хватает ячеек: {', '.join(missing)}")
+    if extra:
+        yield Finding("cells.expected", "cells", f"Лишние ячейки: {', '.join(extra)}")
+
+
+@rule("cells.axes", scope="cell", depends=("axes",))
+def _check_cell_axes(cell: Cell, ctx: ValidationContext) -> Iterator[Finding]:
+    for axis, value in (("activity", cell.activity), ("scalability", cell.scalability), ("risk", cell.risk)):
+        if value not in ctx.axis_values.get(axis, set()):
+            yield Finding(
+                "cells.axes",
+                f"cell:{cell.id}",
+                f"Ячейка {cell.id}: неверное значение {axis} {value}",
+            )
+
+
+@rule("mappings.required")
+def _check_mappings(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
     mappings = data.mappings
     if not mappings.sell_items or not mappings.to_whom_items or not mappings.value_measures:
-        errors.append("mappings.yaml должен содержать sell_items, to_whom_items, value_measures.")
-
-
-def _validate_taxonomy(data: AppData, errors: List[str]) -> None:
-    cell_ids = {cell.id for cell in data.cells}
-    sell_keys = set(data.mappings.sell_items)
-    to_whom_keys = set(data.mappings.to_whom_items)
-    value_keys = set(data.mappings.value_measures)
-
-    for item in data.taxonomy:
-        missing_fields: List[str] = []
-        for field in [
-            "id",
-            "name",
-            "sell",
-            "to_whom",
-            "value",
-            "typical_cells",
-            "description",
-            "examples",
-            "risk_notes",
-        ]:
-            if getattr(item, field) is None:
-                missing_fields.append(field)
-        if missing_fields:
-            errors.append(
-                f"Таксономия {item.id}: отсутствуют поля {', '.join(missing_fields)}"
-            )
+        yield Finding(
+            "mappings.required",
+            "mappings",
+            "mappings.yaml должен содержать sell_items, to_whom_items, value_measures.",
+        )
 
-        invalid_sell = sorted(set(item.sell) - sell_keys)
-        invalid_to = sorted(set(item.to_whom) - to_whom_keys)
-        invalid_value = sorted(set(item.value) - value_keys)
-        if invalid_sell:
-            errors.append(f"Таксономия {item.id}: неизвестные sell: {', '.join(invalid_sell)}")
-        if invalid_to:
-            errors.append(f"Таксономия {item.id}: неизвестные to_whom: {', '.join(invalid_to)}")
-        if invalid_value:
-            errors.append(f"Таксономия {item.id}: неизвестные value: {', '.join(invalid_value)}")
-
-        invalid_cells = sorted(set(item.typical_cells) - cell_ids)
-        if invalid_cells:
-            errors.append(
-                f"Таксономия {item.id}: неизвестные ячейки {', '.join(invalid_cells)}"
-            )
 
+TAXONOMY_REQUIRED_FIELDS = (
+    "id",
+    "name",
+    "sell",
+    "to_whom",
+    "value",
+    "typical_cells",
+    "description",
+    "examples",
+    "risk_notes",
+)
 
-def _validate_variants(
-    data: AppData,
-    axis_values: dict[str, set[str]],
-    errors: List[str],
-) -> None:
-    cell_ids = {cell.id for cell in data.cells}
-    cell_lookup = {cell.id: cell for cell in data.cells}
-    taxonomy_ids = {item.id for item in data.taxonomy}
-    profile_ids = {profile.id for profile in data.activity_profiles}
-    subprofile_ids = {sub.id for sub in data.activity_subprofiles}
-    work_format_ids = {item.id for item in data.work_formats}
-    entry_level_ids = {item.id for item in data.entry_levels}
-    sell_keys = set(data.mappings.sell_items)
-    to_whom_keys = set(data.mappings.to_whom_items)
-    value_keys = set(data.mappings.value_measures)
-    tagged_count = 0
-
-    for variant in data.variants:
-        if variant.primary_way_id not in taxonomy_ids:
-            errors.append(
-                f"Вариант {variant.id}: неизвестный primary_way_id {variant.primary_way_id}"
+
+@rule("taxonomy", scope="way", depends=("mappings", "cells"))
+def _check_taxonomy(item: TaxonomyItem, ctx: ValidationContext) -> Iterator[Finding]:
+    entity = f"way:{item.id}"
+    missing_fields = [field for field in TAXONOMY_REQUIRED_FIELDS if getattr(item, field) is None]
+    if missing_fields:
+        yield Finding(
+            "taxonomy",
+            entity,
+            f"Таксономия {item.id}: отсутствуют поля {', '.join(missing_fields)}",
+        )
+
+    for name, values, known in (
+        ("sell", item.sell, ctx.sell_keys),
+        ("to_whom", item.to_whom, ctx.to_whom_keys),
+        ("value", item.value, ctx.value_keys),
+    ):
+        invalid = _unknown(values, known)
+        if invalid:
+            yield Finding(
+                "taxonomy",
+                entity,
+                f"Таксономия {item.id}: неизвестные {name}: {', '.join(invalid)}",
             )
-        invalid_cells = sorted(set(variant.matrix_cells) - cell_ids)
-        if invalid_cells:
-            errors.append(
-                f"Вариант {variant.id}: неизвестные ячейки {', '.join(invalid_cells)}"
+
+    invalid_cells = _unknown(item.typical_cells, ctx.cell_ids)
+    if invalid_cells:
+        yield Finding(
+            "taxonomy",
+            entity,
+            f"Таксономия {item.id}: неизвестные ячейки {', '.join(invalid_cells)}",
+        )
+
+
+# Правила по вариантам вызываются сотни тысяч раз, поэтому возвращают список (обычно пустой),
+# а не генератор, и сначала проверяют быстрый путь «всё корректно».
+@rule("variant.way", scope="variant", depends=("taxonomy",))
+def _check_variant_way(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    if variant.primary_way_id in ctx.taxonomy_ids:
+        return []
+    return [
+        Finding(
+            "variant.way",
+            f"variant:{variant.id}",
+            f"Вариант {variant.id}: неизвестный primary_way_id {variant.primary_way_id}",
+        )
+    ]
+
+
+@rule("variant.cells", scope="variant", depends=("cells",))
+def _check_variant_cells(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    if ctx.cell_ids.issuperset(variant.matrix_cells):
+        return []
+    invalid_cells = _unknown(variant.matrix_cells, ctx.cell_ids)
+    return [
+        Finding(
+            "variant.cells",
+            f"variant:{variant.id}",
+            f"Вариант {variant.id}: неизвестные ячейки {', '.join(invalid_cells)}",
+        )
+    ]
+
+
+@rule("variant.tags", scope="variant", depends=("mappings",))
+def _check_variant_tags(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    if (
+        ctx.sell_keys.issuperset(variant.sell_tags)
+        and ctx.to_whom_keys.issuperset(variant.to_whom_tags)
+        and ctx.value_keys.issuperset(variant.value_tags)
+    ):
+        return []
+    findings = []
+    for name, values, known in (
+        ("sell_tags", variant.sell_tags, ctx.sell_keys),
+        ("to_whom_tags", variant.to_whom_tags, ctx.to_whom_keys),
+        ("value_tags", variant.value_tags, ctx.value_keys),
+    ):
+        invalid = _unknown(values, known)
+        if invalid:
+            findings.append(
+                Finding(
+                    "variant.tags",
+                    f"variant:{variant.id}",
+                    f"Вариант {variant.id}: неизвестные {name} {', '.join(invalid)}",
+                )
             )
-        invalid_sell = sorted(set(variant.sell_tags) - sell_keys)
-        invalid_to = sorted(set(variant.to_whom_tags) - to_whom_keys)
-        invalid_value = sorted(set(variant.value_tags) - value_keys)
-        if invalid_sell:
-            errors.append(f"Вариант {variant.id}: неизвестные sell_tags {', '.join(invalid_sell)}")
-        if invalid_to:
-            errors.append(
-                f"Вариант {variant.id}: неизвестные to_whom_tags {', '.join(invalid_to)}"
+    return findings
+
+
+@rule("variant.axes", scope="variant", depends=("axes",))
+def _check_variant_axes(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    axis_values = ctx.axis_values
+    findings = []
+    for axis, name, value in (
+        ("risk", "risk_level", variant.risk_level),
+        ("activity", "activity", variant.activity),
+        ("scalability", "scalability", variant.scalability),
+    ):
+        if value not in axis_values.get(axis, ()):
+            findings.append(
+                Finding(
+                    "variant.axes",
+                    f"variant:{variant.id}",
+                    f"Вариант {variant.id}: неверное значение {name} {value}",
+                )
             )
-        if invalid_value:
-            errors.append(
-                f"Вариант {variant.id}: неизвестные value_tags {', '.join(invalid_value)}"
+    return findings
+
+
+@rule("variant.profile", scope="variant", depends=("profiles",))
+def _check_variant_profile(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    findings = []
+    if variant.profile_id and variant.profile_id not in ctx.profile_ids:
+        findings.append(
+            Finding(
+                "variant.profile",
+                f"variant:{variant.id}",
+                f"Вариант {variant.id}: неизвестный profile_id {variant.profile_id}",
             )
-        if variant.risk_level not in axis_values.get("risk", set()):
-            errors.append(
-                f"Вариант {variant.id}: неверное значение risk_level {variant.risk_level}"
+        )
+    if variant.subprofile_id and variant.subprofile_id not in ctx.subprofile_ids:
+        findings.append(
+            Finding(
+                "variant.profile",
+                f"variant:{variant.id}",
+                f"Вариант {variant.id}: неизвестный subprofile_id {variant.subprofile_id}",
             )
-        if variant.activity not in axis_values.get("activity", set()):
-            errors.append(
-                f"Вариант {variant.id}: неверное значение activity {variant.activity}"
+        )
+    return findings
+
+
+@rule("variant.formats", scope="variant", depends=("work_formats", "entry_levels"))
+def _check_variant_formats(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    if ctx.work_format_ids.issuperset(variant.work_format_ids) and ctx.entry_level_ids.issuperset(
+        variant.entry_level_ids
+    ):
+        return []
+    findings = []
+    invalid_formats = _unknown(variant.work_format_ids, ctx.work_format_ids)
+    if invalid_formats:
+        findings.append(
+            Finding(
+                "variant.formats",
+                f"variant:{variant.id}",
+                f"Вариант {variant.id}: неизвестные work_format_ids {', '.join(invalid_formats)}",
             )
-        if variant.scalability not in axis_values.get("scalability", set()):
-            errors.append(
-                f"Вариант {variant.id}: неверное значение scalability {variant.scalability}"
+        )
+    invalid_entry = _unknown(variant.entry_level_ids, ctx.entry_level_ids)
+    if invalid_entry:
+        findings.append(
+            Finding(
+                "variant.formats",
+                f"variant:{variant.id}",
+                f"Вариант {variant.id}: неизвестные entry_level_ids {', '.join(invalid_entry)}",
             )
-        if variant.profile_id:
-            tagged_count += 1
-            if variant.profile_id not in profile_ids:
-                errors.append(
-                    f"Вариант {variant.id}: неизвестный profile_id {variant.profile_id}"
+        )
+    return findings
+
+
+@rule("variant.cell_match", scope="variant", depends=("cells",))
+def _check_variant_cell_match(variant: Variant, ctx: ValidationContext) -> List[Finding]:
+    if not variant.matrix_cells:
+        return []
+    primary_cell = variant.matrix_cells[0]
+    cell = ctx.cell_lookup.get(primary_cell)
+    if cell is None:
+        return []
+    findings = []
+    for name, value, expected in (
+        ("activity", variant.activity, cell.activity),
+        ("scalability", variant.scalability, cell.scalability),
+        ("risk_level", variant.risk_level, cell.risk),
+    ):
+        if value != expected:
+            findings.append(
+                Finding(
+                    "variant.cell_match",
+                    f"variant:{variant.id}",
+                    f"Вариант {variant.id}: {name} {value} не совпадает с ячейкой {primary_cell} ({expected})",
                 )
-        if variant.subprofile_id and variant.subprofile_id not in subprofile_ids:
-            errors.append(
-                f"Вариант {variant.id}: неизвестный subprofile_id {variant.subprofile_id}"
-            )
-        invalid_formats = sorted(set(variant.work_format_ids) - work_format_ids)
-        if invalid_formats:
-            errors.append(
-                f"Вариант {variant.id}: неизвестные work_format_ids {', '.join(invalid_formats)}"
-            )
-        invalid_entry = sorted(set(variant.entry_level_ids) - entry_level_ids)
-        if invalid_entry:
-            errors.append(
-                f"Вариант {variant.id}: неизвестные entry_level_ids {', '.join(invalid_entry)}"
-            )
-        if variant.matrix_cells:
-            primary_cell = variant.matrix_cells[0]
-            cell = cell_lookup.get(primary_cell)
-            if cell:
-                if variant.activity != cell.activity:
-                    errors.append(
-                        f"Вариант {variant.id}: activity {variant.activity} "
-                        f"не совпадает с ячейкой {primary_cell} ({cell.activity})"
-                    )
-                if variant.scalability != cell.scalability:
-                    errors.append(
-                        f"Вариант {variant.id}: scalability {variant.scalability} "
-                        f"не совпадает с ячейкой {primary_cell} ({cell.scalability})"
-                    )
-                if variant.risk_level != cell.risk:
-                    errors.append(
-                        f"Вариант {variant.id}: risk_level {variant.risk_level} "
-                        f"не совпадает с ячейкой {primary_cell} ({cell.risk})"
-                    )
-
-    if data.variants:
-        ratio = tagged_count / len(data.variants)
-        if ratio < 0.85:
-            errors.append(
-                f"Варианты: размечено профилями {ratio:.0%} (ожидалось >= 85%)"
             )
+    return findings
 
 
-def _validate_paths(data: AppData, errors: List[str]) -> None:
-    cell_ids = {cell.id for cell in data.cells}
-    for path in data.paths:
-        invalid_cells = [cell for cell in path.sequence if cell not in cell_ids]
-        if invalid_cells:
-            errors.append(
-                f"Путь {path.id}: неизвестные ячейки {', '.join(sorted(set(invalid_cells)))}"
-            )
+@rule("variants.profile_coverage")
+def _check_profile_coverage(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
+    if not data.variants:
+        return
+    ratio = sum(1 for variant in data.variants if variant.profile_id) / len(data.variants)
+    if ratio < 0.85:
+        yield Finding(
+            "variants.profile_coverage",
+            "variants",
+            f"Варианты: размечено профилями {ratio:.0%} (ожидалось >= 85%)",
+        )
 
 
-def _validate_bridges(data: AppData, errors: List[str]) -> None:
-    cell_ids = {cell.id for cell in data.cells}
-    for bridge in data.bridges:
-        if bridge.from_cell not in cell_ids:
-            errors.append(f"Мост {bridge.id}: неизвестная ячейка from {bridge.from_cell}")
-        if bridge.to_cell not in cell_ids:
-            errors.append(f"Мост {bridge.id}: неизвестная ячейка to {bridge.to_cell}")
+@rule("paths.cells", scope="route", depends=("cells",))
+def _check_paths(path: PathItem, ctx: ValidationContext) -> Iterator[Finding]:
+    invalid_cells = _unknown(path.sequence, ctx.cell_ids)
+    if invalid_cells:
+        yield Finding(
+            "paths.cells",
+            f"route:{path.id}",
+            f"Путь {path.id}: неизвестные ячейки {', '.join(invalid_cells)}",
+        )
 
 
-def _validate_activity_profiles(data: AppData, errors: List[str]) -> None:
-    profile_ids = [profile.id for profile in data.activity_profiles]
-    duplicates = {pid for pid in profile_ids if profile_ids.count(pid) > 1}
+@rule("bridges.cells", scope="bridge", depends=("cells",))
+def _check_bridges(bridge: BridgeItem, ctx: ValidationContext) -> Iterator[Finding]:
+    if bridge.from_cell not in ctx.cell_ids:
+        yield Finding(
+            "bridges.cells",
+            f"bridge:{bridge.id}",
+            f"Мост {bridge.id}: неизвестная ячейка from {bridge.from_cell}",
+        )
+    if bridge.to_cell not in ctx.cell_ids:
+        yield Finding(
+            "bridges.cells",
+            f"bridge:{bridge.id}",
+            f"Мост {bridge.id}: неизвестная ячейка to {bridge.to_cell}",
+        )
+
+
+@rule("profiles.unique")
+def _check_profile_duplicates(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
+    seen: Set[str] = set()
+    duplicates: Set[str] = set()
+    for profile in data.activity_profiles:
+        if profile.id in seen:
+            duplicates.add(profile.id)
+        seen.add(profile.id)
     if duplicates:
-        errors.append(f"Найдены дубликаты profile_id: {', '.join(sorted(duplicates))}")
-
-    profile_set = set(profile_ids)
-    subprofiles = data.activity_subprofiles
-    for subprofile in subprofiles:
-        if subprofile.parent_profile_id not in profile_set:
-            errors.append(
-                f"Subprofile {subprofile.id}: неизвестный parent_profile_id {subprofile.parent_profile_id}"
-            )
+        yield Finding(
+            "profiles.unique",
+            "activity_profiles",
+            f"Найдены дубликаты profile_id: {', '.join(sorted(duplicates))}",
+        )
+
+
+@rule("profiles.subprofile_parent", scope="subprofile", depends=("profiles",))
+def _check_subprofile_parents(subprofile: ActivitySubprofileDefinition, ctx: ValidationContext) -> Iterator[Finding]:
+    if subprofile.parent_profile_id not in ctx.profile_ids:
+        yield Finding(
+            "profiles.subprofile_parent",
+            f"subprofile:{subprofile.id}",
+            f"Subprofile {subprofile.id}: неизвестный parent_profile_id {subprofile.parent_profile_id}",
+        )
+
 
-    taxonomy_ids = {item.id for item in data.taxonomy}
-    for tax_id in taxonomy_ids:
+@rule("profiles.way_mapping")
+def _check_way_profile_mapping(data: AppData, ctx: ValidationContext) -> Iterator[Finding]:
+    for tax_id in ctx.taxonomy_ids:
         allowed = data.money_way_profile_map.get(tax_id)
         if not allowed:
-            errors.append(
-                f"Для способа {tax_id} не задан mapping activity profiles."
+            yield Finding(
+                "profiles.way_mapping",
+                f"way:{tax_id}",
+                f"Для способа {tax_id} не задан mapping activity profiles.",
             )
             continue
-        missing = sorted(set(allowed) - profile_set)
+        missing = _unknown(allowed, ctx.profile_ids)
         if missing:
-            errors.append(
-                f"Для способа {tax_id}: неизвестные profile_id {', '.join(missing)}"
+            yield Finding(
+                "profiles.way_mapping",
+                f"way:{tax_id}",
+                f"Для способа {tax_id}: неизвестные profile_id {', '.join(missing)}",
             )
+
+
+def _entity_findings(
+    entities: Sequence[Any],
+    ctx: ValidationContext,
+    checks: Sequence[EntityCheck],
+) -> Iterator[Finding]:
+    for entity in entities:
+        for check in checks:
+            findings = check(entity, ctx)
+            if findings:
+                yield from findings
+
+
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_entity_worker(
+    ctx: ValidationContext,
+    entities: Sequence[Any],
+    checks: Sequence[EntityCheck],
+) -> None:
+    # При fork аргументы не сериализуются: воркер получает сущности из памяти родителя.
+    _WORKER_STATE["ctx"] = ctx
+    _WORKER_STATE["entities"] = entities
+    _WORKER_STATE["checks"] = checks
+
+
+def _check_entity_chunk(bounds: tuple[int, int]) -> List[Finding]:
+    start, stop = bounds
+    entities = _WORKER_STATE["entities"]
+    return list(
+        _entity_findings(
+            entities[start:stop],  # type: ignore[index]
+            _WORKER_STATE["ctx"],  # type: ignore[arg-type]
+            _WORKER_STATE["checks"],  # type: ignore[arg-type]
+        )
+    )
+
+
+def _resolve_workers(workers: Optional[int], entity_count: int) -> int:
+    if workers is not None:
+        return max(1, workers)
+    if entity_count < PARALLEL_MIN_VARIANTS:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _iter_scope_findings(
+    entities: Sequence[Any],
+    ctx: ValidationContext,
+    rules: Sequence[Rule],
+    workers: int,
+    chunk_size: int,
+) -> Iterator[Finding]:
+    checks = [item.check for item in rules]
+    if workers <= 1 or len(entities) <= chunk_size:
+        yield from _entity_findings(entities, ctx, checks)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context("fork") if "fork" in methods else None
+    bounds = iter(
+        [(start, min(start + chunk_size, len(entities))) for start in range(0, len(entities), chunk_size)]
+    )
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_entity_worker,
+        initargs=(ctx, entities, checks),
+    )
+    # Скользящее окно: в работе не больше workers * 2 кусков, следующий отправляется после
+    # выдачи самого старого. Память ограничена окном, а не числом находок; порядок кусков
+    # сохраняется, поэтому отчёт совпадает с последовательным.
+    pending: deque[Future[List[Finding]]] = deque()
+    try:
+        for chunk in bounds:
+            pending.append(executor.submit(_check_entity_chunk, chunk))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            findings = pending.popleft().result()
+            next_chunk = next(bounds, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(_check_entity_chunk, next_chunk))
+            yield from findings
+    finally:
+        # Если потребитель остановился раньше (--fail-fast), оставшиеся куски не запускаются.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Результаты прошлой проверки: при следующей перепроверяется только изменённое.
+@dataclass
+class ValidationState:
+    context: Optional[ValidationContext] = None
+    # Область -> id -> сущность в том виде, в каком её проверили.
+    entities: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Область -> id -> находки по правилам области; сущности без находок не хранятся.
+    findings: Dict[str, Dict[str, Tuple[Tuple[Finding, ...], ...]]] = field(default_factory=dict)
+    scope_rules: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    rechecked: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def changed_references(self, ctx: ValidationContext) -> Set[str]:
+        if self.context is None:
+            return set(REFERENCE_FIELDS)
+        return {
+            name
+            for name, fields in REFERENCE_FIELDS.items()
+            if any(getattr(self.context, field_name) != getattr(ctx, field_name) for field_name in fields)
+        }
+
+
+def _iter_scope_incremental(
+    scope: str,
+    entities: Sequence[Any],
+    ctx: ValidationContext,
+    rules: Sequence[Rule],
+    state: ValidationState,
+    changed: Set[str],
+) -> Iterator[Finding]:
+    rule_ids = tuple(item.id for item in rules)
+    if state.scope_rules.get(scope) != rule_ids:
+        state.entities[scope] = {}
+        state.findings[scope] = {}
+        state.scope_rules[scope] = rule_ids
+    known = state.entities[scope]
+    cached_findings = state.findings[scope]
+    stale_rules = {index for index, item in enumerate(rules) if item.depends & changed}
+    current: Set[str] = set()
+
+    for entity in entities:
+        entity_id = entity.id
+        current.add(entity_id)
+        previous = known.get(entity_id)
+        # Храним сущность текущей загрузки, даже если она не изменилась: иначе общее
+        # состояние держало бы в памяти сущности всех прошлых AppData.
+        known[entity_id] = entity
+        # Сущность сравнивается с прошлой по значению: сравнение словарей полей pydantic
+        # дешевле хеша содержимого (его пришлось бы считать заново при каждой загрузке)
+        # и не даёт ложных совпадений.
+        if previous is not None and previous.__dict__ == entity.__dict__:
+            cached = cached_findings.get(entity_id)
+            if not stale_rules:
+                if cached:
+                    for findings in cached:
+                        yield from findings
+                continue
+            per_rule = tuple(
+                tuple(item.check(entity, ctx)) if index in stale_rules else (cached[index] if cached else ())
+                for index, item in enumerate(rules)
+            )
+        else:
+            per_rule = tuple(tuple(item.check(entity, ctx)) for item in rules)
+        state.rechecked += 1
+        if any(per_rule):
+            cached_findings[entity_id] = per_rule
+            for findings in per_rule:
+                yield from findings
+        else:
+            cached_findings.pop(entity_id, None)
+
+    # Удалённые сущности: чистим оба словаря по текущему набору id.
+    for entity_id in [entity_id for entity_id in known if entity_id not in current]:
+        del known[entity_id]
+    for entity_id in [entity_id for entity_id in cached_findings if entity_id not in current]:
+        del cached_findings[entity_id]
+
+
+def iter_findings(
+    data: AppData,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = VARIANT_CHUNK_SIZE,
+    rules: Optional[Sequence[Rule]] = None,
+    state: Optional[ValidationState] = None,
+) -> Iterator[Finding]:
+    active = list(RULES if rules is None else rules)
+    ctx = build_validation_context(data)
+    changed = state.changed_references(ctx) if state is not None else set()
+    if state is not None:
+        state.rechecked = 0
+    done: Set[str] = set()
+    for item in active:
+        if item.scope == "data":
+            # Правила по всему набору дешёвые и агрегатные, они выполняются всегда.
+            yield from item.check(data, ctx)
+            continue
+        if item.scope in done:
+            continue
+        # Все правила области выполняются за один проход на месте первого из них.
+        done.add(item.scope)
+        scope_rules = [other for other in active if other.scope == item.scope]
+        entities = ENTITY_SCOPES[item.scope](data)
+        if state is None:
+            yield from _iter_scope_findings(
+                entities,
+                ctx,
+                scope_rules,
+                _resolve_workers(workers, len(entities)),
+                chunk_size,
+            )
+        else:
+            yield from _iter_scope_incremental(item.scope, entities, ctx, scope_rules, state, changed)
+    if state is not None:
+        state.context = ctx
+
+
+def validate_app_data(
+    data: AppData,
+    workers: Optional[int] = None,
+    state: Optional[ValidationState] = None,
+) -> List[str]:
+    if state is None:
+        return [finding.message for finding in iter_findings(data, workers=workers)]
+    with state.lock:
+        return [finding.message for finding in iter_findings(data, workers=workers, state=state)]
+
+
+# Итоги потоковой проверки: счётчики по правилам без хранения самих замечаний.
+@dataclass
+class ValidationSummary:
+    total: int = 0
+    truncated: bool = False
+    counts: Counter[str] = field(default_factory=Counter)
+
+
+def limit_findings(
+    findings: Iterable[Finding],
+    summary: ValidationSummary,
+    max_errors: Optional[int] = None,
+) -> Iterator[Finding]:
+    try:
+        for finding in findings:
+            if max_errors is not None and summary.total >= max_errors:
+                summary.truncated = True
+                break
+            summary.total += 1
+            summary.counts[finding.rule_id] += 1
+            yield finding
+    finally:
+        close = getattr(findings, "close", None)
+        if close is not None:
+            # Закрываем источник сразу, а не при сборке мусора: так останавливается пул процессов.
+            close()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from money_map.core.variant_store import CATEGORICAL_FIELDS, MULTI_VALUE_FIELDS, VariantStore
+
+# Позиции установленных битов для каждого значения байта: обход маски идёт по байтам, а не по битам.
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def mask_from_rows(rows: Iterable[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def iter_rows(mask: int) -> Iterator[int]:
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for position, byte in enumerate(data):
+        if byte:
+            base = position << 3
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+@dataclass(frozen=True)
+class VariantIndex:
+    # Битовые карты: поле -> значение -> маска строк хранилища (бит i = вариант i).
+    size: int
+    all_rows: int
+    bitmaps: Dict[str, Dict[Optional[str], int]]
+
+    def bitmap(self, field: str, value: Optional[str]) -> int:
+        return self.bitmaps[field].get(value, 0)
+
+    def any_of(self, field: str, values: Iterable[Optional[str]]) -> int:
+        mask = 0
+        bitmaps = self.bitmaps[field]
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def all_of(self, field: str, values: Iterable[Optional[str]]) -> int:
+        mask = self.all_rows
+        bitmaps = self.bitmaps[field]
+        for value in values:
+            mask &= bitmaps.get(value, 0)
+        return mask
+
+    def equals(self, **criteria: Optional[str]) -> int:
+        # Значение "all" означает «без фильтра», как в глобальных фильтрах интерфейса.
+        mask = self.all_rows
+        for field, value in criteria.items():
+            if value != "all":
+                mask &= self.bitmap(field, value)
+        return mask
+
+    def rows(self, mask: int) -> List[int]:
+        return list(iter_rows(mask))
+
+
+def build_variant_index(store: VariantStore) -> VariantIndex:
+    bitmaps: Dict[str, Dict[Optional[str], int]] = {}
+    for field in CATEGORICAL_FIELDS:
+        column = store.categorical[field]
+        rows_by_code: List[List[int]] = [[] for _ in column.values]
+        for row, code in enumerate(column.codes):
+            rows_by_code[code].append(row)
+        bitmaps[field] = {
+            value: mask_from_rows(rows, store.size) for value, rows in zip(column.values, rows_by_code)
+        }
+    for field in MULTI_VALUE_FIELDS:
+        column = store.multi[field]
+        rows_by_code = [[] for _ in column.values]
+        offsets = column.offsets
+        codes = column.codes
+        for row in range(store.size):
+            for position in range(offsets[row], offsets[row + 1]):
+                rows_by_code[codes[position]].append(row)
+        bitmaps[field] = {
+            value: mask_from_rows(rows, store.size) for value, rows in zip(column.values, rows_by_code)
+        }
+    return VariantIndex(size=store.size, all_rows=(1 << store.size) - 1, bitmaps=bitmaps)
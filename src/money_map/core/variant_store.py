@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from money_map.core.model import Variant
+
+# Поля с небольшим словарём значений хранятся кодами в массиве, а не строками в каждом объекте.
+CATEGORICAL_FIELDS = (
+    "primary_way_id",
+    "risk_level",
+    "activity",
+    "scalability",
+    "kind",
+    "profile_id",
+    "subprofile_id",
+)
+# Многозначные поля — в формате CSR: общий массив кодов и смещения строк.
+MULTI_VALUE_FIELDS = (
+    "matrix_cells",
+    "sell_tags",
+    "to_whom_tags",
+    "value_tags",
+    "bridge_ids",
+    "route_ids",
+    "work_format_ids",
+    "entry_level_ids",
+)
+TEXT_FIELDS = ("id", "title", "notes")
+FLAG_FIELDS = ("outside_market",)
+
+
+@dataclass(frozen=True)
+class CategoricalColumn:
+    values: tuple[Optional[str], ...]
+    codes: array
+
+    def code(self, value: Optional[str]) -> int:
+        try:
+            return self.values.index(value)
+        except ValueError:
+            return -1
+
+    def value(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+
+@dataclass(frozen=True)
+class MultiValueColumn:
+    values: tuple[str, ...]
+    offsets: array
+    codes: array
+
+    def code(self, value: str) -> int:
+        try:
+            return self.values.index(value)
+        except ValueError:
+            return -1
+
+    def row_codes(self, row: int) -> array:
+        return self.codes[self.offsets[row] : self.offsets[row + 1]]
+
+    def row_values(self, row: int) -> List[str]:
+        return [self.values[code] for code in self.row_codes(row)]
+
+
+@dataclass(frozen=True)
+class TextColumn:
+    buffer: str
+    offsets: array
+    # По байту на строку: 1, если значение None (для необязательных полей).
+    missing: bytearray
+
+    def value(self, row: int) -> Optional[str]:
+        if self.missing[row]:
+            return None
+        return self.buffer[self.offsets[row] : self.offsets[row + 1]]
+
+
+@dataclass(frozen=True)
+class VariantStore:
+    size: int
+    categorical: Dict[str, CategoricalColumn]
+    multi: Dict[str, MultiValueColumn]
+    text: Dict[str, TextColumn]
+    # Булевы поля — по байту на строку.
+    flags: Dict[str, bytearray]
+    row_of: Dict[str, int]
+
+    def value(self, field: str, row: int) -> object:
+        if field in self.categorical:
+            return self.categorical[field].value(row)
+        if field in self.multi:
+            return self.multi[field].row_values(row)
+        if field in self.text:
+            return self.text[field].value(row)
+        return bool(self.flags[field][row])
+
+    def rows_equal(
+        self,
+        field: str,
+        value: Optional[str],
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        column = self.categorical[field]
+        code = column.code(value)
+        if code < 0:
+            return []
+        codes = column.codes
+        if rows is None:
+            return [row for row, row_code in enumerate(codes) if row_code == code]
+        return [row for row in rows if codes[row] == code]
+
+    def rows_containing(
+        self,
+        field: str,
+        value: str,
+        rows: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        column = self.multi[field]
+        code = column.code(value)
+        if code < 0:
+            return []
+        offsets = column.offsets
+        codes = column.codes
+        candidates = range(self.size) if rows is None else rows
+        return [row for row in candidates if code in codes[offsets[row] : offsets[row + 1]]]
+
+
+def _encode_categorical(values: Sequence[Optional[str]]) -> CategoricalColumn:
+    lookup: Dict[Optional[str], int] = {}
+    codes = array("I", (lookup.setdefault(value, len(lookup)) for value in values))
+    return CategoricalColumn(values=tuple(lookup), codes=codes)
+
+
+def _encode_multi(rows: Sequence[Sequence[str]]) -> MultiValueColumn:
+    lookup: Dict[str, int] = {}
+    offsets = array("I", [0])
+    codes = array("I")
+    for values in rows:
+        codes.extend(lookup.setdefault(value, len(lookup)) for value in values)
+        offsets.append(len(codes))
+    return MultiValueColumn(values=tuple(lookup), offsets=offsets, codes=codes)
+
+
+def _encode_text(values: Sequence[Optional[str]]) -> TextColumn:
+    offsets = array("I", [0])
+    missing = bytearray(len(values))
+    position = 0
+    for row, value in enumerate(values):
+        if value is None:
+            missing[row] = 1
+        else:
+            position += len(value)
+        offsets.append(position)
+    buffer = "".join(value for value in values if value is not None)
+    return TextColumn(buffer=buffer, offsets=offsets, missing=missing)
+
+
+def _encode_flag(values: Iterable[bool]) -> bytearray:
+    return bytearray(1 if value else 0 for value in values)
+
+
+def build_variant_store(variants: Sequence[Variant]) -> VariantStore:
+    return VariantStore(
+        size=len(variants),
+        categorical={
+            field: _encode_categorical([getattr(variant, field) for variant in variants])
+            for field in CATEGORICAL_FIELDS
+        },
+        multi={
+            field: _encode_multi([getattr(variant, field) for variant in variants])
+            for field in MULTI_VALUE_FIELDS
+        },
+        text={
+            field: _encode_text([getattr(variant, field) for variant in variants])
+            for field in TEXT_FIELDS
+        },
+        flags={
+            field: _encode_flag(getattr(variant, field) for variant in variants)
+            for field in FLAG_FIELDS
+        },
+        row_of={variant.id: row for row, variant in enumerate(variants)},
+    )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from typing import Optional
 
 import networkx as nx
@@ -32,16 +33,7 @@ def build_taxonomy_pyvis(
             "color": color,
         }
         if node_id == selected_node:
-            node_kwargs["borderWidth"] = 4
-            node_kwargs["size"] = 30
-            node_kwargs["color"] = {
-                "border": "#1D4ED8",
-                "background": color,
-                "highlight": {
-                    "border": "#1D4ED8",
-                    "background": color,
-                },
-            }
+            node_kwargs.update(_selected_node_style(color))
         net.add_node(node_id, **node_kwargs)
 
     for source, target, attrs in graph.edges(data=True):
@@ -71,6 +63,48 @@ def render_taxonomy_graph_html(
     return net.generate_html()
 
 
+def render_taxonomy_graph_base_html(
+    graph: nx.DiGraph,
+    height: str = "720px",
+    width: str = "100%",
+) -> str:
+    return build_taxonomy_pyvis(graph, height=height, width=width).generate_html()
+
+
+def apply_taxonomy_selection(html: str, graph: nx.DiGraph, selected_tax_id: Optional[str]) -> str:
+    # Выделение накладывается на готовый HTML скриптом поверх DataSet pyvis,
+    # поэтому смена выбранного узла не требует заново строить граф и HTML.
+    selected_node = f"tax:{selected_tax_id}" if selected_tax_id else None
+    if not selected_node or selected_node not in graph.nodes:
+        return html
+    color = _node_color(graph.nodes[selected_node].get("kind"))
+    payload = json.dumps({"id": selected_node, **_selected_node_style(color)}, ensure_ascii=False)
+    script = (
+        '<script type="text/javascript">'
+        f'if (typeof nodes !== "undefined" && nodes) {{ nodes.update({payload}); }}'
+        "</script>"
+    )
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + script
+    return html[:index] + script + html[index:]
+
+
+def _selected_node_style(color: str) -> dict[str, object]:
+    return {
+        "borderWidth": 4,
+        "size": 30,
+        "color": {
+            "border": "#1D4ED8",
+            "background": color,
+            "highlight": {
+                "border": "#1D4ED8",
+                "background": color,
+            },
+        },
+    }
+
+
 def _node_color(kind: Optional[str]) -> str:
     if kind == "root":
         return "#FDE68A"
@@ -59,14 +59,12 @@ def main() -> None:
     st.sidebar.caption(components.NAV_MODE_HINTS.get(st.session_state.get("nav_mode"), ""))
 
     if st.session_state.get("nav_mode") == "Сравнение":
-        compare_items = st.session_state.get("compare_items", [])
-        count = len(compare_items) if isinstance(compare_items, list) else 0
+        compare_items = components.session_model().compare
         st.sidebar.markdown("### Кандидаты")
-        st.sidebar.caption(f"В корзине: {count}")
-        if isinstance(compare_items, list) and compare_items:
-            for item in compare_items[-5:]:
-                label = item.get("name") or item.get("id") or "—"
-                st.sidebar.markdown(f"- {label}")
+        st.sidebar.caption(f"В корзине: {len(compare_items)}")
+        for item_type, item_id in compare_items[-5:]:
+            entry = compare.resolve_compare_item(data, item_type, item_id)
+            st.sidebar.markdown(f"- {entry.name if entry else item_id}")
         if st.sidebar.button("Открыть сравнение", key="compare-open"):
             request_nav("Сравнение")
 
@@ -78,7 +76,6 @@ def main() -> None:
         way_id = st.session_state.pop("request_selected_way_id")
         st.session_state["selected_way_id"] = way_id
         st.session_state["selected_tax_id"] = way_id
-        st.session_state["selected_taxonomy"] = way_id
     if "request_selected_cell_id" in st.session_state:
         cell_id = st.session_state.pop("request_selected_cell_id")
         components.set_selected_cell(cell_id)
@@ -100,7 +97,6 @@ def main() -> None:
     if "request_selected_route_id" in st.session_state:
         route_id = st.session_state.pop("request_selected_route_id")
         st.session_state["selected_route_id"] = route_id
-        st.session_state["selected_path"] = route_id
     if "request_classifier_filters" in st.session_state:
         request = st.session_state.pop("request_classifier_filters")
         components.apply_classifier_filter_request(request)
@@ -117,8 +113,6 @@ def main() -> None:
     if "request_matrix_axis_scalability" in st.session_state:
         st.session_state["matrix_axis_scalability"] = st.session_state.pop("request_matrix_axis_scalability")
 
-    components.sync_selection_context()
-
     st.sidebar.markdown("### Навигация")
     current_page = st.session_state.get("nav_section", components.DEFAULT_PAGE)
     if current_page not in components.PAGES:
@@ -133,6 +127,7 @@ def main() -> None:
     components.set_page(page)
 
     filters = components.sidebar_filters()
+    components.render_session_state_stats()
 
     if page == "Обзор":
         overview.render(data)
@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
+import os
 from pathlib import Path
 import re
 from typing import Iterable, List, Optional, Tuple
 
+import networkx as nx
 import streamlit as st
 import streamlit.components.v1 as components_html
 from streamlit_agraph import Config, Edge, Node
 
+from money_map.core.cell_stats import CellAggregates, build_cell_aggregates
 from money_map.core.load import load_app_data
 from money_map.core.model import AppData, BridgeItem, Cell, PathItem, TaxonomyItem, Variant
 from money_map.core.query import list_bridges
+from money_map.core.relations import BridgeRelations, build_bridge_relations
+from money_map.core.snapshot import data_fingerprint
 from money_map.core.taxonomy_graph import build_taxonomy_star
-from money_map.core.validate import validate_app_data
-from money_map.render.taxonomy_graph import render_taxonomy_graph_html
+from money_map.core.validate import ValidationState, validate_app_data
+from money_map.core.variant_index import VariantIndex, iter_rows
+from money_map.render.taxonomy_graph import apply_taxonomy_selection, render_taxonomy_graph_base_html
+from money_map.ui.logic.variants_filter import VariantCatalog, build_variant_catalog
+from money_map.ui.logic.session_model import SessionModel, StateSize, measure_state
+from money_map.ui.logic.route_catalog import RouteCatalog, build_route_catalog
+from money_map.ui.logic.classifier_catalog import ClassifierCatalog, build_classifier_catalog
+from money_map.ui.logic.variants_library import LibraryQuery, ResultSetCache, query_library_rows
 from money_map.ui.state import go_to_section, request_nav
 
 
@@ -57,28 +69,60 @@ NAV_STEP_TO_SECTION = {
 NAV_SECTION_TO_STEP = {value: key for key, value in NAV_STEP_TO_SECTION.items()}
 
 
-@st.cache_data(show_spinner="Загрузка данных...")
-def load_data() -> Tuple[AppData, List[str]]:
+@st.cache_resource(show_spinner=False)
+def _validation_state() -> ValidationState:
+    # Общая для всех сессий: после правки данных перепроверяются только изменённые сущности.
+    return ValidationState()
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    # Один экземпляр на версию данных и на процесс; все сессии читают его без копирования.
+    version: str
+    data: AppData
+    errors: Tuple[str, ...]
+
+
+@st.cache_resource(show_spinner="Загрузка данных...", max_entries=2)
+def _snapshot_for_version(version: str) -> DataSnapshot:
     data = load_app_data()
-    errors = validate_app_data(data)
-    return data, errors
+    errors = validate_app_data(data, state=_validation_state())
+    return DataSnapshot(version=version, data=data, errors=tuple(errors))
+
+
+def data_snapshot() -> DataSnapshot:
+    return _snapshot_for_version(data_version())
+
+
+def load_data() -> Tuple[AppData, List[str]]:
+    # AppData общий для всех сессий (cache_resource, без копий), поэтому его нельзя изменять.
+    snapshot = data_snapshot()
+    return snapshot.data, list(snapshot.errors)
+
+
+@st.cache_data(show_spinner=False)
+def data_version() -> str:
+    return data_fingerprint()
 
 
 def reset_cache() -> None:
-    load_data.clear()
+    _snapshot_for_version.clear()
+    data_version.clear()
+    # Производные каталоги версии данных тоже сбрасываются, чтобы не держать старые снимки.
+    for cached in (
+        _variant_catalog_for_version,
+        _bridge_relations_for_version,
+        _cell_aggregates_for_version,
+        _route_catalog_for_version,
+        _classifier_catalog_for_version,
+    ):
+        cached.clear()
 
 
 def init_session_state() -> None:
-    st.session_state.setdefault("page", DEFAULT_PAGE)
     st.session_state.setdefault("nav_section", DEFAULT_PAGE)
-    st.session_state.setdefault("nav_payload", {})
     st.session_state.setdefault("nav_mode", "Исследование")
     st.session_state.setdefault("nav_step", "Матрица")
-    st.session_state.setdefault("compare_items", [])
-    st.session_state.setdefault("compare_selected_id", None)
-    st.session_state.setdefault("current_page", DEFAULT_PAGE)
-    st.session_state.setdefault("active_section", DEFAULT_PAGE)
-    st.session_state.setdefault("selected_cell", None)
     st.session_state.setdefault("selected_cell_id", None)
     st.session_state.setdefault("selected_transition", None)
     st.session_state.setdefault("selected_bridge_id", None)
@@ -86,26 +130,17 @@ def init_session_state() -> None:
     st.session_state.setdefault("route_filters_start_cell", None)
     st.session_state.setdefault("route_filters_target_cell", None)
     st.session_state.setdefault("chosen_bridges_by_transition", {})
-    st.session_state.setdefault("selected_taxonomy", None)
     st.session_state.setdefault("selected_tax_id", None)
     st.session_state.setdefault("selected_way_id", None)
-    st.session_state.setdefault("selected_bridge", None)
-    st.session_state.setdefault("selected_path", None)
     st.session_state.setdefault("selected_variant_id", None)
-    st.session_state.setdefault("graph_selected_node", None)
-    st.session_state.setdefault("graph_selected_bridge", None)
     st.session_state.setdefault("search_query", "")
     st.session_state.setdefault("search_type_filter", "all")
-    st.session_state.setdefault("search_selected_result", None)
     st.session_state.setdefault("search_results_limit", 10)
-    st.session_state.setdefault("active_tab", "Карта")
     st.session_state.setdefault("ways_ui_tab", "Карта")
     st.session_state.setdefault("pending_nav_section", None)
     st.session_state.setdefault("pending_graph_tab", None)
     st.session_state.setdefault("pending_anchor", None)
-    st.session_state.setdefault("pending_payload", None)
     st.session_state.setdefault("pending_nav", None)
-    st.session_state.setdefault("last_click_id", None)
     st.session_state.setdefault("matrix_focus_cell", None)
     st.session_state.setdefault("ways_highlight_node_id", None)
     st.session_state.setdefault("ways_selected_node_id", None)
@@ -113,10 +148,7 @@ def init_session_state() -> None:
     st.session_state.setdefault("ways_ignore_next_selection", False)
     st.session_state.setdefault("ways_last_tap", {"node_id": None, "timestamp_ms": 0.0})
     st.session_state.setdefault("ways_outside_only", False)
-    st.session_state.setdefault("variants_filter_way", "all")
-    st.session_state.setdefault("variants_filter_kind", "all")
     st.session_state.setdefault("variants_filter_cell", "all")
-    st.session_state.setdefault("variants_filter_outside", False)
     st.session_state.setdefault("variants_filter_way_id", "all")
     st.session_state.setdefault("variants_profile_id", None)
     st.session_state.setdefault("variants_subprofile_id", None)
@@ -130,26 +162,6 @@ def init_session_state() -> None:
     st.session_state.setdefault("variants_library_mechanism", "all")
     st.session_state.setdefault("variants_library_cell", "all")
     st.session_state.setdefault("variants_library_kind", "all")
-    st.session_state.setdefault("shortlist", {})
-    st.session_state.setdefault(
-        "selection",
-        {
-            "selected_matrix_cell": None,
-            "selected_transition": None,
-            "selected_classifiers": {"sell": [], "to_whom": [], "measure": []},
-            "selected_mechanism_ids": [],
-            "selected_route_id": None,
-            "selected_bridge_ids": [],
-            "selected_profile_id": None,
-            "selected_subprofile_id": None,
-            "selected_work_formats": [],
-            "selected_entry_levels": [],
-            "include_untagged": True,
-            "risk": "all",
-            "activity": "all",
-            "scalability": "all",
-        },
-    )
     st.session_state.setdefault(
         "selected_classifier_filters",
         {"what_sell": [], "to_whom": [], "value_measure": []},
@@ -158,12 +170,12 @@ def init_session_state() -> None:
     st.session_state.setdefault("classifier_selected_to_whom", set())
     st.session_state.setdefault("classifier_selected_value_measure", set())
     st.session_state.setdefault("classifier_mode", "panel")
-    st.session_state.setdefault("classifier_selection_snapshot", {})
     st.session_state.setdefault("classifier_directory_search", "")
     st.session_state.setdefault("classifier_directory_group", "all")
     st.session_state.setdefault("matrix_axis_risk", "low")
     st.session_state.setdefault("matrix_axis_activity", "active")
     st.session_state.setdefault("matrix_axis_scalability", "linear")
+    session_model()
 
 
 def _apply_pending_nav_state() -> None:
@@ -185,11 +197,8 @@ def apply_pending_navigation() -> None:
 
     pending_payload = st.session_state.pop("pending_payload", None)
     if isinstance(pending_payload, dict):
-        payload = st.session_state.get("nav_payload")
-        if not isinstance(payload, dict):
-            payload = {}
-        payload.update(pending_payload)
-        st.session_state["nav_payload"] = payload
+        section = st.session_state.get("pending_nav_section") or st.session_state.get("nav_section")
+        st.session_state["nav_intent"] = {"section": section, "params": pending_payload}
 
     pending_nav = st.session_state.pop("pending_nav", None)
     if isinstance(pending_nav, dict):
@@ -198,11 +207,6 @@ def apply_pending_navigation() -> None:
         if isinstance(section, str) and section:
             st.session_state["nav_section"] = section
         if isinstance(params, dict):
-            payload = st.session_state.get("nav_payload")
-            if not isinstance(payload, dict):
-                payload = {}
-            payload.update(params)
-            st.session_state["nav_payload"] = payload
             st.session_state["nav_intent"] = {"section": section, "params": params}
 
     pending_section = st.session_state.pop("pending_nav_section", None)
@@ -241,46 +245,14 @@ def request_navigation(
 
 
 def sync_selection_context() -> dict[str, object]:
-    selection = st.session_state.get("selection")
-    if not isinstance(selection, dict):
-        selection = {}
-    selection.setdefault("selected_classifiers", {"sell": [], "to_whom": [], "measure": []})
-    selection.setdefault("selected_mechanism_ids", [])
-    selection.setdefault("selected_bridge_ids", [])
-    selection.setdefault("selected_matrix_cell", None)
-    selection.setdefault("selected_transition", None)
-    selection.setdefault("selected_route_id", None)
-    selection.setdefault("selected_profile_id", None)
-    selection.setdefault("selected_subprofile_id", None)
-    selection.setdefault("selected_work_formats", [])
-    selection.setdefault("selected_entry_levels", [])
-    selection.setdefault("include_untagged", True)
-
-    selection["selected_matrix_cell"] = st.session_state.get("selected_cell_id")
-    selection["selected_transition"] = st.session_state.get("selected_transition")
-    selection["selected_route_id"] = st.session_state.get("selected_route_id")
-    selection["selected_profile_id"] = st.session_state.get("variants_profile_id")
-    selection["selected_subprofile_id"] = st.session_state.get("variants_subprofile_id")
-    selection["selected_work_formats"] = st.session_state.get("variants_work_formats", [])
-    selection["selected_entry_levels"] = st.session_state.get("variants_entry_levels", [])
-    selection["include_untagged"] = st.session_state.get("variants_include_untagged", True)
-    selection["risk"] = st.session_state.get("filter_risk", "all")
-    selection["activity"] = st.session_state.get("filter_activity", "all")
-    selection["scalability"] = st.session_state.get("filter_scalability", "all")
-
+    # Контекст собирается из ключей сессии на каждый вызов и не хранится: в сессии только исходные id.
     classifier_state = get_classifier_selection_state()
-    selection["selected_classifiers"] = {
-        "sell": sorted(classifier_state.get("what_sell", set())),
-        "to_whom": sorted(classifier_state.get("to_whom", set())),
-        "measure": sorted(classifier_state.get("value_measure", set())),
-    }
 
     mechanism_ids: list[str] = []
     for key in ("selected_way_id", "ways_selected_way_id", "selected_tax_id"):
         way_id = st.session_state.get(key)
         if isinstance(way_id, str) and way_id and way_id not in mechanism_ids:
             mechanism_ids.append(way_id)
-    selection["selected_mechanism_ids"] = mechanism_ids
 
     bridge_ids: list[str] = []
     selected_bridge_id = st.session_state.get("selected_bridge_id")
@@ -291,32 +263,27 @@ def sync_selection_context() -> dict[str, object]:
         for bridge_id in chosen_bridges.values():
             if isinstance(bridge_id, str) and bridge_id and bridge_id not in bridge_ids:
                 bridge_ids.append(bridge_id)
-    selection["selected_bridge_ids"] = bridge_ids
-
-    st.session_state["selection"] = selection
-    update_nav_payload_from_state()
-    return selection
-
 
-def update_nav_payload_from_state() -> dict[str, object]:
-    payload = st.session_state.get("nav_payload")
-    if not isinstance(payload, dict):
-        payload = {}
-    classifier_state = get_classifier_selection_state()
-    payload["selected_cell_id"] = st.session_state.get("selected_cell_id")
-    payload["classifier_selected_what_sell"] = set(classifier_state.get("what_sell", set()))
-    payload["classifier_selected_to_whom"] = set(classifier_state.get("to_whom", set()))
-    payload["classifier_selected_value_measure"] = set(classifier_state.get("value_measure", set()))
-    payload["selected_way_id"] = st.session_state.get("selected_way_id")
-    payload["selected_route_id"] = st.session_state.get("selected_route_id")
-    payload["selected_bridge_id"] = st.session_state.get("selected_bridge_id")
-    payload["selected_variant_id"] = st.session_state.get("selected_variant_id")
-    payload["profile_id"] = st.session_state.get("variants_profile_id")
-    payload["subprofile_id"] = st.session_state.get("variants_subprofile_id")
-    payload["work_format_ids"] = st.session_state.get("variants_work_formats")
-    payload["entry_level_ids"] = st.session_state.get("variants_entry_levels")
-    st.session_state["nav_payload"] = payload
-    return payload
+    return {
+        "selected_matrix_cell": st.session_state.get("selected_cell_id"),
+        "selected_transition": st.session_state.get("selected_transition"),
+        "selected_route_id": st.session_state.get("selected_route_id"),
+        "selected_profile_id": st.session_state.get("variants_profile_id"),
+        "selected_subprofile_id": st.session_state.get("variants_subprofile_id"),
+        "selected_work_formats": st.session_state.get("variants_work_formats", []),
+        "selected_entry_levels": st.session_state.get("variants_entry_levels", []),
+        "include_untagged": st.session_state.get("variants_include_untagged", True),
+        "risk": st.session_state.get("filter_risk", "all"),
+        "activity": st.session_state.get("filter_activity", "all"),
+        "scalability": st.session_state.get("filter_scalability", "all"),
+        "selected_classifiers": {
+            "sell": sorted(classifier_state.get("what_sell", set())),
+            "to_whom": sorted(classifier_state.get("to_whom", set())),
+            "measure": sorted(classifier_state.get("value_measure", set())),
+        },
+        "selected_mechanism_ids": mechanism_ids,
+        "selected_bridge_ids": bridge_ids,
+    }
 
 
 def consume_nav_intent(section: str) -> Optional[dict[str, object]]:
@@ -399,33 +366,44 @@ def render_path_wizard(current_step: str) -> None:
             action_cols[2].caption(f"{hint_now} {hint_next}".strip())
 
 
-def add_compare_item(item: dict[str, object]) -> bool:
-    if not item or not item.get("type") or not item.get("id"):
-        return False
-    items = st.session_state.get("compare_items")
-    if not isinstance(items, list):
-        items = []
-    for existing in items:
-        if existing.get("type") == item.get("type") and existing.get("id") == item.get("id"):
-            return False
-    items.append(item)
-    st.session_state["compare_items"] = items
-    return True
+SESSION_MODEL_KEY = "session_model"
 
 
-def remove_compare_item(item_type: str, item_id: str) -> None:
-    items = st.session_state.get("compare_items")
-    if not isinstance(items, list):
+def session_model() -> SessionModel:
+    model = st.session_state.get(SESSION_MODEL_KEY)
+    if not isinstance(model, SessionModel):
+        model = SessionModel()
+        st.session_state[SESSION_MODEL_KEY] = model
+    return model
+
+
+def session_state_size() -> StateSize:
+    # Общие для процесса объекты (снимок данных, каталог вариантов) в размер сессии не входят.
+    snapshot = data_snapshot()
+    shared = (snapshot, snapshot.data, variant_catalog(snapshot.data))
+    return measure_state(st.session_state.to_dict().items(), shared=shared)
+
+
+def render_session_state_stats() -> None:
+    if not os.environ.get("MONEY_MAP_STATE_STATS"):
         return
-    st.session_state["compare_items"] = [
-        item
-        for item in items
-        if item.get("type") != item_type or item.get("id") != item_id
-    ]
+    size = session_state_size()
+    with st.sidebar.expander("Память сессии"):
+        st.caption(f"Ключей: {len(size.by_key)}, всего: {size.total / 1024:.1f} КБ")
+        for key, value in size.top(10):
+            st.caption(f"{key}: {value / 1024:.1f} КБ")
+
+
+def add_compare_item(item_type: str, item_id: str) -> bool:
+    return session_model().add_compare(item_type, item_id)
+
+
+def remove_compare_item(item_type: str, item_id: str) -> None:
+    session_model().remove_compare(item_type, item_id)
 
 
 def clear_compare_items() -> None:
-    st.session_state["compare_items"] = []
+    session_model().clear_compare()
 
 
 def request_page(page: str) -> None:
@@ -573,36 +551,27 @@ def axis_label(axis: str, value: str) -> str:
 
 
 def set_page(page: str) -> None:
-    st.session_state["page"] = page
-    st.session_state["active_section"] = page
     request_navigation(section=page)
 
 
 def set_selected_cell(cell_id: Optional[str]) -> None:
-    st.session_state["selected_cell"] = cell_id
     st.session_state["selected_cell_id"] = cell_id
-    st.session_state["graph_selected_node"] = cell_id
 
 
 def set_selected_taxonomy(item_id: Optional[str]) -> None:
-    st.session_state["selected_taxonomy"] = item_id
     st.session_state["selected_way_id"] = item_id
 
 
 def set_selected_tax_id(item_id: Optional[str]) -> None:
     st.session_state["selected_tax_id"] = item_id
-    st.session_state["selected_taxonomy"] = item_id
     st.session_state["selected_way_id"] = item_id
 
 
 def set_selected_bridge(bridge_id: Optional[str]) -> None:
-    st.session_state["selected_bridge"] = bridge_id
     st.session_state["selected_bridge_id"] = bridge_id
-    st.session_state["graph_selected_bridge"] = bridge_id
 
 
 def set_selected_path(path_id: Optional[str]) -> None:
-    st.session_state["selected_path"] = path_id
     st.session_state["selected_route_id"] = path_id
 
 
@@ -682,6 +651,90 @@ def apply_global_filters_to_variants(
     return results
 
 
+@st.cache_resource(show_spinner="Подготовка каталога вариантов...", max_entries=4)
+def _variant_catalog_for_version(version: str, _data: AppData) -> VariantCatalog:
+    return build_variant_catalog(_data.variants)
+
+
+def variant_catalog(app_data: AppData) -> VariantCatalog:
+    # Нормализация и индексы строятся один раз на версию данных и общие для всех сессий.
+    return _variant_catalog_for_version(data_version(), app_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _bridge_relations_for_version(version: str, _data: AppData) -> BridgeRelations:
+    return build_bridge_relations(_data)
+
+
+def bridge_relations(app_data: AppData) -> BridgeRelations:
+    # Связи мостов с переходами, способами, маршрутами и вариантами — один экземпляр на версию данных.
+    return _bridge_relations_for_version(data_version(), app_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cell_aggregates_for_version(version: str, _data: AppData) -> CellAggregates:
+    return build_cell_aggregates(_data, bridge_relations(_data))
+
+
+def cell_aggregates(app_data: AppData) -> CellAggregates:
+    # Счётчики по ячейкам, переходам и способам не зависят от фильтров — считаются раз на версию данных.
+    return _cell_aggregates_for_version(data_version(), app_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _route_catalog_for_version(version: str, _data: AppData) -> RouteCatalog:
+    return build_route_catalog(_data, bridge_relations(_data), variant_index(_data))
+
+
+def route_catalog(app_data: AppData) -> RouteCatalog:
+    # Карточки маршрутов с мостами по шагам и масками вариантов; фильтрация — по маскам строк.
+    return _route_catalog_for_version(data_version(), app_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _classifier_catalog_for_version(version: str, _data: AppData) -> ClassifierCatalog:
+    return build_classifier_catalog(_data, variant_index(_data))
+
+
+def classifier_catalog(app_data: AppData) -> ClassifierCatalog:
+    # Справочник классификатора и индексы тег -> варианты / способы, раз на версию данных.
+    return _classifier_catalog_for_version(data_version(), app_data)
+
+
+def variant_index(app_data: AppData) -> VariantIndex:
+    # Строки индекса идут в порядке app_data.variants.
+    return variant_catalog(app_data).index
+
+
+@st.cache_resource(show_spinner=False)
+def library_result_cache() -> ResultSetCache:
+    return ResultSetCache()
+
+
+def library_rows(catalog: VariantCatalog, query: LibraryQuery) -> array:
+    # Сначала общий кэш популярных запросов, затем уточнение прошлого результата этой сессии.
+    cache = library_result_cache()
+    rows = cache.get(query)
+    if rows is None:
+        rows = query_library_rows(catalog, query, st.session_state.get("variants_library_memo"))
+        cache.put(query, rows)
+    st.session_state["variants_library_memo"] = (query, rows)
+    return rows
+
+
+def global_variant_mask(app_data: AppData, filters: Filters) -> int:
+    index = variant_index(app_data)
+    return index.equals(risk_level=filters.risk, activity=filters.activity, scalability=filters.scalability)
+
+
+def global_filtered_variants(app_data: AppData, filters: Filters) -> List[Variant]:
+    index = variant_index(app_data)
+    mask = global_variant_mask(app_data, filters)
+    if mask == index.all_rows:
+        return list(app_data.variants)
+    return [app_data.variants[row] for row in iter_rows(mask)]
+
+
 def apply_global_filters_to_ways(
     ways: Iterable[TaxonomyItem],
     filters: Filters,
@@ -690,7 +743,7 @@ def apply_global_filters_to_ways(
     allowed_cells = get_allowed_cells_from_global_filters(data, filters)
     filtered_variant_ids = {
         variant.primary_way_id
-        for variant in apply_global_filters_to_variants(data.variants, filters)
+        for variant in global_filtered_variants(data, filters)
     }
     filtered = []
     for item in ways:
@@ -792,6 +845,81 @@ def chips(values: Iterable[str]) -> str:
     return _chips(values)
 
 
+PAGE_SIZES = (10, 25, 50)
+
+
+@dataclass(frozen=True)
+class Page:
+    number: int
+    count: int
+    start: int
+    stop: int
+    size: int
+
+
+def requested_page_end(key: str, page_sizes: Tuple[int, ...] = PAGE_SIZES, ahead: int = 1) -> int:
+    # Сколько первых строк нужно для текущей страницы и ещё ahead следующих (их готовят заранее).
+    size = st.session_state.get(f"{key}_page_size", page_sizes[0])
+    return (max(st.session_state.get(f"{key}_page", 0), 0) + 1 + ahead) * size
+
+
+def paginate(
+    total: int,
+    key: str,
+    signature: object = None,
+    page_sizes: Tuple[int, ...] = PAGE_SIZES,
+) -> Page:
+    # Курсор хранится в сессии; при смене набора фильтров (signature) листание начинается сначала.
+    size = st.session_state.setdefault(f"{key}_page_size", page_sizes[0])
+    if st.session_state.get(f"{key}_page_signature") != signature:
+        st.session_state[f"{key}_page_signature"] = signature
+        st.session_state[f"{key}_page"] = 0
+    count = max(1, -(-total // size))
+    number = min(max(st.session_state.get(f"{key}_page", 0), 0), count - 1)
+    st.session_state[f"{key}_page"] = number
+    return Page(
+        number=number,
+        count=count,
+        start=number * size,
+        stop=min(total, (number + 1) * size),
+        size=size,
+    )
+
+
+def _shift_page(key: str, step: int) -> None:
+    st.session_state[f"{key}_page"] = st.session_state.get(f"{key}_page", 0) + step
+
+
+def _reset_page(key: str) -> None:
+    st.session_state[f"{key}_page"] = 0
+
+
+def render_pagination(page: Page, key: str, page_sizes: Tuple[int, ...] = PAGE_SIZES) -> None:
+    cols = st.columns([1, 2, 1, 2])
+    cols[0].button(
+        "← Назад",
+        key=f"{key}-page-prev",
+        disabled=page.number == 0,
+        on_click=_shift_page,
+        args=(key, -1),
+    )
+    cols[1].caption(f"Страница {page.number + 1} из {page.count}")
+    cols[2].button(
+        "Вперёд →",
+        key=f"{key}-page-next",
+        disabled=page.number >= page.count - 1,
+        on_click=_shift_page,
+        args=(key, 1),
+    )
+    cols[3].selectbox(
+        "На странице",
+        page_sizes,
+        key=f"{key}_page_size",
+        on_change=_reset_page,
+        args=(key,),
+    )
+
+
 def render_taxonomy_details_card(
     app_data: AppData,
     tax_id: Optional[str],
@@ -823,19 +951,7 @@ def render_taxonomy_details_card(
                 key=f"ways-compare-{item.id}",
                 use_container_width=True,
             ):
-                add_compare_item(
-                    {
-                        "type": "way",
-                        "id": item.id,
-                        "name": item.name,
-                        "cell_id": item.typical_cells[0] if item.typical_cells else None,
-                        "classifier_tags": [
-                            *item.sell,
-                            *item.to_whom,
-                            *item.value,
-                        ],
-                    },
-                )
+                add_compare_item("way", item.id)
 
         st.markdown("#### Коротко")
         st.write(item.description)
@@ -1042,30 +1158,63 @@ def render_taxonomy_details_card(
                 st.caption(path.note or "—")
 
 
-@st.cache_data(show_spinner="Формирование графа...")
-def _build_taxonomy_graph_html(
-    data: AppData,
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _taxonomy_star_for_version(
+    version: str,
     include_tags: bool,
     outside_only: bool,
-    selected_tax_id: Optional[str],
-) -> str:
-    return render_taxonomy_graph_html(
-        data,
+    allowed_taxonomy_ids: Optional[Tuple[str, ...]],
+    _data: AppData,
+) -> nx.DiGraph:
+    return build_taxonomy_star(
+        _data,
         include_tags=include_tags,
         outside_only=outside_only,
-        selected_tax_id=selected_tax_id,
-        height="720px",
-        width="100%",
+        allowed_taxonomy_ids=set(allowed_taxonomy_ids) if allowed_taxonomy_ids is not None else None,
     )
 
 
+def taxonomy_star(
+    app_data: AppData,
+    include_tags: bool,
+    outside_only: bool,
+    allowed_taxonomy_ids: Optional[Iterable[str]] = None,
+) -> nx.DiGraph:
+    # Граф общий для всех сессий: его можно только читать.
+    allowed = tuple(sorted(allowed_taxonomy_ids)) if allowed_taxonomy_ids is not None else None
+    return _taxonomy_star_for_version(data_version(), include_tags, outside_only, allowed, app_data)
+
+
+@st.cache_data(show_spinner="Формирование графа...", max_entries=8)
+def _taxonomy_graph_base_html(
+    version: str,
+    include_tags: bool,
+    outside_only: bool,
+    _data: AppData,
+) -> str:
+    graph = _taxonomy_star_for_version(version, include_tags, outside_only, None, _data)
+    return render_taxonomy_graph_base_html(graph, height="720px", width="100%")
+
+
+def taxonomy_graph_html(
+    app_data: AppData,
+    include_tags: bool,
+    outside_only: bool,
+    selected_tax_id: Optional[str] = None,
+) -> str:
+    version = data_version()
+    html = _taxonomy_graph_base_html(version, include_tags, outside_only, app_data)
+    graph = _taxonomy_star_for_version(version, include_tags, outside_only, None, app_data)
+    return apply_taxonomy_selection(html, graph, selected_tax_id)
+
+
 def render_taxonomy_star_graph(
     app_data: AppData,
     selected_tax_id: Optional[str],
     show_tags: bool,
     outside_only: bool,
 ) -> None:
-    html = _build_taxonomy_graph_html(
+    html = taxonomy_graph_html(
         app_data,
         include_tags=show_tags,
         outside_only=outside_only,
@@ -1075,7 +1224,8 @@ def render_taxonomy_star_graph(
 
 
 def clear_taxonomy_graph_cache() -> None:
-    _build_taxonomy_graph_html.clear()
+    _taxonomy_star_for_version.clear()
+    _taxonomy_graph_base_html.clear()
 
 
 def render_taxonomy_list(app_data: AppData, search_query: str) -> Optional[str]:
@@ -1302,7 +1452,7 @@ def build_ways14_agraph_graph(
     highlighted_node_id: Optional[str],
     allowed_taxonomy_ids: Optional[set[str]] = None,
 ) -> Tuple[List[Node], List[Edge], Config]:
-    graph = build_taxonomy_star(
+    graph = taxonomy_star(
         app_data,
         include_tags=show_tags,
         outside_only=outside_only,
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Mapping
+
+from money_map.core.model import AppData, TaxonomyItem
+from money_map.core.variant_index import VariantIndex
+
+GROUP_ORDER = ("what_sell", "to_whom", "value_measure")
+
+# Группа классификатора -> (поле в индексе вариантов, поле способа, группа ключевых слов).
+GROUP_SOURCES = {
+    "what_sell": ("sell_tags", "sell", "sell"),
+    "to_whom": ("to_whom_tags", "to_whom", "to_whom"),
+    "value_measure": ("value_tags", "value", "value"),
+}
+
+# Определения и примеры для справочника классификатора.
+CLASSIFIER_DETAILS = {
+    "what_sell": {
+        "time": {
+            "short_definition": "Оплата за время участия или присутствия.",
+            "examples": ["Оклад", "Почасовая ставка"],
+        },
+        "result": {
+            "short_definition": "Оплата за достижение результата или выполнение задачи.",
+            "examples": ["Фикс за проект", "Бонус за KPI"],
+        },
+        "risk": {
+            "short_definition": "Оплата за принятие риска или ответственности.",
+            "examples": ["Процент от сделки", "Ответственность за исход"],
+        },
+        "access": {
+            "short_definition": "Оплата за предоставление доступа к ресурсу или каналу.",
+            "examples": ["Подписка", "Аренда доступа"],
+        },
+        "attention": {
+            "short_definition": "Оплата за внимание и охваты аудитории.",
+            "examples": ["Реклама", "Спонсорство"],
+        },
+        "capital": {
+            "short_definition": "Доход за предоставление капитала или ресурсов.",
+            "examples": ["Инвестиции", "Кредит"],
+        },
+        "property": {
+            "short_definition": "Доход за использование собственности.",
+            "examples": ["Аренда имущества", "Лицензия"],
+        },
+    },
+    "to_whom": {
+        "single_client": {
+            "short_definition": "Сделка с одним клиентом или заказчиком.",
+            "examples": ["Консалтинг", "Проектная работа"],
+        },
+        "many_people": {
+            "short_definition": "Продажа многим людям и массовой аудитории.",
+            "examples": ["Потребительский продукт", "Онлайн-курс"],
+        },
+        "market": {
+            "short_definition": "Сделка на рынке или бирже.",
+            "examples": ["Трейдинг", "Арбитраж"],
+        },
+        "platform": {
+            "short_definition": "Сделка через платформу или маркетплейс.",
+            "examples": ["Маркетплейс", "App Store"],
+        },
+        "state": {
+            "short_definition": "Сделка с государством и госпрограммами.",
+            "examples": ["Госзакупки", "Грант"],
+        },
+    },
+    "value_measure": {
+        "rate": {
+            "short_definition": "Оплата по ставке за единицу времени или нормы.",
+            "examples": ["Почасовая ставка", "Оклад"],
+        },
+        "price": {
+            "short_definition": "Фиксированная цена за продукт или услугу.",
+            "examples": ["Разовая продажа", "Пакет услуг"],
+        },
+        "percent": {
+            "short_definition": "Доля или процент от результата.",
+            "examples": ["Комиссия", "Роялти"],
+        },
+        "rent": {
+            "short_definition": "Регулярная рента за пользование активом.",
+            "examples": ["Аренда", "Лизинг"],
+        },
+        "payout": {
+            "short_definition": "Выплата, купон или дивиденд.",
+            "examples": ["Дивиденды", "Купон по облигации"],
+        },
+        "appreciation": {
+            "short_definition": "Рост стоимости актива или доли.",
+            "examples": ["Рост цены", "Продажа с прибылью"],
+        },
+    },
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ClassifierItem:
+    id: str
+    classifier_id: str
+    group: str
+    name: str
+    keywords: tuple[str, ...]
+    short_definition: str
+    examples: tuple[str, ...]
+    # Название, id и ключевые слова в нижнем регистре — для поиска в справочнике.
+    search_text: str
+
+
+@dataclass(frozen=True)
+class ClassifierCatalog:
+    # Справочник и обратные индексы одной версии данных; общий для всех сессий, только для чтения.
+    items: tuple[ClassifierItem, ...]
+    # Группа -> (id, название) по названию, для чипсов панели.
+    options: dict[str, tuple[tuple[str, str], ...]]
+    # (группа, тег) -> маска строк data.variants / строки data.taxonomy.
+    variants_by_tag: dict[tuple[str, str], int]
+    ways_by_tag: dict[tuple[str, str], tuple[int, ...]]
+    # Группа -> варианты без тегов этой группы: они не отсекаются выбором в ней.
+    untagged_variants: dict[str, int]
+    all_variants: int
+
+    def variant_mask(self, selections: Mapping[str, set[str]]) -> int:
+        # То же правило, что score_variant_against_classifiers: в каждой выбранной группе
+        # нужен хотя бы один общий тег, либо у варианта нет тегов этой группы.
+        mask = self.all_variants
+        for group, selected in selections.items():
+            if not selected or group not in self.untagged_variants:
+                continue
+            allowed = self.untagged_variants[group]
+            for tag in selected:
+                allowed |= self.variants_by_tag.get((group, tag), 0)
+            mask &= allowed
+        return mask
+
+    def matching_ways(
+        self,
+        data: AppData,
+        selections: Mapping[str, set[str]],
+    ) -> list[tuple[TaxonomyItem, float]]:
+        scores: Counter[int] = Counter()
+        for group, selected in selections.items():
+            for tag in selected:
+                for row in self.ways_by_tag.get((group, tag), ()):
+                    scores[row] += 2.0
+        matches = [(data.taxonomy[row], score) for row, score in scores.items()]
+        matches.sort(key=lambda pair: (-pair[1], pair[0].name))
+        return matches
+
+    def search(self, text: str, group: str = "all") -> list[ClassifierItem]:
+        needle = text.lower()
+        return [
+            item
+            for item in self.items
+            if (group == "all" or item.group == group) and (not needle or needle in item.search_text)
+        ]
+
+
+def build_classifier_catalog(
+    data: AppData,
+    index: VariantIndex,
+    details: Mapping[str, Mapping[str, dict]] = CLASSIFIER_DETAILS,
+) -> ClassifierCatalog:
+    tag_keywords = data.keywords.keywords.get("tags", {})
+    mappings = {
+        "what_sell": data.mappings.sell_items,
+        "to_whom": data.mappings.to_whom_items,
+        "value_measure": data.mappings.value_measures,
+    }
+    items: list[ClassifierItem] = []
+    options: dict[str, tuple[tuple[str, str], ...]] = {}
+    variants_by_tag: dict[tuple[str, str], int] = {}
+    untagged_variants: dict[str, int] = {}
+    ways_by_tag: dict[tuple[str, str], list[int]] = {}
+    for group in GROUP_ORDER:
+        index_field, way_field, keyword_group = GROUP_SOURCES[group]
+        group_details = details.get(group, {})
+        for item_id, item in mappings[group].items():
+            detail = group_details.get(item_id, {})
+            keywords = tuple(tag_keywords.get(keyword_group, {}).get(item_id, []))
+            items.append(
+                ClassifierItem(
+                    id=item_id,
+                    classifier_id=f"{group}.{item_id}",
+                    group=group,
+                    name=item.label,
+                    keywords=keywords,
+                    short_definition=detail.get("short_definition") or item.notes or "—",
+                    examples=tuple(detail.get("examples", [])),
+                    search_text=" ".join([item.label, item_id, " ".join(keywords)]).lower(),
+                )
+            )
+        options[group] = tuple(
+            (item_id, item.label)
+            for item_id, item in sorted(mappings[group].items(), key=lambda pair: pair[1].label)
+        )
+
+        tagged = 0
+        for tag, mask in index.bitmaps[index_field].items():
+            if tag is None:
+                continue
+            variants_by_tag[(group, tag)] = mask
+            tagged |= mask
+        untagged_variants[group] = index.all_rows & ~tagged
+
+        for row, way in enumerate(data.taxonomy):
+            for tag in dict.fromkeys(getattr(way, way_field)):
+                ways_by_tag.setdefault((group, tag), []).append(row)
+
+    return ClassifierCatalog(
+        items=tuple(items),
+        options=options,
+        variants_by_tag=variants_by_tag,
+        ways_by_tag={key: tuple(rows) for key, rows in ways_by_tag.items()},
+        untagged_variants=untagged_variants,
+        all_variants=index.all_rows,
+    )
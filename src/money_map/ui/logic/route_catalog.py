@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from money_map.core.model import AppData
+from money_map.core.relations import BridgeRelations
+from money_map.core.variant_index import VariantIndex, iter_rows, mask_from_rows
+
+
+@dataclass(frozen=True, slots=True)
+class RouteView:
+    route_id: str
+    name: str
+    cells: tuple[str, ...]
+    transitions: tuple[str, ...]
+    short_summary: str
+    # Переход -> id мостов по названию.
+    recommended_bridges_by_transition: dict[str, tuple[str, ...]]
+    linked_way_ids: tuple[str, ...]
+    # Маски строк data.variants: как фильтр «по маршруту» на странице вариантов и по каждому шагу.
+    variant_mask: int
+    step_variant_masks: tuple[int, ...]
+
+    @property
+    def variants(self) -> int:
+        return self.variant_mask.bit_count()
+
+
+@dataclass(frozen=True)
+class RouteCatalog:
+    # Маршруты одной версии данных в порядке data.paths; фильтры — маски строк этого списка.
+    routes: tuple[RouteView, ...]
+    by_id: dict[str, RouteView]
+    by_start: dict[str, int]
+    by_target: dict[str, int]
+    by_cell: dict[str, int]
+
+    def route(self, route_id: str | None) -> RouteView | None:
+        return self.by_id.get(route_id) if route_id else None
+
+    def filter(
+        self,
+        *,
+        start_cell: str | None = None,
+        target_cell: str | None = None,
+        allowed_cells: Iterable[str] | None = None,
+    ) -> list[RouteView]:
+        mask = (1 << len(self.routes)) - 1
+        if start_cell:
+            mask &= self.by_start.get(start_cell, 0)
+        if target_cell:
+            mask &= self.by_target.get(target_cell, 0)
+        if allowed_cells is not None:
+            allowed = 0
+            for cell_id in allowed_cells:
+                allowed |= self.by_cell.get(cell_id, 0)
+            mask &= allowed
+        return [self.routes[row] for row in iter_rows(mask)]
+
+
+def short_summary(text: str) -> str:
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    return lines[0] if lines else "Короткое описание недоступно."
+
+
+def _group_masks(groups: dict[str, list[int]], size: int) -> dict[str, int]:
+    return {key: mask_from_rows(rows, size) for key, rows in groups.items()}
+
+
+def build_route_catalog(data: AppData, relations: BridgeRelations, index: VariantIndex) -> RouteCatalog:
+    routes: list[RouteView] = []
+    by_start: dict[str, list[int]] = {}
+    by_target: dict[str, list[int]] = {}
+    by_cell: dict[str, list[int]] = {}
+    for row, path in enumerate(data.paths):
+        cells = tuple(path.sequence)
+        steps = list(zip(cells, cells[1:]))
+        transitions = relations.transitions_by_route.get(path.id, ())
+        bridges_by_step = [relations.transition_bridges(data, start, end) for start, end in steps]
+        routes.append(
+            RouteView(
+                route_id=path.id,
+                name=path.name,
+                cells=cells,
+                transitions=transitions,
+                short_summary=short_summary(path.note),
+                recommended_bridges_by_transition={
+                    transition: tuple(bridge.id for bridge in sorted(bridges, key=lambda item: item.name))
+                    for transition, bridges in zip(transitions, bridges_by_step)
+                },
+                linked_way_ids=tuple(
+                    sorted(
+                        {
+                            way_id
+                            for bridges in bridges_by_step
+                            for bridge in bridges
+                            for way_id in bridge.linked_way_ids
+                        }
+                    )
+                ),
+                variant_mask=index.all_of("matrix_cells", [cells[0], cells[-1]]) if cells else 0,
+                step_variant_masks=tuple(relations.transition_variants(start, end) for start, end in steps),
+            )
+        )
+        if cells:
+            by_start.setdefault(cells[0], []).append(row)
+            by_target.setdefault(cells[-1], []).append(row)
+        for cell_id in dict.fromkeys(cells):
+            by_cell.setdefault(cell_id, []).append(row)
+
+    size = len(routes)
+    return RouteCatalog(
+        routes=tuple(routes),
+        by_id={route.route_id: route for route in routes},
+        by_start=_group_masks(by_start, size),
+        by_target=_group_masks(by_target, size),
+        by_cell=_group_masks(by_cell, size),
+    )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Iterable, List, Optional, Tuple
+
+SHORTLIST_LIMIT = 5
+SHORTLIST_STATUSES = ("candidate", "finalist")
+
+# Ссылка на сущность AppData: (тип, id). Названия, ячейки и теги берутся из данных при отрисовке.
+EntityRef = Tuple[str, str]
+
+
+@dataclass(slots=True)
+class SessionModel:
+    # Состояние сессии, которое не привязано к виджетам: только идентификаторы, без копий объектов.
+    compare: List[EntityRef] = field(default_factory=list)
+    # id варианта -> статус из SHORTLIST_STATUSES; порядок вставки сохраняется.
+    shortlist: dict[str, str] = field(default_factory=dict)
+    search_selected: Optional[EntityRef] = None
+
+    def add_compare(self, item_type: str, item_id: str) -> bool:
+        if not item_type or not item_id:
+            return False
+        ref = (item_type, item_id)
+        if ref in self.compare:
+            return False
+        self.compare.append(ref)
+        return True
+
+    def remove_compare(self, item_type: str, item_id: str) -> None:
+        ref = (item_type, item_id)
+        self.compare = [item for item in self.compare if item != ref]
+
+    def clear_compare(self) -> None:
+        self.compare = []
+
+    def add_to_shortlist(self, variant_id: str) -> bool:
+        if variant_id in self.shortlist:
+            return True
+        if len(self.shortlist) >= SHORTLIST_LIMIT:
+            return False
+        self.shortlist[variant_id] = SHORTLIST_STATUSES[0]
+        return True
+
+    def remove_from_shortlist(self, variant_id: str) -> None:
+        self.shortlist.pop(variant_id, None)
+
+    def set_shortlist_status(self, variant_id: str, status: str) -> None:
+        if variant_id in self.shortlist and status in SHORTLIST_STATUSES:
+            self.shortlist[variant_id] = status
+
+
+def deep_sizeof(value: object, seen: Optional[set[int]] = None) -> int:
+    # Размер объекта вместе со вложенными контейнерами; общие объекты считаются один раз.
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, Mapping):
+        for key, item in value.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(item, seen)
+        return size
+    if isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += deep_sizeof(item, seen)
+        return size
+    if is_dataclass(value) and not isinstance(value, type):
+        for item in fields(value):
+            size += deep_sizeof(getattr(value, item.name), seen)
+        return size
+    attributes = getattr(value, "__dict__", None)
+    if isinstance(attributes, dict):
+        size += deep_sizeof(attributes, seen)
+    return size
+
+
+@dataclass(frozen=True)
+class StateSize:
+    total: int
+    # (ключ, байты) по убыванию размера.
+    by_key: Tuple[Tuple[str, int], ...]
+
+    def top(self, count: int = 10) -> Tuple[Tuple[str, int], ...]:
+        return self.by_key[:count]
+
+
+def measure_state(items: Iterable[Tuple[str, object]], shared: Iterable[object] = ()) -> StateSize:
+    # Объекты из shared (AppData, каталоги из cache_resource) принадлежат процессу, а не сессии.
+    seen = {id(value) for value in shared}
+    sizes = [(str(key), deep_sizeof(value, seen)) for key, value in items]
+    sizes.sort(key=lambda item: (-item[1], item[0]))
+    return StateSize(total=sum(size for _, size in sizes), by_key=tuple(sizes))
@@ -1,40 +1,46 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from money_map.core.model import Variant
+from money_map.core.variant_index import VariantIndex, build_variant_index
+from money_map.core.variant_store import build_variant_store
 
+# Группа классификаторов в интерфейсе -> многозначное поле варианта в индексе.
+CLASSIFIER_INDEX_FIELDS = {"sell": "sell_tags", "to_whom": "to_whom_tags", "measure": "value_tags"}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class NormalizedVariant:
     id: str
     title: str
     kind: str
     mechanism_id: str
-    matrix_cells: list[str]
+    matrix_cells: tuple[str, ...]
     matrix_cell: str | None
     risk: str
     activity: str
     scalability: str
-    classifiers: dict[str, list[str]]
+    classifiers: dict[str, tuple[str, ...]]
     summary: str
     description: str
-    linked_bridges: list[str]
+    linked_bridges: tuple[str, ...]
     linked_route: str | None
-    hints_fit: list[str]
-    hints_not_fit: list[str]
-    first_steps: list[str]
-    common_mistakes: list[str]
+    hints_fit: tuple[str, ...]
+    hints_not_fit: tuple[str, ...]
+    first_steps: tuple[str, ...]
+    common_mistakes: tuple[str, ...]
     outside_market: bool
-    success_metrics: list[str]
-    related_variant_ids: list[str]
+    success_metrics: tuple[str, ...]
+    related_variant_ids: tuple[str, ...]
     notes: str | None
     activity_role_family: str
     profile_id: str | None
     subprofile_id: str | None
-    work_format_ids: list[str]
-    entry_level_ids: list[str]
+    work_format_ids: tuple[str, ...]
+    entry_level_ids: tuple[str, ...]
     raw: Variant
 
 
@@ -56,37 +62,64 @@ def normalize_variant(variant: Variant) -> NormalizedVariant:
         title=variant.title,
         kind=variant.kind,
         mechanism_id=variant.primary_way_id,
-        matrix_cells=list(variant.matrix_cells),
+        matrix_cells=tuple(variant.matrix_cells),
         matrix_cell=variant.matrix_cells[0] if variant.matrix_cells else None,
         risk=variant.risk_level,
         activity=variant.activity,
         scalability=variant.scalability,
         classifiers={
-            "sell": list(variant.sell_tags),
-            "to_whom": list(variant.to_whom_tags),
-            "measure": list(variant.value_tags),
+            "sell": tuple(variant.sell_tags),
+            "to_whom": tuple(variant.to_whom_tags),
+            "measure": tuple(variant.value_tags),
         },
         summary=summary,
         description=description,
-        linked_bridges=list(variant.bridge_ids),
+        linked_bridges=tuple(variant.bridge_ids),
         linked_route=variant.route_ids[0] if variant.route_ids else None,
-        hints_fit=list(variant.requirements),
-        hints_not_fit=[],
-        first_steps=list(variant.first_steps),
-        common_mistakes=[],
+        hints_fit=tuple(variant.requirements),
+        hints_not_fit=(),
+        first_steps=tuple(variant.first_steps),
+        common_mistakes=(),
         outside_market=variant.outside_market,
-        success_metrics=list(variant.success_metrics),
-        related_variant_ids=list(variant.related_variant_ids),
+        success_metrics=tuple(variant.success_metrics),
+        related_variant_ids=tuple(variant.related_variant_ids),
         notes=variant.notes,
         activity_role_family=variant.activity_profile.role_family,
         profile_id=variant.profile_id,
         subprofile_id=variant.subprofile_id,
-        work_format_ids=list(variant.work_format_ids),
-        entry_level_ids=list(variant.entry_level_ids),
+        work_format_ids=tuple(variant.work_format_ids),
+        entry_level_ids=tuple(variant.entry_level_ids),
         raw=variant,
     )
 
 
+@dataclass(frozen=True)
+class VariantCatalog:
+    # Нормализованный каталог одной версии данных; общий для всех сессий, только для чтения.
+    variants: tuple[NormalizedVariant, ...]
+    by_id: dict[str, NormalizedVariant]
+    row_of: dict[str, int]
+    index: VariantIndex
+    # Заполненность и место в сортировке по названию — по строкам каталога.
+    coverage: array
+    title_rank: array
+
+
+def build_variant_catalog(variants: Sequence[Variant]) -> VariantCatalog:
+    normalized = tuple(normalize_variant(variant) for variant in variants)
+    title_rank = array("I", bytes(4 * len(normalized)))
+    for position, row in enumerate(sorted(range(len(normalized)), key=lambda row: normalized[row].title)):
+        title_rank[row] = position
+    return VariantCatalog(
+        variants=normalized,
+        by_id={variant.id: variant for variant in normalized},
+        row_of={variant.id: row for row, variant in enumerate(normalized)},
+        index=build_variant_index(build_variant_store(variants)),
+        coverage=array("B", (data_coverage_score(variant) for variant in normalized)),
+        title_rank=title_rank,
+    )
+
+
 def apply_global_filters(
     variants: Iterable[NormalizedVariant],
     *,
@@ -104,6 +137,52 @@ def apply_global_filters(
     return results
 
 
+def candidate_mask(
+    index: VariantIndex,
+    *,
+    selected_mechanism_ids: list[str],
+    selected_matrix_cell: str | None,
+    selected_classifiers: dict[str, list[str]],
+    selected_route_cells: list[str] | None,
+    selected_bridge_ids: list[str],
+    selected_profile_id: str | None,
+    selected_subprofile_id: str | None,
+    selected_work_formats: list[str],
+    selected_entry_levels: list[str],
+    include_untagged: bool,
+    strict: bool,
+) -> int:
+    # Маска вариантов, которые match_score может принять: в строгом режиме — ровно они,
+    # в мягком — надмножество, дальнейший отсев делает match_score.
+    mask = index.all_rows
+    if not include_untagged:
+        mask &= ~index.bitmap("profile_id", None)
+    if not strict:
+        return mask
+    if selected_mechanism_ids:
+        mask &= index.any_of("primary_way_id", selected_mechanism_ids)
+    if selected_matrix_cell:
+        mask &= index.bitmap("matrix_cells", selected_matrix_cell)
+    for group, tags in selected_classifiers.items():
+        if tags:
+            field = CLASSIFIER_INDEX_FIELDS.get(group)
+            mask &= index.any_of(field, tags) if field else 0
+    if selected_route_cells:
+        mask &= index.bitmap("matrix_cells", selected_route_cells[0])
+        mask &= index.bitmap("matrix_cells", selected_route_cells[-1])
+    if selected_bridge_ids:
+        mask &= index.any_of("bridge_ids", selected_bridge_ids)
+    if selected_profile_id:
+        mask &= index.bitmap("profile_id", selected_profile_id)
+    if selected_subprofile_id:
+        mask &= index.bitmap("subprofile_id", selected_subprofile_id)
+    if selected_work_formats:
+        mask &= index.any_of("work_format_ids", selected_work_formats)
+    if selected_entry_levels:
+        mask &= index.any_of("entry_level_ids", selected_entry_levels)
+    return mask
+
+
 def data_coverage_score(variant: NormalizedVariant) -> int:
     score = 0
     if variant.summary:
@@ -234,7 +313,8 @@ def match_score(
         elif strict:
             return None
 
-    score += data_coverage_score(variant)
+    coverage = data_coverage_score(variant)
+    score += coverage
 
     return MatchResult(
         variant=variant,
@@ -242,7 +322,7 @@ def match_score(
         reasons=reasons,
         classifier_match_count=classifier_match_count,
         classifier_group_count=len(selected_groups),
-        data_coverage=data_coverage_score(variant),
+        data_coverage=coverage,
     )
 
 
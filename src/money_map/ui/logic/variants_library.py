@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Hashable
+
+from money_map.core.variant_index import iter_rows
+from money_map.ui.logic.variants_filter import NormalizedVariant, VariantCatalog
+
+# Поля запроса, которые сужают выборку при переходе от "all" к конкретному значению.
+_EXACT_FILTERS = ("risk", "activity", "scalability", "mechanism", "kind", "cell")
+
+
+@dataclass(frozen=True)
+class LibraryQuery:
+    version: str
+    risk: str = "all"
+    activity: str = "all"
+    scalability: str = "all"
+    mechanism: str = "all"
+    kind: str = "all"
+    cell: str = "all"
+    # Строка поиска уже в нижнем регистре.
+    search: str = ""
+    sort: str = "title"
+
+    def narrows(self, previous: LibraryQuery) -> bool:
+        # Результат этого запроса — подмножество результата previous с тем же порядком.
+        if (self.version, self.sort) != (previous.version, previous.sort):
+            return False
+        for name in _EXACT_FILTERS:
+            before = getattr(previous, name)
+            if before != "all" and before != getattr(self, name):
+                return False
+        return previous.search in self.search
+
+
+def _matches(variant: NormalizedVariant, query: LibraryQuery, changed: set[str]) -> bool:
+    if "risk" in changed and variant.risk != query.risk:
+        return False
+    if "activity" in changed and variant.activity != query.activity:
+        return False
+    if "scalability" in changed and variant.scalability != query.scalability:
+        return False
+    if "mechanism" in changed and variant.mechanism_id != query.mechanism:
+        return False
+    if "kind" in changed and variant.kind != query.kind:
+        return False
+    if "cell" in changed and query.cell not in variant.matrix_cells:
+        return False
+    if "search" in changed:
+        return query.search in variant.title.lower() or query.search in variant.summary.lower()
+    return True
+
+
+def query_library_rows(
+    catalog: VariantCatalog,
+    query: LibraryQuery,
+    previous: tuple[LibraryQuery, array] | None = None,
+) -> array:
+    if previous is not None and query.narrows(previous[0]):
+        # Сужение фильтра: перепроверяем только прошлый результат и только изменившиеся условия.
+        before, rows = previous
+        changed = {
+            item.name for item in fields(query) if getattr(query, item.name) != getattr(before, item.name)
+        }
+        variants = catalog.variants
+        return array("I", (row for row in rows if _matches(variants[row], query, changed)))
+
+    index = catalog.index
+    mask = index.equals(
+        risk_level=query.risk,
+        activity=query.activity,
+        scalability=query.scalability,
+        primary_way_id=query.mechanism,
+        kind=query.kind,
+    )
+    if query.cell != "all":
+        mask &= index.bitmap("matrix_cells", query.cell)
+    rows = list(iter_rows(mask))
+    if query.search:
+        changed = {"search"}
+        rows = [row for row in rows if _matches(catalog.variants[row], query, changed)]
+    coverage = catalog.coverage
+    title_rank = catalog.title_rank
+    if query.sort == "coverage":
+        rows.sort(key=lambda row: (-coverage[row], title_rank[row]))
+    else:
+        rows.sort(key=title_rank.__getitem__)
+    return array("I", rows)
+
+
+class ResultSetCache:
+    # Общий для сессий LRU-кэш результатов с ограничением по числу записей и по памяти.
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, array] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _size(rows: array) -> int:
+        return rows.itemsize * len(rows)
+
+    def get(self, key: Hashable) -> array | None:
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, key: Hashable, rows: array) -> None:
+        size = self._size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= self._size(previous)
+            self._entries[key] = rows
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
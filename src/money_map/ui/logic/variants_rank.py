@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any
+
+from money_map.core.variant_index import iter_rows
+from money_map.ui.logic.variants_filter import (
+    CLASSIFIER_INDEX_FIELDS,
+    MatchResult,
+    VariantCatalog,
+    candidate_mask,
+    match_score,
+)
+
+
+@dataclass(frozen=True)
+class SelectionContext:
+    selected_matrix_cell: str | None
+    selected_transition: str | None
+    selected_mechanism_ids: list[str]
+    selected_classifiers: dict[str, list[str]]
+    selected_route_id: str | None
+    selected_route_cells: list[str] | None
+    selected_bridge_ids: list[str]
+    selected_profile_id: str | None
+    selected_subprofile_id: str | None
+    selected_work_formats: list[str]
+    selected_entry_levels: list[str]
+    include_untagged: bool
+
+
+def match_arguments(context: SelectionContext, strict: bool) -> dict[str, Any]:
+    return {
+        "selected_mechanism_ids": context.selected_mechanism_ids,
+        "selected_matrix_cell": context.selected_matrix_cell,
+        "selected_classifiers": context.selected_classifiers,
+        "selected_route_cells": context.selected_route_cells,
+        "selected_bridge_ids": context.selected_bridge_ids,
+        "selected_profile_id": context.selected_profile_id,
+        "selected_subprofile_id": context.selected_subprofile_id,
+        "selected_work_formats": context.selected_work_formats,
+        "selected_entry_levels": context.selected_entry_levels,
+        "include_untagged": context.include_untagged,
+        "strict": strict,
+    }
+
+
+@dataclass(frozen=True)
+class RankedVariants:
+    catalog: VariantCatalog
+    arguments: dict[str, Any]
+    # Строки каталога в порядке выдачи (при top_k — только первые top_k).
+    rows: list[int]
+    mask: int
+    total: int
+    scores: array
+
+    def result(self, row: int) -> MatchResult | None:
+        # Причины и MatchResult собираются только для показываемых строк.
+        return match_score(self.catalog.variants[row], **self.arguments)
+
+    def results(self, start: int = 0, stop: int | None = None) -> list[MatchResult]:
+        return [result for row in self.rows[start:stop] if (result := self.result(row)) is not None]
+
+    def match(self, variant_id: str) -> MatchResult | None:
+        row = self.catalog.row_of.get(variant_id)
+        if row is None or not self.mask >> row & 1:
+            return None
+        return self.result(row)
+
+
+def _at_least(masks: list[int], count: int) -> int:
+    # Строки, попавшие хотя бы в count масок из списка (масок немного — по группам классификаторов).
+    result = 0
+    for subset in combinations(masks, count):
+        combined = subset[0]
+        for mask in subset[1:]:
+            combined &= mask
+        result |= combined
+    return result
+
+
+def _add(scores: array, mask: int, weight: float) -> None:
+    for row in iter_rows(mask):
+        scores[row] += weight
+
+
+def rank_variants(
+    catalog: VariantCatalog,
+    context: SelectionContext,
+    *,
+    strict: bool,
+    global_mask: int | None = None,
+    top_k: int | None = None,
+) -> RankedVariants:
+    # Те же правила, что в match_score, но по битовым картам: каждое условие — одна маска,
+    # очки начисляются проходом по её строкам, а не ветвлением на каждом варианте.
+    index = catalog.index
+    arguments = match_arguments(context, strict)
+    mask = candidate_mask(index, **arguments)
+    if global_mask is not None:
+        mask &= global_mask
+
+    group_masks = []
+    for group, tags in context.selected_classifiers.items():
+        if tags:
+            field = CLASSIFIER_INDEX_FIELDS.get(group)
+            group_masks.append(index.any_of(field, tags) if field else 0)
+    if group_masks and not strict:
+        mask &= _at_least(group_masks, max(1, len(group_masks) - 1))
+
+    scores = array("d", catalog.coverage)
+    if context.selected_mechanism_ids:
+        _add(scores, mask & index.any_of("primary_way_id", context.selected_mechanism_ids), 3)
+    if context.selected_matrix_cell:
+        _add(scores, mask & index.bitmap("matrix_cells", context.selected_matrix_cell), 2)
+    for group_mask in group_masks:
+        _add(scores, mask & group_mask, 2)
+    if context.selected_route_cells:
+        route_mask = index.bitmap("matrix_cells", context.selected_route_cells[0])
+        route_mask &= index.bitmap("matrix_cells", context.selected_route_cells[-1])
+        _add(scores, mask & route_mask, 2)
+    if context.selected_bridge_ids:
+        bridge_counts: dict[int, int] = {}
+        for bridge_id in context.selected_bridge_ids:
+            for row in iter_rows(mask & index.bitmap("bridge_ids", bridge_id)):
+                bridge_counts[row] = bridge_counts.get(row, 0) + 1
+        for row, count in bridge_counts.items():
+            scores[row] += min(6, 2 * count)
+    if context.selected_profile_id:
+        _add(scores, mask & index.bitmap("profile_id", context.selected_profile_id), 4)
+        if not strict:
+            _add(scores, mask & index.bitmap("profile_id", None), 0.5)
+    if context.selected_subprofile_id:
+        _add(scores, mask & index.bitmap("subprofile_id", context.selected_subprofile_id), 2)
+    for field, values in (
+        ("work_format_ids", context.selected_work_formats),
+        ("entry_level_ids", context.selected_entry_levels),
+    ):
+        for value in set(values):
+            _add(scores, mask & index.bitmap(field, value), 1)
+
+    coverage = catalog.coverage
+    title_rank = catalog.title_rank
+
+    def order_key(row: int) -> tuple[float, int, int]:
+        return -scores[row], -coverage[row], title_rank[row]
+
+    rows = list(iter_rows(mask))
+    total = len(rows)
+    if top_k is not None and top_k < total:
+        rows = heapq.nsmallest(top_k, rows, key=order_key)
+    else:
+        rows.sort(key=order_key)
+    return RankedVariants(
+        catalog=catalog,
+        arguments=arguments,
+        rows=rows,
+        mask=mask,
+        total=total,
+        scores=scores,
+    )
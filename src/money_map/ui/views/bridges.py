@@ -4,7 +4,8 @@ from collections import defaultdict
 
 import streamlit as st
 
-from money_map.core.model import AppData, BridgeItem, Cell, PathItem, TaxonomyItem, Variant
+from money_map.core.model import AppData, BridgeItem, Cell, PathItem, TaxonomyItem
+from money_map.core.relations import BridgeRelations
 from money_map.ui import components
 from money_map.ui.state import go_to_section, request_nav
 
@@ -23,94 +24,40 @@ def _bridge_summary(bridge: BridgeItem) -> str:
     return bridge.short_summary or bridge.notes or "—"
 
 
-def _bridge_matches_filters(
-    bridge: BridgeItem,
+def _transition_matches_filters(
+    from_cell: str,
+    to_cell: str,
     lookup: dict[str, Cell],
     filters: components.Filters,
 ) -> bool:
-    if bridge.from_cell not in lookup or bridge.to_cell not in lookup:
+    if from_cell not in lookup or to_cell not in lookup:
         return False
-    if filters.risk != "all":
-        from_risk = lookup.get(bridge.from_cell).risk
-        to_risk = lookup.get(bridge.to_cell).risk
-        if from_risk != filters.risk and to_risk != filters.risk:
-            return False
-    if filters.activity != "all":
-        from_activity = lookup.get(bridge.from_cell).activity
-        to_activity = lookup.get(bridge.to_cell).activity
-        if from_activity != filters.activity and to_activity != filters.activity:
-            return False
-    if filters.scalability != "all":
-        from_scale = lookup.get(bridge.from_cell).scalability
-        to_scale = lookup.get(bridge.to_cell).scalability
-        if from_scale != filters.scalability and to_scale != filters.scalability:
+    for axis in ("risk", "activity", "scalability"):
+        value = getattr(filters, axis)
+        if value == "all":
+            continue
+        if getattr(lookup[from_cell], axis) != value and getattr(lookup[to_cell], axis) != value:
             return False
     return True
 
 
 def _index_bridges(
-    bridges: list[BridgeItem],
+    data: AppData,
+    relations: BridgeRelations,
     lookup: dict[str, Cell],
     filters: components.Filters,
 ) -> tuple[dict[str, list[BridgeItem]], dict[str, list[str]]]:
-    bridges_by_transition: dict[str, list[BridgeItem]] = defaultdict(list)
+    # Фильтры зависят только от ячеек перехода, поэтому проверяются один раз на переход, а не на мост.
+    bridges_by_transition: dict[str, list[BridgeItem]] = {}
     outgoing_by_cell: dict[str, list[str]] = defaultdict(list)
-    for bridge in bridges:
-        if not _bridge_matches_filters(bridge, lookup, filters):
-            continue
-        transition = f"{bridge.from_cell}->{bridge.to_cell}"
-        bridges_by_transition[transition].append(bridge)
-    for transition in sorted(bridges_by_transition):
-        from_cell = transition.split("->", maxsplit=1)[0]
-        outgoing_by_cell[from_cell].append(transition)
+    for transition in sorted(relations.bridges_by_transition):
+        from_cell, to_cell = transition.split("->", maxsplit=1)
+        if _transition_matches_filters(from_cell, to_cell, lookup, filters):
+            bridges_by_transition[transition] = relations.transition_bridges(data, from_cell, to_cell)
+            outgoing_by_cell[from_cell].append(transition)
     return bridges_by_transition, outgoing_by_cell
 
 
-def _index_ways_by_cell(items: list[TaxonomyItem]) -> dict[str, list[TaxonomyItem]]:
-    grouped: dict[str, list[TaxonomyItem]] = defaultdict(list)
-    for item in items:
-        for cell_id in item.typical_cells:
-            grouped[cell_id].append(item)
-    return grouped
-
-
-def _index_ways_by_bridge(
-    bridges: list[BridgeItem],
-    ways_by_cell: dict[str, list[TaxonomyItem]],
-) -> dict[str, list[TaxonomyItem]]:
-    by_bridge: dict[str, list[TaxonomyItem]] = {}
-    for bridge in bridges:
-        related = ways_by_cell.get(bridge.from_cell, []) + ways_by_cell.get(bridge.to_cell, [])
-        unique = {item.id: item for item in related}
-        by_bridge[bridge.id] = sorted(unique.values(), key=lambda item: item.name)
-    return by_bridge
-
-
-def _index_routes_by_bridge(
-    bridges: list[BridgeItem],
-    paths: list[PathItem],
-) -> dict[str, list[PathItem]]:
-    by_bridge: dict[str, list[PathItem]] = defaultdict(list)
-    for bridge in bridges:
-        for path in paths:
-            if bridge.from_cell in path.sequence and bridge.to_cell in path.sequence:
-                if path.sequence.index(bridge.from_cell) < path.sequence.index(bridge.to_cell):
-                    by_bridge[bridge.id].append(path)
-        by_bridge[bridge.id] = sorted(by_bridge[bridge.id], key=lambda item: item.name)
-    return by_bridge
-
-
-def _index_variants_by_transition(variants: list[Variant]) -> dict[str, list[Variant]]:
-    grouped: dict[str, list[Variant]] = defaultdict(list)
-    for variant in variants:
-        cells = variant.matrix_cells
-        for idx, from_cell in enumerate(cells):
-            for to_cell in cells[idx + 1 :]:
-                grouped[f"{from_cell}->{to_cell}"].append(variant)
-                grouped[f"{to_cell}->{from_cell}"].append(variant)
-    return grouped
-
-
 def render(data: AppData, filters: components.Filters) -> None:
     def _on_transition_change() -> None:
         st.session_state["selected_transition"] = st.session_state.get("bridges_transition_select")
@@ -133,13 +80,9 @@ def render(data: AppData, filters: components.Filters) -> None:
     components.render_path_wizard("Мосты")
 
     lookup = components.cell_lookup(data)
-    bridges_by_transition, outgoing_by_cell = _index_bridges(data.bridges, lookup, filters)
-    filtered_ways = components.apply_global_filters_to_ways(data.taxonomy, filters, data)
-    ways_by_cell = _index_ways_by_cell(filtered_ways)
-    ways_by_bridge_id = _index_ways_by_bridge(data.bridges, ways_by_cell)
-    routes_by_bridge_id = _index_routes_by_bridge(data.bridges, data.paths)
-    filtered_variants = components.apply_global_filters_to_variants(data.variants, filters)
-    variants_by_transition = _index_variants_by_transition(filtered_variants)
+    relations = components.bridge_relations(data)
+    bridges_by_transition, outgoing_by_cell = _index_bridges(data, relations, lookup, filters)
+    global_mask = components.global_variant_mask(data, filters)
 
     transitions = sorted(bridges_by_transition.keys())
     selected_cell_id = st.session_state.get("selected_cell_id")
@@ -206,7 +149,16 @@ def render(data: AppData, filters: components.Filters) -> None:
         return
 
     from_cell, to_cell = selected_transition.split("->", maxsplit=1)
+    variants_count = (relations.transition_variants(from_cell, to_cell) & global_mask).bit_count()
     bridges = sorted(bridges_by_transition.get(selected_transition, []), key=lambda item: item.name)
+    allowed_way_ids = {
+        item.id for item in components.apply_global_filters_to_ways(data.taxonomy, filters, data)
+    }
+    ways_by_bridge_id = {
+        bridge.id: [item for item in relations.bridge_ways(data, bridge.id) if item.id in allowed_way_ids]
+        for bridge in bridges
+    }
+    routes_by_bridge_id = {bridge.id: relations.bridge_routes(data, bridge.id) for bridge in bridges}
     selected_bridge_id = st.session_state.get("selected_bridge_id")
     if selected_bridge_id and all(bridge.id != selected_bridge_id for bridge in bridges):
         st.session_state["selected_bridge_id"] = None
@@ -218,7 +170,7 @@ def render(data: AppData, filters: components.Filters) -> None:
             _render_cell_card(
                 lookup.get(from_cell),
                 bridges_count=len(bridges),
-                variants_count=len(variants_by_transition.get(selected_transition, [])),
+                variants_count=variants_count,
             )
         with ribbon_cols[1]:
             st.markdown("#### Мосты перехода")
@@ -230,13 +182,13 @@ def render(data: AppData, filters: components.Filters) -> None:
                     selected_bridge_id,
                     routes_by_bridge_id,
                     ways_by_bridge_id,
-                    variants_by_transition.get(selected_transition, []),
+                    variants_count,
                 )
         with ribbon_cols[2]:
             _render_cell_card(
                 lookup.get(to_cell),
                 bridges_count=len(bridges),
-                variants_count=len(variants_by_transition.get(selected_transition, [])),
+                variants_count=variants_count,
             )
 
     st.button(
@@ -252,8 +204,7 @@ def render(data: AppData, filters: components.Filters) -> None:
     )
 
     if selected_bridge_id:
-        bridge_lookup = {bridge.id: bridge for bridge in data.bridges}
-        bridge = bridge_lookup.get(selected_bridge_id)
+        bridge = relations.bridge(data, selected_bridge_id)
         if bridge:
             _render_bridge_details(
                 bridge,
@@ -288,7 +239,7 @@ def _render_bridge_tiles(
     selected_bridge_id: str | None,
     routes_by_bridge_id: dict[str, list[PathItem]],
     ways_by_bridge_id: dict[str, list[TaxonomyItem]],
-    transition_variants: list[Variant],
+    variants_count: int,
 ) -> None:
     max_visible = 8
     displayed = bridges[:max_visible]
@@ -298,7 +249,7 @@ def _render_bridge_tiles(
         selected_bridge_id,
         routes_by_bridge_id,
         ways_by_bridge_id,
-        transition_variants,
+        variants_count,
     )
     if remaining:
         with st.expander("Показать ещё"):
@@ -307,7 +258,7 @@ def _render_bridge_tiles(
                 selected_bridge_id,
                 routes_by_bridge_id,
                 ways_by_bridge_id,
-                transition_variants,
+                variants_count,
             )
 
 
@@ -316,12 +267,11 @@ def _render_bridge_tile_grid(
     selected_bridge_id: str | None,
     routes_by_bridge_id: dict[str, list[PathItem]],
     ways_by_bridge_id: dict[str, list[TaxonomyItem]],
-    transition_variants: list[Variant],
+    variants_count: int,
 ) -> None:
     if not bridges:
         return
     columns = st.columns(min(3, len(bridges)))
-    variants_count = len(transition_variants)
     for idx, bridge in enumerate(bridges):
         selected = bridge.id == selected_bridge_id
         with columns[idx % len(columns)]:
@@ -360,16 +310,7 @@ def _render_bridge_details(
                 key=f"bridge-compare-{bridge.id}",
                 use_container_width=True,
             ):
-                components.add_compare_item(
-                    {
-                        "type": "bridge",
-                        "id": bridge.id,
-                        "name": bridge.name,
-                        "cell_id": from_cell,
-                        "transition": selected_transition,
-                        "classifier_tags": [],
-                    },
-                )
+                components.add_compare_item("bridge", bridge.id)
 
         st.markdown("**Что меняет**")
         effects = _bridge_effects(bridge)
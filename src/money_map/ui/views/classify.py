@@ -5,8 +5,9 @@ from typing import Iterable, Optional
 import streamlit as st
 
 from money_map.core.classify import classify_by_tags
-from money_map.core.model import AppData, TaxonomyItem
+from money_map.core.model import AppData
 from money_map.ui import components
+from money_map.ui.logic.classifier_catalog import GROUP_ORDER
 from money_map.ui.state import go_to_section, request_nav
 
 
@@ -16,115 +17,6 @@ GROUP_CONFIG = {
     "value_measure": {"label": "Мера ценности", "color": "#8E6AC8"},
 }
 
-GROUP_ORDER = ("what_sell", "to_whom", "value_measure")
-
-CLASSIFIER_DETAILS = {
-    "what_sell": {
-        "time": {
-            "short_definition": "Оплата за время участия или присутствия.",
-            "examples": ["Оклад", "Почасовая ставка"],
-        },
-        "result": {
-            "short_definition": "Оплата за достижение результата или выполнение задачи.",
-            "examples": ["Фикс за проект", "Бонус за KPI"],
-        },
-        "risk": {
-            "short_definition": "Оплата за принятие риска или ответственности.",
-            "examples": ["Процент от сделки", "Ответственность за исход"],
-        },
-        "access": {
-            "short_definition": "Оплата за предоставление доступа к ресурсу или каналу.",
-            "examples": ["Подписка", "Аренда доступа"],
-        },
-        "attention": {
-            "short_definition": "Оплата за внимание и охваты аудитории.",
-            "examples": ["Реклама", "Спонсорство"],
-        },
-        "capital": {
-            "short_definition": "Доход за предоставление капитала или ресурсов.",
-            "examples": ["Инвестиции", "Кредит"],
-        },
-        "property": {
-            "short_definition": "Доход за использование собственности.",
-            "examples": ["Аренда имущества", "Лицензия"],
-        },
-    },
-    "to_whom": {
-        "single_client": {
-            "short_definition": "Сделка с одним клиентом или заказчиком.",
-            "examples": ["Консалтинг", "Проектная работа"],
-        },
-        "many_people": {
-            "short_definition": "Продажа многим людям и массовой аудитории.",
-            "examples": ["Потребительский продукт", "Онлайн-курс"],
-        },
-        "market": {
-            "short_definition": "Сделка на рынке или бирже.",
-            "examples": ["Трейдинг", "Арбитраж"],
-        },
-        "platform": {
-            "short_definition": "Сделка через платформу или маркетплейс.",
-            "examples": ["Маркетплейс", "App Store"],
-        },
-        "state": {
-            "short_definition": "Сделка с государством и госпрограммами.",
-            "examples": ["Госзакупки", "Грант"],
-        },
-    },
-    "value_measure": {
-        "rate": {
-            "short_definition": "Оплата по ставке за единицу времени или нормы.",
-            "examples": ["Почасовая ставка", "Оклад"],
-        },
-        "price": {
-            "short_definition": "Фиксированная цена за продукт или услугу.",
-            "examples": ["Разовая продажа", "Пакет услуг"],
-        },
-        "percent": {
-            "short_definition": "Доля или процент от результата.",
-            "examples": ["Комиссия", "Роялти"],
-        },
-        "rent": {
-            "short_definition": "Регулярная рента за пользование активом.",
-            "examples": ["Аренда", "Лизинг"],
-        },
-        "payout": {
-            "short_definition": "Выплата, купон или дивиденд.",
-            "examples": ["Дивиденды", "Купон по облигации"],
-        },
-        "appreciation": {
-            "short_definition": "Рост стоимости актива или доли.",
-            "examples": ["Рост цены", "Продажа с прибылью"],
-        },
-    },
-}
-
-
-def _build_classifier_items(data: AppData) -> list[dict]:
-    tag_keywords = data.keywords.keywords.get("tags", {})
-    items: list[dict] = []
-    group_sources = [
-        ("what_sell", data.mappings.sell_items, "sell"),
-        ("to_whom", data.mappings.to_whom_items, "to_whom"),
-        ("value_measure", data.mappings.value_measures, "value"),
-    ]
-    for group, mapping, keyword_group in group_sources:
-        details = CLASSIFIER_DETAILS.get(group, {})
-        for item_id, item in mapping.items():
-            detail = details.get(item_id, {})
-            items.append(
-                {
-                    "id": item_id,
-                    "classifier_id": f"{group}.{item_id}",
-                    "group": group,
-                    "name": item.label,
-                    "keywords": tag_keywords.get(keyword_group, {}).get(item_id, []),
-                    "short_definition": detail.get("short_definition") or item.notes or "—",
-                    "examples": detail.get("examples", []),
-                }
-            )
-    return items
-
 
 def _selection_snapshot() -> dict[str, set[str]]:
     return components.get_classifier_selection_state()
@@ -203,30 +95,6 @@ def _meaning_text(selections: dict[str, set[str]]) -> str:
     return "Выберите чипсы, чтобы увидеть формулу сделки и совпадения."
 
 
-def _score_way(item: TaxonomyItem, selections: dict[str, set[str]]) -> float:
-    profile = {
-        "what_sell": set(item.sell),
-        "to_whom": set(item.to_whom),
-        "value_measure": set(item.value),
-    }
-    score = 0.0
-    for group, selected in selections.items():
-        if not selected:
-            continue
-        score += len(selected.intersection(profile.get(group, set()))) * 2.0
-    return score
-
-
-def _top_matches(items: Iterable[TaxonomyItem], selections: dict[str, set[str]]) -> list[tuple[TaxonomyItem, float]]:
-    matches = []
-    for item in items:
-        score = _score_way(item, selections)
-        if score > 0:
-            matches.append((item, score))
-    matches.sort(key=lambda pair: (-pair[1], pair[0].name))
-    return matches
-
-
 def _render_chip_row(
     items: Iterable[tuple[str, str]],
     on_click,
@@ -273,7 +141,7 @@ def render(data: AppData) -> None:
 
     components.sync_classifier_filters_from_state()
     selections = _selection_snapshot()
-    classifier_items = _build_classifier_items(data)
+    catalog = components.classifier_catalog(data)
     has_selection = any(selections.values())
 
     st.title("Классификатор")
@@ -307,11 +175,6 @@ def render(data: AppData) -> None:
         )
 
         select_cols = st.columns(3)
-        group_options = {
-            "what_sell": sorted(data.mappings.sell_items.items(), key=lambda item: item[1].label),
-            "to_whom": sorted(data.mappings.to_whom_items.items(), key=lambda item: item[1].label),
-            "value_measure": sorted(data.mappings.value_measures.items(), key=lambda item: item[1].label),
-        }
         for idx, group in enumerate(GROUP_ORDER):
             with select_cols[idx]:
                 label = GROUP_CONFIG[group]["label"]
@@ -322,7 +185,7 @@ def render(data: AppData) -> None:
                     _toggle_classifier(group_key, item_id)
 
                 _render_chip_row(
-                    [(item_id, item.label) for item_id, item in group_options[group]],
+                    catalog.options[group],
                     _toggle,
                     f"classifier-chip-{group}",
                     columns=2,
@@ -338,7 +201,7 @@ def render(data: AppData) -> None:
         st.markdown("### Где это встречается")
         card_cols = st.columns(3)
 
-        matches = _top_matches(data.taxonomy, selections) if has_selection else []
+        matches = catalog.matching_ways(data, selections) if has_selection else []
         probable_cells = []
         if has_selection:
             result = classify_by_tags(
@@ -389,15 +252,7 @@ def render(data: AppData) -> None:
         with card_cols[2]:
             with st.container(border=True):
                 st.markdown("**Варианты (конкретика)**")
-                matching_variants = []
-                if any(selections.values()):
-                    for variant in data.variants:
-                        score = components.score_variant_against_classifiers(variant, selections)
-                        if score is not None:
-                            matching_variants.append(score)
-                    count = len(matching_variants)
-                else:
-                    count = len(data.variants)
+                count = catalog.variant_mask(selections).bit_count() if has_selection else len(data.variants)
                 st.caption(f"Совпадений: {count}")
 
                 def _open_variants() -> None:
@@ -447,43 +302,30 @@ def render(data: AppData) -> None:
             format_func=lambda value: "Все" if value == "all" else GROUP_CONFIG[value]["label"],
         )
 
-        filtered_items = []
-        for item in classifier_items:
-            if group_choice != "all" and item["group"] != group_choice:
-                continue
-            blob = " ".join(
-                [
-                    item["name"],
-                    item["id"],
-                    " ".join(item["keywords"]),
-                ]
-            ).lower()
-            if search and search.lower() not in blob:
-                continue
-            filtered_items.append(item)
+        filtered_items = catalog.search(search, group_choice)
 
         if not filtered_items:
             st.info("Ничего не найдено.")
             return
 
         for item in filtered_items:
-            group_label = GROUP_CONFIG[item["group"]]["label"]
-            expander_title = f"{item['name']} · {group_label}"
+            group_label = GROUP_CONFIG[item.group]["label"]
+            expander_title = f"{item.name} · {group_label}"
             with st.expander(expander_title, expanded=False):
-                st.markdown(item["short_definition"])
-                if item["examples"]:
+                st.markdown(item.short_definition)
+                if item.examples:
                     st.markdown("**Примеры:**")
-                    for example in item["examples"]:
+                    for example in item.examples:
                         st.markdown(f"- {example}")
-                if item["keywords"]:
-                    st.caption(f"Ключевые слова: {', '.join(item['keywords'])}")
+                if item.keywords:
+                    st.caption(f"Ключевые слова: {', '.join(item.keywords)}")
 
-                def _add_item(item_id: str = item["id"], group: str = item["group"]) -> None:
+                def _add_item(item_id: str = item.id, group: str = item.group) -> None:
                     _toggle_classifier(group, item_id)
 
                 st.button(
                     "Добавить в выбор",
-                    key=f"classifier-directory-add-{item['group']}-{item['id']}",
+                    key=f"classifier-directory-add-{item.group}-{item.id}",
                     on_click=_add_item,
                 )
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 import streamlit as st
 
 from money_map.core.model import AppData
@@ -16,19 +18,62 @@ TYPE_LABELS = {
 }
 
 
-def _open_item(item_type: str, item: dict[str, object]) -> None:
-    item_id = item.get("id")
-    if not isinstance(item_id, str):
-        return
+@dataclass(frozen=True)
+class CompareEntry:
+    type: str
+    id: str
+    name: str
+    cell_id: str | None
+    transition: str | None
+    classifier_tags: tuple[str, ...]
+
+
+def resolve_compare_item(data: AppData, item_type: str, item_id: str) -> CompareEntry | None:
+    # В сессии лежит только (тип, id); всё остальное берём из общего AppData.
+    if item_type == "way":
+        way = next((item for item in data.taxonomy if item.id == item_id), None)
+        if way is None:
+            return None
+        cell_id = way.typical_cells[0] if way.typical_cells else None
+        return CompareEntry(item_type, item_id, way.name, cell_id, None, (*way.sell, *way.to_whom, *way.value))
+    if item_type == "route":
+        path = next((item for item in data.paths if item.id == item_id), None)
+        if path is None:
+            return None
+        cell_id = path.sequence[0] if path.sequence else None
+        return CompareEntry(item_type, item_id, path.name, cell_id, None, ())
+    if item_type == "bridge":
+        bridge = next((item for item in data.bridges if item.id == item_id), None)
+        if bridge is None:
+            return None
+        transition = f"{bridge.from_cell}->{bridge.to_cell}"
+        return CompareEntry(item_type, item_id, bridge.name, bridge.from_cell, transition, ())
+    if item_type == "variant":
+        variant = data.variant_by_id.get(item_id)
+        if variant is None:
+            return None
+        cell_id = variant.matrix_cells[0] if variant.matrix_cells else None
+        tags = (*variant.sell_tags, *variant.to_whom_tags, *variant.value_tags)
+        return CompareEntry(item_type, item_id, variant.title, cell_id, None, tags)
+    if item_type == "cell":
+        cell = next((item for item in data.cells if item.id == item_id), None)
+        if cell is None:
+            return None
+        return CompareEntry(item_type, item_id, cell.label, cell.id, None, ())
+    return None
+
+
+def _open_item(entry: CompareEntry) -> None:
+    item_type = entry.type
+    item_id = entry.id
     if item_type == "way":
         request_nav("Способы получения денег", {"way_id": item_id, "tab": "Справочник"})
     elif item_type == "route":
         request_nav("Маршруты", {"route_id": item_id})
     elif item_type == "bridge":
         payload = {"bridge_id": item_id}
-        transition = item.get("transition")
-        if isinstance(transition, str):
-            payload["transition"] = transition
+        if entry.transition:
+            payload["transition"] = entry.transition
         request_nav("Мосты", payload)
     elif item_type == "variant":
         request_nav("Варианты (конкретика)", {"variant_id": item_id})
@@ -39,8 +84,8 @@ def _open_item(item_type: str, item: dict[str, object]) -> None:
 def render(data: AppData) -> None:
     st.title("Сравнение")
 
-    items = st.session_state.get("compare_items", [])
-    if not isinstance(items, list) or not items:
+    items = components.session_model().compare
+    if not items:
         st.info("Добавьте кандидатов из других разделов, чтобы сравнить.")
         return
 
@@ -53,30 +98,27 @@ def render(data: AppData) -> None:
         use_container_width=True,
     )
 
-    for item in items:
-        item_type = str(item.get("type", ""))
-        item_id = str(item.get("id", ""))
-        name = item.get("name") or item_id
-        cell_id = item.get("cell_id") or "—"
-        tags = item.get("classifier_tags") or []
-        if not isinstance(tags, list):
-            tags = []
-        tag_lookup = {
-            **{key: value.label for key, value in data.mappings.sell_items.items()},
-            **{key: value.label for key, value in data.mappings.to_whom_items.items()},
-            **{key: value.label for key, value in data.mappings.value_measures.items()},
-        }
-        tags = [tag_lookup.get(tag, tag) for tag in tags]
+    tag_lookup = {
+        **{key: value.label for key, value in data.mappings.sell_items.items()},
+        **{key: value.label for key, value in data.mappings.to_whom_items.items()},
+        **{key: value.label for key, value in data.mappings.value_measures.items()},
+    }
+    for item_type, item_id in list(items):
+        entry = resolve_compare_item(data, item_type, item_id)
+        if entry is None:
+            entry = CompareEntry(item_type, item_id, item_id, None, None, ())
+        cell_id = entry.cell_id or "—"
+        tags = [tag_lookup.get(tag, tag) for tag in entry.classifier_tags]
 
         with st.container(border=True):
             title_cols = st.columns([3, 1, 1])
-            title_cols[0].markdown(f"**{name}**")
+            title_cols[0].markdown(f"**{entry.name}**")
             title_cols[0].caption(TYPE_LABELS.get(item_type, item_type))
             title_cols[1].button(
                 "Открыть",
                 key=f"compare-open-{item_type}-{item_id}",
                 on_click=_open_item,
-                args=(item_type, item),
+                args=(entry,),
                 use_container_width=True,
             )
             title_cols[2].button(
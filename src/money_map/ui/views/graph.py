@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 
 import streamlit as st
 from st_cytoscape import cytoscape
 
-from money_map.core.graph_model import GraphEdge, GraphModel, GraphNode, build_base_graph
+from money_map.core.graph_analytics import GraphAnalytics, reachable_nodes
+from money_map.core.graph_model import (
+    GraphEdge,
+    GraphModel,
+    GraphNode,
+    extract_neighborhood,
+    filter_graph,
+)
 from money_map.core.model import AppData
+from money_map.core.snapshot import snapshot_graph_analytics, snapshot_graph_layout, snapshot_graph_model
 from money_map.ui import components
 from money_map.ui.state import go_to_section
 
@@ -22,6 +33,12 @@ EDGE_TYPES = [
     "variant_fits_cell",
     "variant_uses_bridge",
 ]
+# Элементы cytoscape кешируются по (id, состояние выделения); при переполнении кеш сбрасывается.
+ELEMENT_CACHE_LIMIT = 5000
+# Готовые подграфы по полному набору параметров, LRU.
+SUBGRAPH_CACHE_LIMIT = 32
+# "preset" — координаты посчитаны на сервере (core.graph_layout), браузер только рисует.
+LAYOUT_NAMES = ["preset", "fcose", "breadthfirst", "concentric"]
 
 
 def ensure_graph_state_defaults() -> None:
@@ -34,7 +51,7 @@ def ensure_graph_state_defaults() -> None:
     st.session_state.setdefault("graph_max_nodes", 60)
     st.session_state.setdefault("graph_node_type_filters", {})
     st.session_state.setdefault("graph_edge_type_filters", {})
-    st.session_state.setdefault("graph_layout_name", "fcose")
+    st.session_state.setdefault("graph_layout_name", "preset")
     st.session_state.setdefault("graph_expand_depth_override", False)
     st.session_state.setdefault("graph_search_query", "")
     st.session_state.setdefault("graph_search_selected_id", None)
@@ -68,8 +85,72 @@ def _sync_edge_filters() -> None:
     }
 
 
+@st.cache_resource(show_spinner="Построение графа...", max_entries=4)
+def _graph_model_for_version(version: str, _data: AppData) -> GraphModel:
+    return snapshot_graph_model(_data, version)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _graph_view_for_version(
+    version: str,
+    node_types: tuple[str, ...],
+    edge_types: tuple[str, ...],
+    _data: AppData,
+) -> GraphModel:
+    return filter_graph(_graph_model_for_version(version, _data), node_types, edge_types)
+
+
+@st.cache_resource(show_spinner="Раскладка графа...", max_entries=32)
+def _graph_layout_for_version(
+    version: str,
+    node_types: tuple[str, ...],
+    edge_types: tuple[str, ...],
+    _data: AppData,
+) -> dict[str, tuple[float, float]]:
+    if set(node_types) >= set(NODE_TYPES) and set(edge_types) >= set(EDGE_TYPES):
+        return snapshot_graph_layout(_data, version)
+    view = _graph_view_for_version(version, node_types, edge_types, _data)
+    return snapshot_graph_layout(_data, version, node_types, edge_types, model=view)
+
+
+@st.cache_resource(show_spinner="Анализ графа...", max_entries=4)
+def _graph_analytics_for_version(version: str, _data: AppData) -> GraphAnalytics:
+    return snapshot_graph_analytics(_data, version, model=_graph_model_for_version(version, _data))
+
+
 def _get_graph_model(data: AppData) -> GraphModel:
-    return build_base_graph(data)
+    return _graph_model_for_version(components.data_version(), data)
+
+
+def _get_graph_analytics(data: AppData) -> GraphAnalytics:
+    return _graph_analytics_for_version(components.data_version(), data)
+
+
+def _filter_key(
+    node_type_filters: dict[str, bool],
+    edge_type_filters: dict[str, bool],
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    node_types = tuple(sorted(node for node, allowed in node_type_filters.items() if allowed))
+    edge_types = tuple(sorted(edge for edge, allowed in edge_type_filters.items() if allowed))
+    return node_types, edge_types
+
+
+def _get_graph_view(
+    data: AppData,
+    node_type_filters: dict[str, bool],
+    edge_type_filters: dict[str, bool],
+) -> GraphModel:
+    node_types, edge_types = _filter_key(node_type_filters, edge_type_filters)
+    return _graph_view_for_version(components.data_version(), node_types, edge_types, data)
+
+
+def _get_graph_layout(
+    data: AppData,
+    node_type_filters: dict[str, bool],
+    edge_type_filters: dict[str, bool],
+) -> dict[str, tuple[float, float]]:
+    node_types, edge_types = _filter_key(node_type_filters, edge_type_filters)
+    return _graph_layout_for_version(components.data_version(), node_types, edge_types, data)
 
 
 def _extract_selected_ids(selected: object) -> tuple[str | None, str | None]:
@@ -112,17 +193,24 @@ def _extract_selected_ids(selected: object) -> tuple[str | None, str | None]:
     return node_id, edge_id
 
 
-def _make_node_element(node: GraphNode, selected: bool = False) -> dict[str, object]:
+def _make_node_element(
+    node: GraphNode,
+    selected: bool = False,
+    position: tuple[float, float] | None = None,
+) -> dict[str, object]:
     classes = [node.type]
     if node.type == "classifier":
         group = node.meta.get("group")
         if isinstance(group, str):
             classes.append(group)
-    return {
+    element: dict[str, object] = {
         "data": {"id": node.id, "label": node.label, "type": node.type},
         "classes": " ".join(classes),
         "selected": selected,
     }
+    if position is not None:
+        element["position"] = {"x": position[0], "y": position[1]}
+    return element
 
 
 def _make_edge_element(edge: GraphEdge, highlighted: bool = False, selected: bool = False) -> dict[str, object]:
@@ -142,98 +230,128 @@ def _make_edge_element(edge: GraphEdge, highlighted: bool = False, selected: boo
     }
 
 
+_Subgraph = tuple[tuple[dict[str, object], ...], frozenset[str], frozenset[str]]
+
+
+class _ElementCache:
+    # Общий для сессий (cache_resource), поэтому все словари меняются только под блокировкой.
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self.nodes: dict[tuple[str, bool, tuple[float, float] | None], dict[str, object]] = {}
+        self.edges: dict[tuple[str, bool, bool], dict[str, object]] = {}
+        # Ключ -> (представление, раскладка и ранги, по ссылке; подграф). Ссылки в значении не дают
+        # переиспользовать id объектов из ключа, пока запись в кеше.
+        self.subgraphs: OrderedDict[tuple, tuple[tuple, _Subgraph]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def node(
+        self,
+        node: GraphNode,
+        selected: bool,
+        position: tuple[float, float] | None = None,
+    ) -> dict[str, object]:
+        key = (node.id, selected, position)
+        with self._lock:
+            element = self.nodes.get(key)
+            if element is None:
+                element = self.nodes[key] = _make_node_element(node, selected=selected, position=position)
+        return element
+
+    def edge(self, edge: GraphEdge, highlighted: bool, selected: bool) -> dict[str, object]:
+        key = (edge.id, highlighted, selected)
+        with self._lock:
+            element = self.edges.get(key)
+            if element is None:
+                element = self.edges[key] = _make_edge_element(edge, highlighted=highlighted, selected=selected)
+        return element
+
+    def subgraph(self, refs: tuple, params: tuple) -> _Subgraph | None:
+        key = (*(id(item) for item in refs), *params)
+        with self._lock:
+            entry = self.subgraphs.get(key)
+            if entry is None or not all(cached is item for cached, item in zip(entry[0], refs)):
+                return None
+            self.subgraphs.move_to_end(key)
+            return entry[1]
+
+    def put_subgraph(self, refs: tuple, params: tuple, result: _Subgraph) -> None:
+        key = (*(id(item) for item in refs), *params)
+        with self._lock:
+            self.subgraphs[key] = (refs, result)
+            self.subgraphs.move_to_end(key)
+            while len(self.subgraphs) > SUBGRAPH_CACHE_LIMIT:
+                self.subgraphs.popitem(last=False)
+
+    def trim(self) -> None:
+        with self._lock:
+            if len(self.nodes) + len(self.edges) > ELEMENT_CACHE_LIMIT:
+                self.nodes.clear()
+                self.edges.clear()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _shared_element_cache(version: str) -> _ElementCache:
+    # Элементы зависят только от данных и параметров отрисовки, поэтому кеш общий для всех сессий.
+    return _ElementCache(version)
+
+
+def _element_cache() -> _ElementCache:
+    cache = _shared_element_cache(components.data_version())
+    cache.trim()
+    return cache
+
+
 def _build_subgraph(
     model: GraphModel,
+    view: GraphModel,
     selected_id: str,
-    node_type_filters: dict[str, bool],
-    edge_type_filters: dict[str, bool],
     depth: int,
     max_nodes: int,
+    cache: _ElementCache | None = None,
+    positions: dict[str, tuple[float, float]] | None = None,
+    rank: dict[str, float] | None = None,
 ) -> tuple[list[dict[str, object]], set[str], set[str]]:
     if selected_id not in model.nodes_by_id:
         return [], set(), set()
+    if selected_id not in view.nodes_by_id:
+        return [_make_node_element(model.nodes_by_id[selected_id], selected=True)], {selected_id}, set()
 
-    allowed_node_types = {node for node, allowed in node_type_filters.items() if allowed}
-    allowed_edge_types = {edge for edge, allowed in edge_type_filters.items() if allowed}
-
-    visited: set[str] = set()
-    queue: list[tuple[str, int]] = [(selected_id, 0)]
-
-    while queue:
-        node_id, dist = queue.pop(0)
-        if node_id in visited:
-            continue
-        node = model.nodes_by_id.get(node_id)
-        if not node or node.type not in allowed_node_types:
-            continue
-        visited.add(node_id)
-        if dist >= depth:
-            continue
-        for edge_id in model.incident_edges.get(node_id, set()):
-            edge = model.edges_by_id[edge_id]
-            if edge.type not in allowed_edge_types:
-                continue
-            neighbor = edge.target if edge.source == node_id else edge.source
-            if neighbor not in visited:
-                queue.append((neighbor, dist + 1))
-
-    if not visited:
-        visited.add(selected_id)
-
-    if len(visited) > max_nodes:
-        first_neighbors = {
-            neighbor
-            for edge_id in model.incident_edges.get(selected_id, set())
-            if model.edges_by_id[edge_id].type in allowed_edge_types
-            for neighbor in (
-                model.edges_by_id[edge_id].target
-                if model.edges_by_id[edge_id].source == selected_id
-                else model.edges_by_id[edge_id].source,
-            )
-            if model.nodes_by_id.get(neighbor) and model.nodes_by_id[neighbor].type in allowed_node_types
-        }
-        prioritized = {selected_id} | first_neighbors
-        if len(prioritized) > max_nodes:
-            ranked = sorted(
-                first_neighbors,
-                key=lambda node_id: len(model.adjacency.get(node_id, set())),
-                reverse=True,
-            )
-            visited = {selected_id} | set(ranked[: max_nodes - 1])
-        else:
-            remaining = list(visited - prioritized)
-            ranked = sorted(
-                remaining,
-                key=lambda node_id: len(model.adjacency.get(node_id, set())),
-                reverse=True,
-            )
-            visited = set(list(prioritized) + ranked[: max_nodes - len(prioritized)])
+    selected_edge_id = st.session_state.get("graph_selected_edge_id")
+    refs = (view, positions, rank)
+    params = (selected_id, depth, max_nodes, selected_edge_id)
+    cached = cache.subgraph(refs, params) if cache is not None else None
+    if cached is not None:
+        # Каждая сессия получает свои список и множества; сами элементы общие и не изменяются.
+        return list(cached[0]), set(cached[1]), set(cached[2])
 
-    highlight_edges = {
-        edge_id
-        for edge_id in model.incident_edges.get(selected_id, set())
-        if model.edges_by_id[edge_id].type in allowed_edge_types
-    }
+    neighborhood = extract_neighborhood(view, selected_id, depth=depth, max_nodes=max_nodes, rank=rank)
+    cache = cache or _ElementCache("")
 
     nodes = [
-        _make_node_element(model.nodes_by_id[node_id], selected=(node_id == selected_id))
-        for node_id in visited
+        cache.node(
+            view.nodes_by_id[node_id],
+            node_id == selected_id,
+            positions.get(node_id) if positions is not None else None,
+        )
+        for node_id in neighborhood.node_ids
     ]
     edges = [
-        _make_edge_element(
-            edge,
-            highlighted=edge.id in highlight_edges,
-            selected=edge.id == st.session_state.get("graph_selected_edge_id"),
+        cache.edge(
+            view.edges_by_id[edge_id],
+            edge_id in neighborhood.highlight_edge_ids,
+            edge_id == selected_edge_id,
         )
-        for edge in model.edges
-        if edge.source in visited
-        and edge.target in visited
-        and edge.type in allowed_edge_types
+        for edge_id in neighborhood.edge_ids
     ]
 
-    return nodes + edges, visited, highlight_edges
+    elements = nodes + edges
+    node_ids = set(neighborhood.node_ids)
+    highlight = set(neighborhood.highlight_edge_ids)
+    cache.put_subgraph(refs, params, (tuple(elements), frozenset(node_ids), frozenset(highlight)))
+    return elements, node_ids, highlight
 
 
+@lru_cache(maxsize=1)
 def _stylesheet() -> list[dict[str, object]]:
     return [
         {
@@ -348,6 +466,17 @@ def _render_node_details(node: GraphNode) -> None:
         )
 
 
+def _render_node_metrics(model: GraphModel, analytics: GraphAnalytics, node_id: str) -> None:
+    pagerank, degree = analytics.rank(node_id)
+    st.caption(
+        f"Связей: {degree} · PageRank: {pagerank:.4f} · "
+        f"Посредничество: {analytics.betweenness.get(node_id, 0.0):.4f}"
+    )
+    if model.nodes_by_id[node_id].type == "cell":
+        variants = reachable_nodes(model, analytics, node_id, "variant")
+        st.caption(f"Достижимых вариантов: {len(variants)}")
+
+
 def _render_edge_details(edge: GraphEdge) -> None:
     st.markdown(f"### {edge.label}")
     st.caption(f"Тип ребра: {edge.type}")
@@ -375,12 +504,10 @@ def _build_route_elements(
             }
         )
 
-    transition_ids = []
     for idx in range(len(path.sequence) - 1):
         from_cell = path.sequence[idx]
         to_cell = path.sequence[idx + 1]
         edge_id = f"transition:{from_cell}->{to_cell}"
-        transition_ids.append(edge_id)
         elements.append(
             {
                 "data": {
@@ -394,17 +521,10 @@ def _build_route_elements(
             }
         )
 
-    bridges_by_transition: dict[str, list[str]] = {}
-    for bridge in data.bridges:
-        transition = f"{bridge.from_cell}->{bridge.to_cell}"
-        bridges_by_transition.setdefault(transition, []).append(bridge.id)
-
-    for transition in transition_ids:
-        transition_key = transition.removeprefix("transition:")
-        for bridge_id in bridges_by_transition.get(transition_key, []):
-            bridge = next((item for item in data.bridges if item.id == bridge_id), None)
-            if not bridge:
-                continue
+    relations = components.bridge_relations(data)
+    for from_cell, to_cell in zip(path.sequence, path.sequence[1:]):
+        for bridge in relations.transition_bridges(data, from_cell, to_cell):
+            bridge_id = bridge.id
             elements.append(
                 {
                     "data": {
@@ -444,12 +564,10 @@ def _build_route_elements(
         way_lookup = components.taxonomy_lookup(data)
         linked_way_ids = {
             way_id
-            for bridge in data.bridges
-            for way_id in bridge.linked_way_ids
-            if any(
-                bridge.from_cell == cell_id or bridge.to_cell == cell_id
-                for cell_id in path.sequence
-            )
+            for row in {
+                row for cell_id in path.sequence for row in relations.bridges_by_cell.get(cell_id, ())
+            }
+            for way_id in data.bridges[row].linked_way_ids
         }
         for way_id in linked_way_ids:
             way = way_lookup.get(way_id)
@@ -506,6 +624,11 @@ def _build_route_elements(
     return elements
 
 
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _overview_elements_for_version(version: str, _data: AppData) -> list[dict[str, object]]:
+    return _overview_elements(_data)
+
+
 def _overview_elements(data: AppData) -> list[dict[str, object]]:
     overview_nodes = [
         ("overview:ways", f"Способы ({len(data.taxonomy)})", "way"),
@@ -569,7 +692,7 @@ def render_overview_tab(data: AppData) -> None:
     st.subheader("Обзор")
     st.markdown("Кликните тип, чтобы перейти к исследованию связей.")
     _legend()
-    elements = _overview_elements(data)
+    elements = _overview_elements_for_version(components.data_version(), data)
     selected = cytoscape(
         elements,
         _stylesheet(),
@@ -583,6 +706,27 @@ def render_overview_tab(data: AppData) -> None:
         if target:
             st.session_state["graph_selected_node_id"] = target
             components.request_navigation(section="Граф", graph_tab="Исследование")
+    _render_hubs(data)
+
+
+def _render_hubs(data: AppData) -> None:
+    model = _get_graph_model(data)
+    analytics = _get_graph_analytics(data)
+    with st.expander("Ключевые узлы", expanded=False):
+        node_type = st.selectbox("Тип узла", NODE_TYPES, key="graph_hub_type")
+        rows = [
+            {
+                "Узел": model.nodes_by_id[hub_id].label,
+                "Связей": analytics.degree.get(hub_id, 0),
+                "PageRank": round(analytics.pagerank.get(hub_id, 0.0), 4),
+                "Посредничество": round(analytics.betweenness.get(hub_id, 0.0), 4),
+            }
+            for hub_id in analytics.hubs.get(node_type, [])
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Нет узлов этого типа.")
 
 
 def render_explore_tab(data: AppData, filters: components.Filters) -> None:
@@ -637,7 +781,12 @@ def render_explore_tab(data: AppData, filters: components.Filters) -> None:
         st.markdown("#### Параметры")
         st.selectbox("Глубина", [1, 2], key="graph_depth")
         st.slider("Макс. узлов", 20, 120, key="graph_max_nodes")
-        st.selectbox("Layout", ["fcose", "breadthfirst", "concentric"], key="graph_layout_name")
+        st.selectbox(
+            "Layout",
+            LAYOUT_NAMES,
+            key="graph_layout_name",
+            format_func=lambda name: "preset (сервер)" if name == "preset" else name,
+        )
 
         st.markdown("#### Фильтры узлов")
         for node_type in NODE_TYPES:
@@ -668,15 +817,26 @@ def render_explore_tab(data: AppData, filters: components.Filters) -> None:
         depth = int(st.session_state.get("graph_depth", 1))
         if st.session_state.get("graph_expand_depth_override"):
             depth = min(2, depth + 1)
+        node_type_filters = st.session_state.get("graph_node_type_filters", {})
+        edge_type_filters = st.session_state.get("graph_edge_type_filters", {})
+        view = _get_graph_view(data, node_type_filters, edge_type_filters)
+        layout_name = st.session_state.get("graph_layout_name", "preset")
+        positions = None
+        if layout_name == "preset":
+            positions = _get_graph_layout(data, node_type_filters, edge_type_filters)
         elements, included_nodes, _ = _build_subgraph(
             model,
+            view,
             selected_node_id or "",
-            st.session_state.get("graph_node_type_filters", {}),
-            st.session_state.get("graph_edge_type_filters", {}),
             depth,
             int(st.session_state.get("graph_max_nodes", 60)),
+            _element_cache(),
+            positions,
+            _get_graph_analytics(data).pagerank,
         )
-        layout = {"name": st.session_state.get("graph_layout_name", "fcose"), "animate": False}
+        layout = {"name": layout_name, "animate": False}
+        if layout_name == "preset":
+            layout.update({"fit": True, "padding": 30})
         selected = cytoscape(
             elements,
             _stylesheet(),
@@ -712,6 +872,7 @@ def render_explore_tab(data: AppData, filters: components.Filters) -> None:
         edge_id = st.session_state.get("graph_selected_edge_id")
         if node_id and node_id in model.nodes_by_id:
             _render_node_details(model.nodes_by_id[node_id])
+            _render_node_metrics(model, _get_graph_analytics(data), node_id)
             st.button(
                 "Раскрыть связи",
                 key="graph-expand-node",
@@ -1,42 +1,12 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Iterable
-
 import streamlit as st
 
-from money_map.core.model import AppData, BridgeItem, PathItem, TaxonomyItem
+from money_map.core.model import AppData
 from money_map.ui import components
 from money_map.ui.state import go_to_section, request_nav
 
 
-def _index_by_cell(items: Iterable[TaxonomyItem]) -> dict[str, list[TaxonomyItem]]:
-    grouped: dict[str, list[TaxonomyItem]] = defaultdict(list)
-    for item in items:
-        for cell_id in item.typical_cells:
-            grouped[cell_id].append(item)
-    return grouped
-
-
-def _index_paths_by_cell(paths: Iterable[PathItem]) -> dict[str, list[PathItem]]:
-    grouped: dict[str, list[PathItem]] = defaultdict(list)
-    for path in paths:
-        for cell_id in path.sequence:
-            grouped[cell_id].append(path)
-    return grouped
-
-
-def _index_bridges_by_from(
-    bridges: Iterable[BridgeItem],
-) -> tuple[dict[str, list[BridgeItem]], dict[tuple[str, str], list[BridgeItem]]]:
-    by_from: dict[str, list[BridgeItem]] = defaultdict(list)
-    by_transition: dict[tuple[str, str], list[BridgeItem]] = defaultdict(list)
-    for bridge in bridges:
-        by_from[bridge.from_cell].append(bridge)
-        by_transition[(bridge.from_cell, bridge.to_cell)].append(bridge)
-    return by_from, by_transition
-
-
 def _axis_defaults(
     filters: components.Filters,
     selected_cell_id: str | None,
@@ -92,7 +62,7 @@ def render(data: AppData, filters: components.Filters) -> None:
     components.render_path_wizard("Матрица")
 
     focus_cell = st.session_state.get("matrix_focus_cell")
-    if focus_cell and st.session_state.get("selected_cell") != focus_cell:
+    if focus_cell and st.session_state.get("selected_cell_id") != focus_cell:
         components.set_selected_cell(focus_cell)
 
     selected_cell_id = st.session_state.get("selected_cell_id")
@@ -147,9 +117,8 @@ def render(data: AppData, filters: components.Filters) -> None:
         _select_cell(derived_cell)
         _queue_global_filter_updates(risk, activity, scalability)
 
-    ways_by_cell = _index_by_cell(data.taxonomy)
-    paths_by_cell = _index_paths_by_cell(data.paths)
-    bridges_by_from, bridges_by_transition = _index_bridges_by_from(data.bridges)
+    aggregates = components.cell_aggregates(data)
+    cells_by_id = components.cell_lookup(data)
 
     grid_cols = st.columns(2)
     for idx, (risk_key, risk_label) in enumerate(
@@ -164,20 +133,18 @@ def render(data: AppData, filters: components.Filters) -> None:
                         cell = components.axes_to_cell_id(risk_key, activity_key, scale_key)
                         if not cell:
                             continue
-                        cell_data = components.cell_lookup(data).get(cell)
-                        if not cell_data:
+                        cell_data = cells_by_id.get(cell)
+                        stats = aggregates.cell(cell)
+                        if not cell_data or not stats:
                             continue
                         selected = cell_data.id == st.session_state.get("selected_cell_id")
                         with row[col_idx]:
                             with st.container(border=selected):
                                 st.markdown(f"### {cell_data.id}")
                                 st.caption(cell_data.label)
-                                ways_count = len(ways_by_cell.get(cell_data.id, []))
-                                bridges_count = len(bridges_by_from.get(cell_data.id, []))
-                                routes_count = len(paths_by_cell.get(cell_data.id, []))
-                                variants_count = len(data.variants_by_cell_id.get(cell_data.id, []))
                                 st.caption(
-                                    f"💠 {ways_count}  🌉 {bridges_count}  🧭 {routes_count}  🧩 {variants_count}",
+                                    f"💠 {len(stats.way_ids)}  🌉 {len(stats.outgoing_bridges)}  "
+                                    f"🧭 {stats.routes}  🧩 {stats.variants}",
                                 )
                                 if st.button(
                                     f"Выбрать {cell_data.id}",
@@ -206,13 +173,15 @@ def render(data: AppData, filters: components.Filters) -> None:
         st.info("Выберите ячейку, чтобы увидеть детали.")
         return
 
-    cell = components.cell_lookup(data).get(selected_id)
-    if not cell:
+    cell = cells_by_id.get(selected_id)
+    stats = aggregates.cell(selected_id)
+    if not cell or not stats:
         st.warning("Выбранная ячейка не найдена.")
         return
 
-    related_ways = sorted(ways_by_cell.get(cell.id, []), key=lambda item: item.name)
-    outgoing_transitions = sorted({bridge.to_cell for bridge in bridges_by_from.get(cell.id, [])})
+    way_lookup = components.taxonomy_lookup(data)
+    related_ways = [way_lookup[way_id] for way_id in stats.way_ids if way_id in way_lookup]
+    outgoing_transitions = stats.targets
     selected_transition = st.session_state.get("selected_transition")
     if selected_transition and not selected_transition.startswith(f"{cell.id}->"):
         selected_transition = None
@@ -256,6 +225,13 @@ def render(data: AppData, filters: components.Filters) -> None:
                                 open_tab="directory",
                             )
 
+        if stats.top_mechanisms:
+            top = ", ".join(
+                f"{way_lookup[way_id].name if way_id in way_lookup else way_id} ({count})"
+                for way_id, count in stats.top_mechanisms
+            )
+            st.caption(f"Больше всего вариантов: {top}")
+
         st.markdown("#### Куда можно перейти")
         if not outgoing_transitions:
             st.caption("Нет исходящих переходов.")
@@ -272,7 +248,8 @@ def render(data: AppData, filters: components.Filters) -> None:
         if selected_transition:
             from_cell, to_cell = selected_transition.split("->", maxsplit=1)
             st.caption(f"Мосты для перехода {from_cell} → {to_cell}")
-            bridges = bridges_by_transition.get((from_cell, to_cell), [])
+            transition_stats = aggregates.transition(from_cell, to_cell)
+            bridges = [data.bridges[index] for index in transition_stats.bridges] if transition_stats else []
             if not bridges:
                 st.caption("Нет мостов для выбранного перехода.")
             else:
@@ -25,6 +25,27 @@ def render(data: AppData) -> None:
     cols[2].metric("Мосты", len(data.bridges))
     cols[3].metric("Маршруты", len(data.paths))
 
+    st.subheader("Ячейки в цифрах")
+    aggregates = components.cell_aggregates(data)
+    way_names = {item.id: item.name for item in data.taxonomy}
+    rows = []
+    for cell in data.cells:
+        stats = aggregates.cell(cell.id)
+        if not stats:
+            continue
+        top_way = stats.top_mechanisms[0][0] if stats.top_mechanisms else None
+        rows.append(
+            {
+                "Ячейка": cell.label,
+                "Способы": len(stats.way_ids),
+                "Мосты": len(stats.outgoing_bridges),
+                "Маршруты": stats.routes,
+                "Варианты": stats.variants,
+                "Больше всего вариантов": way_names.get(top_way, top_way) if top_way else "—",
+            }
+        )
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
     st.subheader("Быстрая навигация")
     st.markdown("Выберите раздел или используйте кнопки ниже:")
     nav_cols = st.columns(4)
@@ -2,89 +2,60 @@ from __future__ import annotations
 
 import streamlit as st
 
-from money_map.core.model import AppData, BridgeItem
+from money_map.core.model import AppData
+from money_map.core.route_planner import (
+    CRITERIA,
+    CRITERIA_LABELS,
+    DEFAULT_WEIGHTS,
+    RoutePlanner,
+    build_route_planner,
+)
+from money_map.core.routing import alternative_routes
 from money_map.ui import components
 from money_map.ui.state import go_to_section, request_nav
 
 
-def _transition_label(sequence: list[str]) -> list[str]:
-    return [f"{sequence[idx]}->{sequence[idx + 1]}" for idx in range(len(sequence) - 1)]
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _route_planner_for_version(version: str, _data: AppData) -> RoutePlanner:
+    return build_route_planner(_data)
 
 
-def _short_summary(text: str) -> str:
-    if not text:
-        return "Короткое описание недоступно."
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    if not lines:
-        return "Короткое описание недоступно."
-    return lines[0]
-
-
-def _bridge_ids(bridges: list[BridgeItem]) -> list[str]:
-    return [bridge.id for bridge in bridges]
-
-
-def _build_route_view_models(data: AppData) -> list[dict[str, object]]:
-    bridges_by_transition: dict[str, list[BridgeItem]] = {}
-    for bridge in data.bridges:
-        transition = f"{bridge.from_cell}->{bridge.to_cell}"
-        bridges_by_transition.setdefault(transition, []).append(bridge)
-
-    routes = []
-    for path in data.paths:
-        transitions = _transition_label(path.sequence)
-        recommended_by_transition = {
-            transition: _bridge_ids(sorted(bridges_by_transition.get(transition, []), key=lambda item: item.name))
-            for transition in transitions
-        }
-        linked_way_ids = {
-            way_id
-            for transition in transitions
-            for bridge in bridges_by_transition.get(transition, [])
-            for way_id in bridge.linked_way_ids
+def _render_route_planner(data: AppData, start_cell: str, target_cell: str) -> None:
+    planner = _route_planner_for_version(components.data_version(), data)
+    with st.expander("Подбор маршрута по критериям"):
+        weight_cols = st.columns(len(CRITERIA))
+        weights = {
+            criterion: weight_cols[idx].slider(
+                CRITERIA_LABELS[criterion],
+                min_value=0.0,
+                max_value=3.0,
+                value=DEFAULT_WEIGHTS[criterion],
+                step=0.5,
+                key=f"route_weight_{criterion}",
+            )
+            for idx, criterion in enumerate(CRITERIA)
         }
-        routes.append(
-            {
-                "route_id": path.id,
-                "name": path.name,
-                "cells": path.sequence,
-                "transitions": transitions,
-                "short_summary": _short_summary(path.note),
-                "recommended_bridges_by_transition": recommended_by_transition,
-                "linked_way_ids": sorted(linked_way_ids),
-            }
-        )
-    return routes
-
-
-def _filter_routes(
-    routes: list[dict[str, object]],
-    *,
-    start_cell: str | None,
-    target_cell: str | None,
-    allowed_cells: set[str],
-    apply_global_filter: bool,
-) -> list[dict[str, object]]:
-    filtered = routes
-    if start_cell:
-        filtered = [
-            route
-            for route in filtered
-            if route["cells"] and route["cells"][0] == start_cell
-        ]
-    if target_cell:
-        filtered = [
-            route
-            for route in filtered
-            if route["cells"] and route["cells"][-1] == target_cell
-        ]
-    if apply_global_filter:
-        filtered = [
-            route
-            for route in filtered
-            if any(cell in allowed_cells for cell in route["cells"])
-        ]
-    return filtered
+        best = planner.best_route(start_cell, target_cell, weights)
+        if best is None:
+            return
+        st.markdown(f"**Лучший маршрут:** {' → '.join(best.cells)}")
+        st.caption("Мосты: " + ", ".join(best.bridge_ids))
+        front = planner.pareto_routes(start_cell, target_cell, weights)
+        if len(front) > 1:
+            st.markdown("**Компромиссные варианты**")
+            st.dataframe(
+                [
+                    {
+                        "Ячейки": " → ".join(route.cells),
+                        "Мосты": ", ".join(route.bridge_ids),
+                        **{CRITERIA_LABELS[criterion]: round(route.cost(criterion), 2) for criterion in CRITERIA},
+                        "Итог": round(route.score, 2),
+                    }
+                    for route in front
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
 
 
 def render(data: AppData, filters: components.Filters) -> None:
@@ -93,7 +64,6 @@ def render(data: AppData, filters: components.Filters) -> None:
         route_id = payload.get("route_id")
         if isinstance(route_id, str):
             st.session_state["selected_route_id"] = route_id
-            st.session_state["selected_path"] = route_id
 
     st.title("Маршруты")
     components.render_path_wizard("Маршрут")
@@ -101,7 +71,7 @@ def render(data: AppData, filters: components.Filters) -> None:
     cell_lookup = components.cell_lookup(data)
     bridge_lookup = {bridge.id: bridge for bridge in data.bridges}
     way_lookup = components.taxonomy_lookup(data)
-    routes = _build_route_view_models(data)
+    catalog = components.route_catalog(data)
 
     selected_cell_id = st.session_state.get("selected_cell_id")
     if st.session_state.get("route_filters_start_cell") is None and selected_cell_id:
@@ -114,7 +84,6 @@ def render(data: AppData, filters: components.Filters) -> None:
         st.session_state["route_filters_start_cell"] = None
         st.session_state["route_filters_target_cell"] = None
         st.session_state["selected_route_id"] = None
-        st.session_state["selected_path"] = None
         st.session_state["selected_transition"] = None
         st.session_state["selected_bridge_id"] = None
         st.session_state["chosen_bridges_by_transition"] = {}
@@ -122,7 +91,6 @@ def render(data: AppData, filters: components.Filters) -> None:
     def _on_route_change() -> None:
         route_id = st.session_state.get("routes_selected_route")
         st.session_state["selected_route_id"] = route_id
-        st.session_state["selected_path"] = route_id
         st.session_state["selected_transition"] = None
         st.session_state["selected_bridge_id"] = None
         st.session_state["chosen_bridges_by_transition"] = {}
@@ -156,14 +124,25 @@ def render(data: AppData, filters: components.Filters) -> None:
         format_func=lambda value: "Все" if value is None else value,
     )
 
-    filtered_routes = _filter_routes(
-        routes,
+    filtered_routes = catalog.filter(
         start_cell=st.session_state.get("route_filters_start_cell"),
         target_cell=st.session_state.get("route_filters_target_cell"),
-        allowed_cells=allowed_cells,
-        apply_global_filter=apply_global_filter,
+        allowed_cells=allowed_cells if apply_global_filter else None,
     )
 
+    start_cell = st.session_state.get("route_filters_start_cell")
+    target_cell = st.session_state.get("route_filters_target_cell")
+    if start_cell and target_cell and start_cell != target_cell:
+        shortest = alternative_routes(data, start_cell, target_cell)
+        if shortest:
+            st.caption(
+                "Кратчайшие переходы по мостам: "
+                + "; ".join(" → ".join(cells) for cells in shortest)
+            )
+            _render_route_planner(data, start_cell, target_cell)
+        else:
+            st.caption(f"Мостов из {start_cell} в {target_cell} нет.")
+
     if not filtered_routes:
         top_cols[2].selectbox(
             "Маршрут",
@@ -175,11 +154,10 @@ def render(data: AppData, filters: components.Filters) -> None:
         st.info("Нет маршрутов для выбранных условий. Попробуйте сбросить фильтры.")
         return
 
-    available_route_ids = [route["route_id"] for route in filtered_routes]
+    available_route_ids = [route.route_id for route in filtered_routes]
     selected_id = st.session_state.get("selected_route_id")
     if selected_id not in available_route_ids:
         st.session_state["selected_route_id"] = None
-        st.session_state["selected_path"] = None
         selected_id = None
 
     if st.session_state.get("routes_selected_route") != selected_id:
@@ -188,11 +166,11 @@ def render(data: AppData, filters: components.Filters) -> None:
     def _route_label(route_id: str | None) -> str:
         if route_id is None:
             return "Выберите маршрут"
-        route = next((item for item in filtered_routes if item["route_id"] == route_id), None)
+        route = catalog.route(route_id)
         if not route:
             return route_id
-        cells = " → ".join(route["cells"])
-        return f"{cells} · {route['name']}"
+        cells = " → ".join(route.cells)
+        return f"{cells} · {route.name}"
 
     top_cols[2].selectbox(
         "Маршрут",
@@ -207,28 +185,28 @@ def render(data: AppData, filters: components.Filters) -> None:
         st.info("Выберите маршрут, чтобы увидеть шаги.")
         return
 
-    route = next((item for item in filtered_routes if item["route_id"] == selected_id), None)
+    route = catalog.route(selected_id)
     if not route:
         st.warning("Маршрут не найден.")
         return
 
-    if st.session_state.get("selected_transition") not in route["transitions"]:
+    if st.session_state.get("selected_transition") not in route.transitions:
         st.session_state["selected_transition"] = None
 
     st.markdown("### Линия маршрута")
-    line_cols = st.columns(len(route["cells"]) * 2 - 1)
-    for idx, cell_id in enumerate(route["cells"]):
+    line_cols = st.columns(len(route.cells) * 2 - 1)
+    for idx, cell_id in enumerate(route.cells):
         cell = cell_lookup.get(cell_id)
         with line_cols[idx * 2]:
             with st.container(border=True):
                 st.markdown(f"**{cell_id}**")
                 st.caption(cell.short if cell else "—")
-        if idx < len(route["cells"]) - 1:
-            transition = route["transitions"][idx]
+        if idx < len(route.cells) - 1:
+            transition = route.transitions[idx]
             with line_cols[idx * 2 + 1]:
                 st.button(
                     "→",
-                    key=f"route-transition-{route['route_id']}-{transition}",
+                    key=f"route-transition-{route.route_id}-{transition}",
                     on_click=_select_transition,
                     args=(transition,),
                     use_container_width=True,
@@ -240,8 +218,8 @@ def render(data: AppData, filters: components.Filters) -> None:
         st.markdown("#### Шаги и мосты")
         selected_transition = st.session_state.get("selected_transition")
         selected_bridge_by_transition = st.session_state.get("chosen_bridges_by_transition", {})
-        for transition in route["transitions"]:
-            bridges_for_transition = route["recommended_bridges_by_transition"].get(transition, [])
+        for transition in route.transitions:
+            bridges_for_transition = route.recommended_bridges_by_transition.get(transition, [])
             bridge_objects = [bridge_lookup.get(bridge_id) for bridge_id in bridges_for_transition]
             bridge_objects = [bridge for bridge in bridge_objects if bridge]
             if len(bridge_objects) > 6:
@@ -257,7 +235,7 @@ def render(data: AppData, filters: components.Filters) -> None:
                 if selected_transition != transition:
                     header_cols[1].button(
                         "Выбрать",
-                        key=f"route-transition-select-{route['route_id']}-{transition}",
+                        key=f"route-transition-select-{route.route_id}-{transition}",
                         on_click=_select_transition,
                         args=(transition,),
                     )
@@ -272,7 +250,7 @@ def render(data: AppData, filters: components.Filters) -> None:
                         with chip_cols[index % len(chip_cols)]:
                             st.button(
                                 bridge.name,
-                                key=f"route-bridge-{route['route_id']}-{transition}-{bridge.id}",
+                                key=f"route-bridge-{route.route_id}-{transition}-{bridge.id}",
                                 on_click=_choose_bridge,
                                 args=(transition, bridge.id),
                                 type="primary"
@@ -285,7 +263,7 @@ def render(data: AppData, filters: components.Filters) -> None:
                             for bridge in extra_bridges:
                                 st.button(
                                     bridge.name,
-                                    key=f"route-bridge-extra-{route['route_id']}-{transition}-{bridge.id}",
+                                    key=f"route-bridge-extra-{route.route_id}-{transition}-{bridge.id}",
                                     on_click=_choose_bridge,
                                     args=(transition, bridge.id),
                                     type="primary"
@@ -296,15 +274,20 @@ def render(data: AppData, filters: components.Filters) -> None:
 
     with body_cols[1]:
         with st.container(border=True):
-            st.markdown(f"### {route['name']}")
-            st.caption(route["short_summary"])
+            st.markdown(f"### {route.name}")
+            st.caption(route.short_summary)
+            global_mask = components.global_variant_mask(data, filters)
+            st.caption(f"Вариантов по маршруту: {(route.variant_mask & global_mask).bit_count()}")
             st.markdown("**Шаги маршрута**")
-            for transition in route["transitions"]:
+            for transition, step_mask in zip(route.transitions, route.step_variant_masks):
                 bridge_id = st.session_state.get("chosen_bridges_by_transition", {}).get(transition)
                 bridge_name = bridge_lookup.get(bridge_id).name if bridge_id and bridge_lookup.get(bridge_id) else "—"
-                st.markdown(f"- {transition.replace('->', ' → ')} · мост: {bridge_name}")
+                st.markdown(
+                    f"- {transition.replace('->', ' → ')} · мост: {bridge_name}"
+                    f" · вариантов: {(step_mask & global_mask).bit_count()}"
+                )
 
-            linked_way_ids = route.get("linked_way_ids", [])
+            linked_way_ids = route.linked_way_ids
             if linked_way_ids:
                 st.markdown("**Связанные способы**")
                 way_cols = st.columns(min(len(linked_way_ids), 2))
@@ -314,7 +297,7 @@ def render(data: AppData, filters: components.Filters) -> None:
                     with way_cols[idx % len(way_cols)]:
                         st.button(
                             label,
-                            key=f"route-way-{route['route_id']}-{way_id}",
+                            key=f"route-way-{route.route_id}-{way_id}",
                             on_click=go_to_section,
                             args=("ways",),
                             kwargs={"way_id": way_id, "open_tab": "directory"},
@@ -323,10 +306,10 @@ def render(data: AppData, filters: components.Filters) -> None:
 
             st.button(
                 "Показать конкретику по маршруту",
-                key=f"route-open-variants-{route['route_id']}",
+                key=f"route-open-variants-{route.route_id}",
                 on_click=go_to_section,
                 args=("variants",),
-                kwargs={"route_id": route["route_id"]},
+                kwargs={"route_id": route.route_id},
                 use_container_width=True,
                 type="primary",
             )
@@ -334,23 +317,15 @@ def render(data: AppData, filters: components.Filters) -> None:
             if st.session_state.get("nav_mode") == "Сравнение":
                 if st.button(
                     "+ В сравнение",
-                    key=f"route-compare-{route['route_id']}",
+                    key=f"route-compare-{route.route_id}",
                     use_container_width=True,
                 ):
-                    components.add_compare_item(
-                        {
-                            "type": "route",
-                            "id": route["route_id"],
-                            "name": route["name"],
-                            "cell_id": route["cells"][0] if route["cells"] else None,
-                            "classifier_tags": [],
-                        },
-                    )
+                    components.add_compare_item("route", route.route_id)
 
             if st.session_state.get("selected_transition"):
                 st.button(
                     f"Открыть мосты для шага {st.session_state['selected_transition'].replace('->', ' → ')}",
-                    key=f"route-open-bridges-{route['route_id']}",
+                    key=f"route-open-bridges-{route.route_id}",
                     on_click=go_to_section,
                     args=("bridges",),
                     kwargs={"transition": st.session_state["selected_transition"]},
@@ -359,14 +334,14 @@ def render(data: AppData, filters: components.Filters) -> None:
             if st.session_state.get("nav_mode") == "Конструктор пути":
                 if st.button(
                     "Дальше → Мосты",
-                    key=f"route-next-bridges-{route['route_id']}",
+                    key=f"route-next-bridges-{route.route_id}",
                     use_container_width=True,
                 ):
                     st.session_state["nav_step_next"] = "Мосты"
                     request_nav("Мосты")
             st.button(
                 "Сбросить выбор мостов",
-                key=f"route-reset-bridges-{route['route_id']}",
+                key=f"route-reset-bridges-{route.route_id}",
                 on_click=_reset_chosen_bridges,
                 use_container_width=True,
             )
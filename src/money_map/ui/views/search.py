@@ -323,7 +323,7 @@ def _build_indices(data: AppData) -> List[SearchEntry]:
 def render(data: AppData) -> None:
     def _reset_search_state() -> None:
         st.session_state["search_results_limit"] = 10
-        st.session_state["search_selected_result"] = None
+        components.session_model().search_selected = None
 
     st.title("Поиск")
     st.markdown("Поиск по способам, мостам, ячейкам, маршрутам, классификаторам и вариантам.")
@@ -390,7 +390,7 @@ def render(data: AppData) -> None:
         return
 
     def _select_result(entry: SearchEntry) -> None:
-        st.session_state["search_selected_result"] = {"type": entry.type, "id": entry.id}
+        components.session_model().search_selected = (entry.type, entry.id)
 
     def _open_entry(entry: SearchEntry) -> None:
         if entry.type == "ways":
@@ -480,12 +480,12 @@ def render(data: AppData) -> None:
             ),
         )
 
-    selected = st.session_state.get("search_selected_result")
+    selected = components.session_model().search_selected
     if not selected:
         return
 
     selected_entry = next(
-        (entry for entry in entries if entry.type == selected.get("type") and entry.id == selected.get("id")),
+        (entry for entry in entries if (entry.type, entry.id) == selected),
         None,
     )
     if not selected_entry:
@@ -25,7 +25,7 @@ def render(data: AppData) -> None:
             ):
                 components.set_selected_taxonomy(item.id)
 
-    selected_id = st.session_state.get("selected_taxonomy")
+    selected_id = st.session_state.get("selected_way_id")
     if not selected_id:
         with right:
             st.info("Выберите механизм дохода.")
@@ -4,25 +4,9 @@ import streamlit as st
 import streamlit.components.v1 as components_html
 
 from money_map.core.model import AppData
-from money_map.render.taxonomy_graph import render_taxonomy_graph_html
 from money_map.ui import components
 
 
-@st.cache_data(show_spinner="Формирование графа...")
-def _build_graph_html(
-    data: AppData,
-    include_tags: bool,
-    outside_only: bool,
-) -> str:
-    return render_taxonomy_graph_html(
-        data,
-        include_tags=include_tags,
-        outside_only=outside_only,
-        height="720px",
-        width="100%",
-    )
-
-
 def render(data: AppData) -> None:
     st.title("Граф: 14 способов")
     st.markdown("Визуализация механизмов получения денег и связанных тегов.")
@@ -42,9 +26,9 @@ def render(data: AppData) -> None:
         "(пособия, страховки, подарки и т.п.)."
     )
     if controls[2].button("Обновить"):
-        _build_graph_html.clear()
+        components.clear_taxonomy_graph_cache()
 
-    html = _build_graph_html(data, include_tags, outside_only)
+    html = components.taxonomy_graph_html(data, include_tags, outside_only)
     components_html.html(html, height=760, scrolling=True)
 
     st.markdown("### Детали")
@@ -57,7 +41,7 @@ def render(data: AppData) -> None:
 
     item_lookup = {item.id: item for item in available_items}
     available_ids = [item.id for item in available_items]
-    selected_current = st.session_state.get("selected_taxonomy")
+    selected_current = st.session_state.get("selected_way_id")
     selected_index = available_ids.index(selected_current) if selected_current in item_lookup else None
     selected_id = st.selectbox(
         "Механизм",
@@ -1,41 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Iterable
 
 import streamlit as st
 
 from money_map.core.model import AppData
 from money_map.ui import components
+from money_map.ui.logic.session_model import SHORTLIST_LIMIT, SHORTLIST_STATUSES
 from money_map.ui.logic.variants_filter import (
     MatchResult,
     NormalizedVariant,
-    apply_global_filters,
-    data_coverage_score,
+    VariantCatalog,
     explain_match,
-    match_score,
-    normalize_variant,
 )
+from money_map.ui.logic.variants_library import LibraryQuery
+from money_map.ui.logic.variants_rank import RankedVariants, SelectionContext, rank_variants
 from money_map.ui.state import go_to_section
 
 
-@dataclass(frozen=True)
-class SelectionContext:
-    selected_matrix_cell: str | None
-    selected_transition: str | None
-    selected_mechanism_ids: list[str]
-    selected_classifiers: dict[str, list[str]]
-    selected_route_id: str | None
-    selected_route_cells: list[str] | None
-    selected_bridge_ids: list[str]
-    selected_profile_id: str | None
-    selected_subprofile_id: str | None
-    selected_work_formats: list[str]
-    selected_entry_levels: list[str]
-    include_untagged: bool
+VARIANT_MODES = ("Подбор", "Библиотека", "Сравнение")
+TOP_MATCHES = 15
+MATCHES_PAGE_KEY = "variants_matches"
+LIBRARY_PAGE_KEY = "variants_library"
+RANKED_MATCHES_KEY = "variants_ranked_matches"
 
 
-VARIANT_MODES = ("Подбор", "Библиотека", "Сравнение")
+def _ranked_matches(
+    catalog: VariantCatalog,
+    context: SelectionContext,
+    *,
+    strict: bool,
+    global_mask: int,
+    signature: object,
+) -> RankedVariants:
+    # Ранжирование хранится в сессии, пока не сменился выбор: строки следующей страницы уже
+    # посчитаны, и «Вперёд →» ранжирует заново, только когда запас кончился.
+    shown = TOP_MATCHES + components.requested_page_end(MATCHES_PAGE_KEY, ahead=0)
+    cached = st.session_state.get(RANKED_MATCHES_KEY)
+    if cached is not None and cached[0] == signature:
+        ranked = cached[1]
+        if len(ranked.rows) >= min(shown, ranked.total):
+            return ranked
+    top_k = TOP_MATCHES + components.requested_page_end(MATCHES_PAGE_KEY)
+    ranked = rank_variants(catalog, context, strict=strict, global_mask=global_mask, top_k=top_k)
+    st.session_state[RANKED_MATCHES_KEY] = (signature, ranked)
+    return ranked
 
 
 def _apply_nav_payload(data: AppData) -> None:
@@ -68,7 +77,6 @@ def _apply_nav_payload(data: AppData) -> None:
         st.session_state["selected_bridge_id"] = bridge_id
     if isinstance(route_id, str):
         st.session_state["selected_route_id"] = route_id
-        st.session_state["selected_path"] = route_id
     if isinstance(transition, str):
         st.session_state["selected_transition"] = transition
     if classifier is not None:
@@ -231,24 +239,21 @@ def _render_path_panel(data: AppData, context: SelectionContext) -> None:
 
 
 def _render_shortlist_panel(data: AppData, variants: dict[str, NormalizedVariant]) -> None:
-    shortlist = st.session_state.get("shortlist", {})
+    shortlist = components.session_model().shortlist
     with st.container(border=True):
         st.markdown(f"### Шорт-лист ({len(shortlist)})")
         if not shortlist:
             st.caption("Добавьте 1–5 вариантов для сравнения.")
             return
-        for variant_id, meta in shortlist.items():
+        for variant_id, status in list(shortlist.items()):
             variant = variants.get(variant_id)
             if not variant:
                 continue
             status_key = f"shortlist-status-{variant_id}"
-            st.session_state.setdefault(status_key, meta.get("status", "candidate"))
+            st.session_state.setdefault(status_key, status)
 
             def _update_status(variant_id: str, key: str) -> None:
-                shortlist_local = dict(st.session_state.get("shortlist", {}))
-                if variant_id in shortlist_local:
-                    shortlist_local[variant_id]["status"] = st.session_state.get(key)
-                st.session_state["shortlist"] = shortlist_local
+                components.session_model().set_shortlist_status(variant_id, st.session_state.get(key))
 
             name_cols = st.columns([3, 1])
             name_cols[0].markdown(f"**{variant.title}**")
@@ -260,7 +265,7 @@ def _render_shortlist_panel(data: AppData, variants: dict[str, NormalizedVariant
             )
             st.selectbox(
                 "Статус",
-                ["candidate", "finalist"],
+                SHORTLIST_STATUSES,
                 key=status_key,
                 format_func=lambda value: "Кандидат" if value == "candidate" else "Финалист",
                 on_change=_update_status,
@@ -284,18 +289,13 @@ def _render_shortlist_panel(data: AppData, variants: dict[str, NormalizedVariant
 
 
 def _add_to_shortlist(variant_id: str) -> None:
-    shortlist = dict(st.session_state.get("shortlist", {}))
-    if variant_id not in shortlist and len(shortlist) >= 5:
-        st.session_state["shortlist_notice"] = "Можно добавить не больше 5 вариантов."
-        return
-    shortlist.setdefault(variant_id, {"status": "candidate", "note": ""})
-    st.session_state["shortlist"] = shortlist
+    if not components.session_model().add_to_shortlist(variant_id):
+        st.session_state["shortlist_notice"] = f"Можно добавить не больше {SHORTLIST_LIMIT} вариантов."
 
 
 def _remove_from_shortlist(variant_id: str) -> None:
-    shortlist = dict(st.session_state.get("shortlist", {}))
-    shortlist.pop(variant_id, None)
-    st.session_state["shortlist"] = shortlist
+    components.session_model().remove_from_shortlist(variant_id)
+    st.session_state.pop(f"shortlist-status-{variant_id}", None)
 
 
 def _request_variants_mode(mode: str) -> None:
@@ -416,7 +416,7 @@ def _render_variant_card(
         st.markdown(f"**{variant.title}**")
         st.caption(variant.kind)
     with header_cols[1]:
-        in_shortlist = variant.id in st.session_state.get("shortlist", {})
+        in_shortlist = variant.id in components.session_model().shortlist
         if in_shortlist:
             st.button(
                 "Удалить",
@@ -439,19 +439,7 @@ def _render_variant_card(
                 key=f"variant-compare-{variant.id}",
                 use_container_width=True,
             ):
-                components.add_compare_item(
-                    {
-                        "type": "variant",
-                        "id": variant.id,
-                        "name": variant.title,
-                        "cell_id": variant.matrix_cell,
-                        "classifier_tags": [
-                            *variant.classifiers.get("sell", []),
-                            *variant.classifiers.get("to_whom", []),
-                            *variant.classifiers.get("measure", []),
-                        ],
-                    },
-                )
+                components.add_compare_item("variant", variant.id)
         if st.session_state.get("nav_mode") == "Конструктор пути":
             if st.button(
                 "Сохранить выбор",
@@ -614,7 +602,7 @@ def _render_comparison(
     normalized_variants: dict[str, NormalizedVariant],
     matches: dict[str, MatchResult],
 ) -> None:
-    shortlist = st.session_state.get("shortlist", {})
+    shortlist = components.session_model().shortlist
     if len(shortlist) < 2:
         st.info("Добавьте минимум два варианта для сравнения.")
         return
@@ -715,10 +703,11 @@ def render(data: AppData, filters: components.Filters) -> None:
     with mode_cols[2]:
         st.caption("Строго = полное совпадение, Мягко = частичные совпадения с ранжированием.")
 
-    normalized = [normalize_variant(variant) for variant in data.variants]
-    filtered_global = apply_global_filters(
-        normalized,
-        risk=filters.risk,
+    catalog = components.variant_catalog(data)
+    normalized = catalog.variants
+    index = catalog.index
+    global_mask = index.equals(
+        risk_level=filters.risk,
         activity=filters.activity,
         scalability=filters.scalability,
     )
@@ -732,46 +721,35 @@ def render(data: AppData, filters: components.Filters) -> None:
     scope = st.session_state.get("variants_scope", "strict")
     strict = scope == "strict"
 
-    matches: list[MatchResult] = []
-    match_lookup: dict[str, MatchResult] = {}
-    for variant in filtered_global:
-        result = match_score(
-            variant,
-            selected_mechanism_ids=context.selected_mechanism_ids,
-            selected_matrix_cell=context.selected_matrix_cell,
-            selected_classifiers=context.selected_classifiers,
-            selected_route_cells=context.selected_route_cells,
-            selected_bridge_ids=context.selected_bridge_ids,
-            selected_profile_id=context.selected_profile_id,
-            selected_subprofile_id=context.selected_subprofile_id,
-            selected_work_formats=context.selected_work_formats,
-            selected_entry_levels=context.selected_entry_levels,
-            include_untagged=context.include_untagged,
+    current_mode = st.session_state.get("variants_mode", "Подбор")
+    match_signature = (strict, context, filters)
+    if current_mode == "Подбор":
+        ranked = _ranked_matches(
+            catalog,
+            context,
             strict=strict,
+            global_mask=global_mask,
+            signature=(components.data_version(), match_signature),
         )
-        if result is not None:
-            matches.append(result)
-            match_lookup[variant.id] = result
+    else:
+        # В остальных режимах нужна лишь маска.
+        ranked = rank_variants(catalog, context, strict=strict, global_mask=global_mask, top_k=0)
 
-    total_after_global = len(filtered_global)
-    hidden_count = max(total_after_global - len(matches), 0)
+    total_after_global = global_mask.bit_count()
+    hidden_count = max(total_after_global - ranked.total, 0)
 
-    current_mode = st.session_state.get("variants_mode", "Подбор")
     if current_mode == "Подбор":
-        matches.sort(
-            key=lambda item: (-item.score, -item.data_coverage, item.variant.title),
-        )
         header = st.columns([3, 1])
-        header[0].markdown(f"**Найдено вариантов:** {len(matches)}")
+        header[0].markdown(f"**Найдено вариантов:** {ranked.total}")
         if hidden_count:
             header[1].caption(f"Скрыто фильтрами: {hidden_count}")
 
-        if strict and context.selected_profile_id and not matches:
+        if strict and context.selected_profile_id and not ranked.total:
             st.warning(
                 "По выбранному профилю нет вариантов. Переключитесь на 'Шире' или выберите другой профиль.",
             )
 
-        if not context.selected_profile_id and len(matches) > 40:
+        if not context.selected_profile_id and ranked.total > 40:
             st.info("Слишком много вариантов. Выберите профиль деятельности, чтобы сузить список.")
 
         if st.session_state.pop("shortlist_notice", None):
@@ -779,12 +757,11 @@ def render(data: AppData, filters: components.Filters) -> None:
 
         list_col, shortlist_col = st.columns([3, 1])
         with list_col:
-            if not matches:
+            if not ranked.total:
                 st.info("Нет подходящих вариантов по текущему выбору.")
-            top_matches = matches[:15]
-            rest_matches = matches[15:]
+            top_matches = ranked.results(0, TOP_MATCHES)
             if top_matches:
-                st.markdown("#### Топ-15")
+                st.markdown(f"#### Топ-{TOP_MATCHES}")
             for match in top_matches:
                 with st.container(border=True):
                     _render_variant_card(
@@ -793,9 +770,15 @@ def render(data: AppData, filters: components.Filters) -> None:
                         data=data,
                         label_lookups=label_lookups,
                     )
-            if rest_matches:
-                with st.expander(f"Остальные варианты ({len(rest_matches)})", expanded=False):
-                    for match in rest_matches:
+            rest_total = max(ranked.total - TOP_MATCHES, 0)
+            if rest_total:
+                with st.expander(f"Остальные варианты ({rest_total})", expanded=False):
+                    page = components.paginate(
+                        rest_total,
+                        MATCHES_PAGE_KEY,
+                        signature=match_signature,
+                    )
+                    for match in ranked.results(TOP_MATCHES + page.start, TOP_MATCHES + page.stop):
                         with st.container(border=True):
                             _render_variant_card(
                                 match.variant,
@@ -803,9 +786,9 @@ def render(data: AppData, filters: components.Filters) -> None:
                                 data=data,
                                 label_lookups=label_lookups,
                             )
+                    components.render_pagination(page, MATCHES_PAGE_KEY)
         with shortlist_col:
-            variants_lookup = {item.id: item for item in normalized}
-            _render_shortlist_panel(data, variants_lookup)
+            _render_shortlist_panel(data, catalog.by_id)
 
     elif current_mode == "Библиотека":
         catalog_col, shortlist_col = st.columns([3, 1])
@@ -817,7 +800,7 @@ def render(data: AppData, filters: components.Filters) -> None:
             filter_cols = st.columns(3)
             mechanisms = {item.id: item.name for item in data.taxonomy}
             mechanism_options = ["all"] + sorted(mechanisms.keys())
-            kind_options = ["all"] + sorted({variant.kind for variant in normalized})
+            kind_options = ["all"] + sorted(index.bitmaps["kind"])
             cell_options = ["all"] + sorted({cell.id for cell in data.cells})
             filter_cols[0].selectbox(
                 "Способ",
@@ -838,48 +821,43 @@ def render(data: AppData, filters: components.Filters) -> None:
                 format_func=lambda value: "Все" if value == "all" else value,
             )
 
-            filtered = list(filtered_global)
-            mechanism_filter = st.session_state.get("variants_library_mechanism", "all")
-            kind_filter = st.session_state.get("variants_library_kind", "all")
-            cell_filter = st.session_state.get("variants_library_cell", "all")
-            if mechanism_filter != "all":
-                filtered = [item for item in filtered if item.mechanism_id == mechanism_filter]
-            if kind_filter != "all":
-                filtered = [item for item in filtered if item.kind == kind_filter]
-            if cell_filter != "all":
-                filtered = [item for item in filtered if cell_filter in item.matrix_cells]
-            if search_term:
-                search = search_term.lower()
-                filtered = [
-                    item
-                    for item in filtered
-                    if search in item.title.lower() or search in item.summary.lower()
-                ]
-
             sort_choice = st.selectbox(
                 "Сортировка",
                 ["title", "coverage"],
                 key="variants_library_sort",
                 format_func=lambda value: "По названию" if value == "title" else "По заполненности",
             )
-            if sort_choice == "coverage":
-                filtered.sort(key=lambda item: (-data_coverage_score(item), item.title))
-            else:
-                filtered.sort(key=lambda item: item.title)
-
-            st.markdown(f"**Всего в библиотеке:** {len(filtered)}")
-            for variant in filtered:
+            query = LibraryQuery(
+                version=components.data_version(),
+                risk=filters.risk,
+                activity=filters.activity,
+                scalability=filters.scalability,
+                mechanism=st.session_state.get("variants_library_mechanism", "all"),
+                kind=st.session_state.get("variants_library_kind", "all"),
+                cell=st.session_state.get("variants_library_cell", "all"),
+                search=search_term.lower(),
+                sort=sort_choice,
+            )
+            library_rows = components.library_rows(catalog, query)
+            st.markdown(f"**Всего в библиотеке:** {len(library_rows)}")
+            page = components.paginate(len(library_rows), LIBRARY_PAGE_KEY, signature=query)
+            for row in library_rows[page.start : page.stop]:
+                variant = normalized[row]
                 with st.container(border=True):
                     _render_variant_card(
                         variant,
-                        match=match_lookup.get(variant.id),
+                        match=ranked.match(variant.id),
                         data=data,
                         label_lookups=label_lookups,
                     )
+            components.render_pagination(page, LIBRARY_PAGE_KEY)
         with shortlist_col:
-            variants_lookup = {item.id: item for item in normalized}
-            _render_shortlist_panel(data, variants_lookup)
+            _render_shortlist_panel(data, catalog.by_id)
 
     else:
-        variants_lookup = {item.id: item for item in normalized}
-        _render_comparison(data, variants_lookup, match_lookup)
+        shortlist_matches = {
+            variant_id: match
+            for variant_id in components.session_model().shortlist
+            if (match := ranked.match(variant_id)) is not None
+        }
+        _render_comparison(data, catalog.by_id, shortlist_matches)
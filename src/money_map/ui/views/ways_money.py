@@ -6,7 +6,6 @@ from typing import Any
 import streamlit as st
 
 from money_map.core.model import AppData, TaxonomyItem
-from money_map.core.taxonomy_graph import build_taxonomy_star
 from money_map.ui import components, cyto_graph
 from money_map.ui.state import go_to_section, request_nav
 
@@ -91,7 +90,7 @@ def _build_elements(
     allowed_taxonomy_ids: set[str] | None,
     highlight_node_id: str | None,
 ) -> list[dict[str, Any]]:
-    graph = build_taxonomy_star(
+    graph = components.taxonomy_star(
         data,
         include_tags=show_tags,
         outside_only=outside_only,
@@ -320,19 +319,7 @@ def _render_map(
             selected_way_id = st.session_state.get("ways_selected_way_id")
             item = next((item for item in filtered_items if item.id == selected_way_id), None)
             if item and action_cols[1].button("+ В сравнение", key="ways-compare-selected"):
-                components.add_compare_item(
-                    {
-                        "type": "way",
-                        "id": item.id,
-                        "name": item.name,
-                        "cell_id": item.typical_cells[0] if item.typical_cells else None,
-                        "classifier_tags": [
-                            *item.sell,
-                            *item.to_whom,
-                            *item.value,
-                        ],
-                    },
-                )
+                components.add_compare_item("way", item.id)
 
         selected_way_id = st.session_state.get("ways_selected_way_id")
         allowed_profiles = data.money_way_profile_map.get(selected_way_id, [])
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from money_map.core.cell_stats import build_cell_aggregates
+from money_map.core.load import load_app_data
+
+
+def test_cell_aggregates_match_direct_counts() -> None:
+    data = load_app_data()
+    aggregates = build_cell_aggregates(data)
+    names = {item.id: item.name for item in data.taxonomy}
+
+    for cell in data.cells:
+        stats = aggregates.cell(cell.id)
+        assert stats is not None
+        ways = sorted(
+            (item for item in data.taxonomy for cell_id in item.typical_cells if cell_id == cell.id),
+            key=lambda item: item.name,
+        )
+        assert [names[way_id] for way_id in stats.way_ids] == [item.name for item in ways]
+        outgoing = [bridge for bridge in data.bridges if bridge.from_cell == cell.id]
+        assert [data.bridges[index] for index in stats.outgoing_bridges] == outgoing
+        assert stats.targets == tuple(sorted({bridge.to_cell for bridge in outgoing}))
+        assert stats.routes == sum(path.sequence.count(cell.id) for path in data.paths)
+        assert stats.variants == len(data.variants_by_cell_id.get(cell.id, []))
+        counts = [count for _, count in stats.top_mechanisms]
+        assert counts == sorted(counts, reverse=True)
+        for way_id, count in stats.top_mechanisms:
+            assert aggregates.cell_mechanisms[(cell.id, way_id)] == count
+
+    for key, transition in aggregates.transitions.items():
+        bridges = [
+            bridge
+            for bridge in data.bridges
+            if (bridge.from_cell, bridge.to_cell) == (transition.from_cell, transition.to_cell)
+        ]
+        assert [data.bridges[index] for index in transition.bridges] == bridges
+        expected = sum(
+            1
+            for variant in data.variants
+            if transition.from_cell in variant.matrix_cells
+            and transition.to_cell in variant.matrix_cells
+            and transition.from_cell != transition.to_cell
+        )
+        assert transition.variants == expected, key
+    assert aggregates.cell("missing") is None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from itertools import product
+
+from money_map.core.load import load_app_data
+from money_map.core.variant_index import build_variant_index, iter_rows
+from money_map.core.variant_store import build_variant_store
+from money_map.ui.components import score_variant_against_classifiers
+from money_map.ui.logic.classifier_catalog import GROUP_ORDER, build_classifier_catalog
+
+
+def _catalog():
+    data = load_app_data()
+    index = build_variant_index(build_variant_store(data.variants))
+    return data, build_classifier_catalog(data, index, {})
+
+
+def test_classifier_items_cover_mappings() -> None:
+    data, catalog = _catalog()
+    expected = len(data.mappings.sell_items) + len(data.mappings.to_whom_items) + len(data.mappings.value_measures)
+    assert len(catalog.items) == expected
+    assert [item.group for item in catalog.items] == sorted(
+        (item.group for item in catalog.items), key=GROUP_ORDER.index
+    )
+    assert catalog.search("", "all") == list(catalog.items)
+    first = catalog.items[0]
+    assert first in catalog.search(first.name.upper(), first.group)
+    assert catalog.search("нет-такого-слова") == []
+
+
+def test_tag_postings_match_direct_scans() -> None:
+    data, catalog = _catalog()
+    sell = [item_id for item_id, _ in catalog.options["what_sell"]][:3]
+    to_whom = [item_id for item_id, _ in catalog.options["to_whom"]][:2]
+    value = [item_id for item_id, _ in catalog.options["value_measure"]][:2]
+
+    choices = [
+        [set(), *({tag} for tag in sell), set(sell[:2])],
+        [set(), *({tag} for tag in to_whom)],
+        [set(), *({tag} for tag in value)],
+    ]
+    for picks in product(*choices):
+        selections = dict(zip(GROUP_ORDER, picks))
+        expected = [
+            row
+            for row, variant in enumerate(data.variants)
+            if score_variant_against_classifiers(variant, selections) is not None
+        ]
+        assert list(iter_rows(catalog.variant_mask(selections))) == expected
+
+        ways = []
+        for item in data.taxonomy:
+            profile = {"what_sell": set(item.sell), "to_whom": set(item.to_whom), "value_measure": set(item.value)}
+            score = sum(len(selected & profile[group]) * 2.0 for group, selected in selections.items())
+            if score > 0:
+                ways.append((item, score))
+        ways.sort(key=lambda pair: (-pair[1], pair[0].name))
+        assert catalog.matching_ways(data, selections) == ways
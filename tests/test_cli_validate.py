@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from money_map.app.cli import app
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+@pytest.fixture
+def broken_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    bridges = data_dir / "bridges.yaml"
+    text = bridges.read_text(encoding="utf-8").replace('to: "A2"', 'to: "Z9"')
+    bridges.write_text(text, encoding="utf-8")
+    monkeypatch.setenv("MONEY_MAP_DATA_DIR", str(data_dir))
+    return data_dir
+
+
+def test_validate_jsonl_reports_findings_and_summary(broken_data_dir: Path) -> None:
+    result = CliRunner().invoke(app, ["validate", "--format", "jsonl"])
+
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.output.splitlines()]
+    findings = [record for record in records if record["type"] == "finding"]
+    summary = records[-1]
+    assert summary["type"] == "summary"
+    assert not summary["ok"] and not summary["truncated"]
+    assert summary["total"] == len(findings) > 1
+    assert summary["counts"] == {"bridges.cells": len(findings)}
+    assert all("Z9" in finding["message"] for finding in findings)
+
+
+def test_validate_json_respects_max_errors(broken_data_dir: Path) -> None:
+    result = CliRunner().invoke(app, ["validate", "--format", "json", "--max-errors", "2"])
+
+    assert result.exit_code == 1
+    report = json.loads(result.output)
+    assert len(report["findings"]) == report["total"] == 2
+    assert report["truncated"]
+
+    fail_fast = json.loads(CliRunner().invoke(app, ["validate", "--format", "json", "--fail-fast"]).output)
+    assert fail_fast["findings"] == report["findings"][:1]
+
+
+def test_validate_json_on_valid_data() -> None:
+    result = CliRunner().invoke(app, ["validate", "--format", "json"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {"findings": [], "ok": True, "total": 0, "truncated": False, "counts": {}}
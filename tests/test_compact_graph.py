@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from money_map.core.compact_graph import build_compact_graph
+from money_map.core.graph_model import build_base_graph
+from money_map.core.load import load_app_data
+
+
+def test_compact_graph_matches_base_graph() -> None:
+    data = load_app_data()
+    model = build_base_graph(data)
+    compact = build_compact_graph(data)
+
+    assert [node.id for node in compact.nodes] == [node.id for node in model.nodes]
+    assert list(compact.edges) == model.edges
+    assert dict(compact.nodes_by_type) == model.nodes_by_type
+    assert dict(compact.edges_by_type) == model.edges_by_type
+    assert dict(compact.adjacency) == model.adjacency
+    assert dict(compact.incident_edges) == model.incident_edges
+
+    node_id = f"way:{data.taxonomy[0].id}"
+    assert compact.nodes_by_id[node_id] == model.nodes_by_id[node_id]
+
+
+def test_compact_graph_index_api() -> None:
+    data = load_app_data()
+    compact = build_compact_graph(data)
+
+    index = compact.node_index("cell:A1")
+    assert index is not None
+    assert compact.node_type(index) == "cell"
+    neighbors = {compact.node_id(item) for item in compact.neighbor_indices(index)}
+    assert neighbors == compact.adjacency["cell:A1"]
+    assert compact.degree(index) == len(neighbors)
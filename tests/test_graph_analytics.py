@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+from money_map.core.graph_analytics import compute_graph_analytics, reachable_nodes, top_hubs
+from money_map.core.graph_model import build_base_graph, extract_neighborhood
+from money_map.core.load import load_app_data
+from money_map.core.snapshot import data_fingerprint, load_artifact, snapshot_graph_analytics
+
+
+def _networkx_graph(model) -> nx.Graph:
+    graph = nx.Graph()
+    graph.add_nodes_from(model.nodes_by_id)
+    for edge in model.edges:
+        if edge.source in model.nodes_by_id and edge.target in model.nodes_by_id and edge.source != edge.target:
+            graph.add_edge(edge.source, edge.target)
+    return graph
+
+
+def test_graph_analytics_match_networkx() -> None:
+    model = build_base_graph(load_app_data())
+    analytics = compute_graph_analytics(model)
+    graph = _networkx_graph(model)
+
+    betweenness = nx.betweenness_centrality(graph)
+    assert analytics.betweenness_sources == graph.number_of_nodes()
+    for node_id in graph:
+        assert analytics.degree[node_id] == graph.degree(node_id)
+        assert analytics.betweenness[node_id] == pytest.approx(betweenness[node_id], abs=1e-9)
+
+    # nx.pagerank требует scipy, поэтому проверяем само уравнение PageRank.
+    pagerank = analytics.pagerank
+    count = graph.number_of_nodes()
+    dangling = sum(pagerank[node_id] for node_id in graph if graph.degree(node_id) == 0)
+    assert sum(pagerank.values()) == pytest.approx(1.0)
+    for node_id in graph:
+        expected = (1 - 0.85) / count + 0.85 * (
+            dangling / count + sum(pagerank[other] / graph.degree(other) for other in graph[node_id])
+        )
+        assert pagerank[node_id] == pytest.approx(expected, rel=1e-3)
+    assert sorted(map(sorted, analytics.components)) == sorted(
+        sorted(component) for component in nx.connected_components(graph)
+    )
+
+
+def test_graph_analytics_hubs_and_reachability() -> None:
+    model = build_base_graph(load_app_data())
+    analytics = compute_graph_analytics(model, hub_limit=5)
+
+    hubs = top_hubs(analytics, "bridge", limit=3)
+    assert len(hubs) == 3
+    assert all(model.nodes_by_id[hub_id].type == "bridge" for hub_id in hubs)
+    assert [analytics.pagerank[hub_id] for hub_id in hubs] == sorted(
+        (analytics.pagerank[hub_id] for hub_id in hubs), reverse=True
+    )
+
+    assert reachable_nodes(model, analytics, "cell:missing") == []
+
+
+def test_reachability_follows_transition_direction() -> None:
+    data = load_app_data()
+    model = build_base_graph(data)
+    analytics = compute_graph_analytics(model)
+
+    transitions = nx.DiGraph()
+    transitions.add_nodes_from(cell.id for cell in data.cells)
+    transitions.add_edges_from((bridge.from_cell, bridge.to_cell) for bridge in data.bridges)
+    transitions.add_edges_from(pair for path in data.paths for pair in zip(path.sequence, path.sequence[1:]))
+
+    found = {}
+    for cell in data.cells:
+        reached = nx.descendants(transitions, cell.id) | {cell.id}
+        variants = sorted(
+            f"variant:{variant.id}" for variant in data.variants if reached & set(variant.matrix_cells)
+        )
+        found[cell.id] = reachable_nodes(model, analytics, f"cell:{cell.id}", "variant")
+        assert found[cell.id] == variants
+        assert set(reachable_nodes(model, analytics, f"cell:{cell.id}", "cell")) == {
+            f"cell:{cell_id}" for cell_id in reached - {cell.id}
+        }
+
+    # Направленная достижимость зависит от стартовой ячейки, в отличие от компоненты связности.
+    assert len({tuple(variants) for variants in found.values()}) > 1
+    assert len(found["A1"]) > len(found["P4"])
+
+    variant = data.variants[0]
+    expected = set()
+    for cell_id in variant.matrix_cells:
+        expected |= set(reachable_nodes(model, analytics, f"cell:{cell_id}", "variant"))
+    expected.discard(f"variant:{variant.id}")
+    assert set(reachable_nodes(model, analytics, f"variant:{variant.id}", "variant")) == expected
+
+
+def test_sampled_betweenness_is_scaled_estimate() -> None:
+    model = build_base_graph(load_app_data())
+    exact = compute_graph_analytics(model)
+    sampled = compute_graph_analytics(model, betweenness_samples=60, seed=1)
+
+    assert sampled.betweenness_sources == 60
+    top_exact = max(exact.betweenness, key=exact.betweenness.get)
+    assert sampled.betweenness[top_exact] == pytest.approx(exact.betweenness[top_exact], rel=0.5)
+
+
+def test_neighborhood_uses_precomputed_rank() -> None:
+    model = build_base_graph(load_app_data())
+    analytics = compute_graph_analytics(model)
+    result = extract_neighborhood(model, "cell:A1", depth=1, max_nodes=6, rank=analytics.pagerank)
+
+    neighbors = [node_id for node_id in model.adjacency["cell:A1"] if node_id in model.nodes_by_id]
+    expected = sorted(neighbors, key=lambda node_id: (-analytics.pagerank[node_id], node_id))[:5]
+    assert result.truncated
+    assert result.node_ids == ["cell:A1"] + expected
+
+
+def test_snapshot_graph_analytics_roundtrip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path))
+    data = load_app_data()
+    version = data_fingerprint()
+
+    built = snapshot_graph_analytics(data, version)
+    stored = load_artifact(version, "graph_analytics")
+
+    assert stored is not None
+    assert stored.hubs == built.hubs
+    assert stored.component_of == built.component_of
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from money_map.core.graph_diff import GraphDiff, apply_graph_diff, update_graph_model
+from money_map.core.graph_model import GraphModel, build_base_graph
+from money_map.core.load import load_app_data
+
+
+def _assert_same_graph(model: GraphModel, expected: GraphModel) -> None:
+    assert sorted(node.id for node in model.nodes) == sorted(node.id for node in expected.nodes)
+    assert sorted(edge.id for edge in model.edges) == sorted(edge.id for edge in expected.edges)
+    assert model.nodes_by_id == expected.nodes_by_id
+    assert model.edges_by_id == expected.edges_by_id
+    assert model.adjacency == expected.adjacency
+    assert model.incident_edges == expected.incident_edges
+    assert model.nodes_by_type == expected.nodes_by_type
+    assert model.edges_by_type == expected.edges_by_type
+
+
+def test_update_graph_model_matches_rebuild() -> None:
+    data = load_app_data()
+    variants = list(data.variants)
+    removed = variants.pop()
+    variants[0] = variants[0].model_copy(
+        update={"matrix_cells": ["P4"], "bridge_ids": [data.bridges[0].id], "title": "Изменён"}
+    )
+    variants.append(removed.model_copy(update={"id": f"{removed.id}.copy"}))
+    bridges = list(data.bridges)
+    bridges.pop()
+    bridges[0] = bridges[0].model_copy(update={"to_cell": "P3"})
+    taxonomy = list(data.taxonomy)
+    taxonomy[0] = taxonomy[0].model_copy(update={"typical_cells": ["A1"]})
+    new_data = data.model_copy(
+        update={"variants": variants, "bridges": bridges, "taxonomy": taxonomy, "paths": data.paths[1:]}
+    )
+
+    model = build_base_graph(data)
+    update_graph_model(model, data, new_data)
+
+    _assert_same_graph(model, build_base_graph(new_data))
+
+
+def test_apply_graph_diff_removes_only_owned_edges() -> None:
+    data = load_app_data()
+    model = build_base_graph(data)
+    bridge = data.bridges[0]
+    users = {
+        edge_id
+        for edge_id in model.edges_by_type["variant_uses_bridge"]
+        if model.edges_by_id[edge_id].target == f"bridge:{bridge.id}"
+    }
+    new_data = data.model_copy(update={"bridges": data.bridges[1:]})
+
+    apply_graph_diff(model, GraphDiff(removed_bridges=[bridge.id]), new_data)
+
+    assert f"bridge:{bridge.id}" not in model.nodes_by_id
+    assert users <= set(model.edges_by_id)
+    assert f"bridge_for_transition:{bridge.id}:from" not in model.edges_by_id
+    assert model.edges_by_id.keys() == {edge.id for edge in model.edges}
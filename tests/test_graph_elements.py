@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from money_map.core.graph_model import build_base_graph
+from money_map.core.load import load_app_data
+from money_map.ui.views.graph import _build_subgraph, _ElementCache
+
+
+def test_subgraph_elements_are_reused_between_selections() -> None:
+    model = build_base_graph(load_app_data())
+    cache = _ElementCache("test")
+
+    first, first_nodes, _ = _build_subgraph(model, model, "cell:A1", 1, 40, cache)
+    second, _, _ = _build_subgraph(model, model, "cell:A2", 1, 40, cache)
+
+    by_id = {element["data"]["id"]: element for element in first}
+    shared = [element for element in second if element["data"]["id"] in by_id]
+    assert shared
+    for element in shared:
+        node_id = element["data"]["id"]
+        if node_id not in {"cell:A1", "cell:A2"} and "source" not in element["data"]:
+            assert element is by_id[node_id]
+    assert next(e for e in second if e["data"]["id"] == "cell:A2")["selected"] is True
+    assert "cell:A1" in first_nodes
+
+    again, _, _ = _build_subgraph(model, model, "cell:A2", 1, 40, cache)
+    # Повтор берётся из кеша подграфов, но каждый вызов получает свой список.
+    assert again is not second
+    assert len(again) == len(second) and all(a is b for a, b in zip(again, second))
+    first_again, _, _ = _build_subgraph(model, model, "cell:A1", 1, 40, cache)
+    assert all(a is b for a, b in zip(first_again, first))
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from money_map.core.graph_layout import layout_layered_positions
+from money_map.core.graph_model import build_base_graph, filter_graph
+from money_map.core.load import load_app_data
+from money_map.core.snapshot import data_fingerprint, graph_layout_artifact_name, load_artifact, snapshot_graph_layout
+
+
+def test_layered_layout_places_every_node_once() -> None:
+    model = build_base_graph(load_app_data())
+    positions = layout_layered_positions(model)
+
+    assert set(positions) == set(model.nodes_by_id)
+    assert len(set(positions.values())) == len(positions)
+    assert positions == layout_layered_positions(model)
+
+
+def test_layered_layout_keeps_cells_in_inner_ring() -> None:
+    model = build_base_graph(load_app_data())
+    positions = layout_layered_positions(model)
+
+    def radius(node_id: str) -> float:
+        x, y = positions[node_id]
+        return (x * x + y * y) ** 0.5
+
+    cell_radius = max(radius(node_id) for node_id in model.nodes_by_type["cell"])
+    assert all(radius(node_id) > cell_radius for node_id in model.nodes_by_type["variant"])
+
+
+def test_snapshot_graph_layout_per_filter_set(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path))
+    data = load_app_data()
+    version = data_fingerprint()
+    node_types = ["cell", "bridge"]
+    edge_types = ["bridge_for_transition"]
+
+    full = snapshot_graph_layout(data, version)
+    filtered = snapshot_graph_layout(data, version, node_types, edge_types)
+
+    assert load_artifact(version, graph_layout_artifact_name()) == full
+    assert load_artifact(version, graph_layout_artifact_name(node_types, edge_types)) == filtered
+    view = filter_graph(build_base_graph(data), node_types, edge_types)
+    assert set(filtered) == set(view.nodes_by_id)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from money_map.core.graph_model import build_base_graph, extract_neighborhood
+from money_map.core.load import load_app_data
+
+
+def test_neighborhood_respects_budget_and_filters() -> None:
+    model = build_base_graph(load_app_data())
+    result = extract_neighborhood(
+        model,
+        "cell:A1",
+        depth=2,
+        max_nodes=40,
+        node_types=["cell", "bridge", "way"],
+        edge_types=["transition", "bridge_for_transition", "maps_to_cell"],
+    )
+
+    assert result.node_ids[0] == "cell:A1"
+    assert len(result.node_ids) <= 40
+    assert {model.nodes_by_id[node_id].type for node_id in result.node_ids} <= {"cell", "bridge", "way"}
+
+    kept = set(result.node_ids)
+    expected = sorted(
+        edge.id
+        for edge in model.edges
+        if edge.source in kept
+        and edge.target in kept
+        and edge.type in {"transition", "bridge_for_transition", "maps_to_cell"}
+    )
+    assert result.edge_ids == expected
+
+
+def test_neighborhood_truncates_by_degree() -> None:
+    model = build_base_graph(load_app_data())
+    result = extract_neighborhood(model, "cell:A1", depth=1, max_nodes=10)
+
+    assert result.truncated
+    assert len(result.node_ids) == 10
+    degrees = [len(model.adjacency[node_id]) for node_id in result.node_ids[1:]]
+    assert degrees == sorted(degrees, reverse=True)
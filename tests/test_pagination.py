@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from money_map.core.load import load_app_data
+from money_map.ui import components
+from money_map.ui.components import paginate, requested_page_end
+from money_map.ui.logic.variants_filter import build_variant_catalog
+from money_map.ui.logic.variants_rank import SelectionContext
+from money_map.ui.views import variants
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch) -> dict:
+    state: dict = {}
+    monkeypatch.setattr(components.st, "session_state", state)
+    return state
+
+
+def test_paginate_resets_page_when_signature_changes(session: dict) -> None:
+    page = paginate(95, "items", signature="a")
+    assert (page.number, page.count, page.start, page.stop, page.size) == (0, 10, 0, 10, 10)
+
+    session["items_page"] = 3
+    page = paginate(95, "items", signature="a")
+    assert (page.number, page.start, page.stop) == (3, 30, 40)
+
+    page = paginate(95, "items", signature="b")
+    assert (page.number, page.start, page.stop) == (0, 0, 10)
+    assert session["items_page"] == 0
+
+
+def test_paginate_clamps_when_total_shrinks(session: dict) -> None:
+    session["items_page_size"] = 25
+    session["items_page"] = 3
+    page = paginate(120, "items")
+    assert (page.number, page.count, page.start, page.stop) == (3, 5, 75, 100)
+
+    page = paginate(60, "items")
+    assert (page.number, page.count, page.start, page.stop) == (2, 3, 50, 60)
+    assert session["items_page"] == 2
+
+    session["items_page"] = -1
+    assert paginate(60, "items").number == 0
+
+
+def test_paginate_empty_result(session: dict) -> None:
+    session["items_page"] = 4
+    page = paginate(0, "items")
+    assert (page.number, page.count, page.start, page.stop) == (0, 1, 0, 0)
+
+
+def test_requested_page_end_covers_prefetched_pages(session: dict) -> None:
+    assert requested_page_end("items") == 20
+    session["items_page_size"] = 25
+    session["items_page"] = 2
+    assert requested_page_end("items") == 100
+    assert requested_page_end("items", ahead=0) == 75
+
+
+def test_ranked_matches_reuse_prefetched_page(session: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    catalog = build_variant_catalog(load_app_data().variants)
+    context = SelectionContext(None, None, [], {}, None, None, [], None, None, [], [], True)
+    calls = []
+    original = variants.rank_variants
+
+    def counted(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(variants, "rank_variants", counted)
+
+    def ranked(signature: object = "a"):
+        return variants._ranked_matches(
+            catalog, context, strict=False, global_mask=catalog.index.all_rows, signature=signature
+        )
+
+    first = ranked()
+    assert calls[-1]["top_k"] == variants.TOP_MATCHES + 20
+    # «Вперёд →»: вторая страница уже посчитана.
+    session[f"{variants.MATCHES_PAGE_KEY}_page"] = 1
+    assert ranked() is first
+    assert len(calls) == 1
+    # Третья страница за пределами запаса — ранжирование с запасом ещё на одну.
+    session[f"{variants.MATCHES_PAGE_KEY}_page"] = 2
+    assert ranked().rows[: len(first.rows)] == first.rows
+    assert calls[-1]["top_k"] == variants.TOP_MATCHES + 40
+    # Смена выбора — всегда заново.
+    ranked("b")
+    assert len(calls) == 3
+
+
+def _pagination_app() -> None:
+    from money_map.ui import components
+
+    page = components.paginate(35, "demo", signature="fixed")
+    components.render_pagination(page, "demo")
+
+
+def test_render_pagination_buttons() -> None:
+    at = AppTest.from_function(_pagination_app)
+    at.run()
+    assert at.caption[0].value == "Страница 1 из 4"
+    assert at.button(key="demo-page-prev").disabled
+
+    at.button(key="demo-page-next").click().run()
+    at.button(key="demo-page-next").click().run()
+    at.button(key="demo-page-next").click().run()
+    assert at.caption[0].value == "Страница 4 из 4"
+    assert at.button(key="demo-page-next").disabled
+
+    at.selectbox(key="demo_page_size").set_value(25).run()
+    assert at.caption[0].value == "Страница 1 из 2"
+    assert not at.exception
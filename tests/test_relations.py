@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from money_map.core.load import load_app_data
+from money_map.core.relations import build_bridge_relations
+from money_map.core.variant_index import iter_rows
+
+
+def test_bridge_relations_match_direct_scans() -> None:
+    data = load_app_data()
+    relations = build_bridge_relations(data)
+
+    for bridge in data.bridges:
+        assert relations.bridge(data, bridge.id) == bridge
+        assert bridge in relations.transition_bridges(data, bridge.from_cell, bridge.to_cell)
+        assert bridge in [data.bridges[row] for row in relations.bridges_by_cell[bridge.to_cell]]
+
+        ways = {
+            item.id: item
+            for item in data.taxonomy
+            if bridge.from_cell in item.typical_cells or bridge.to_cell in item.typical_cells
+        }
+        assert relations.bridge_ways(data, bridge.id) == sorted(ways.values(), key=lambda item: item.name)
+
+        routes = [
+            path
+            for path in data.paths
+            if bridge.from_cell in path.sequence
+            and bridge.to_cell in path.sequence
+            and path.sequence.index(bridge.from_cell) < path.sequence.index(bridge.to_cell)
+        ]
+        assert relations.bridge_routes(data, bridge.id) == sorted(routes, key=lambda item: item.name)
+
+        variants = [variant for variant in data.variants if bridge.id in variant.bridge_ids]
+        rows = iter_rows(relations.variants_by_bridge.get(bridge.id, 0))
+        assert [data.variants[row] for row in rows] == variants
+
+        expected = [
+            variant
+            for variant in data.variants
+            if bridge.from_cell in variant.matrix_cells
+            and bridge.to_cell in variant.matrix_cells
+            and bridge.from_cell != bridge.to_cell
+        ]
+        rows = iter_rows(relations.transition_variants(bridge.from_cell, bridge.to_cell))
+        assert [data.variants[row] for row in rows] == expected
+
+    for path in data.paths:
+        assert len(relations.transitions_by_route[path.id]) == len(path.sequence) - 1
+
+    assert relations.bridge(data, "missing") is None
+    assert relations.transition_bridges(data, "A1", "missing") == []
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from money_map.core.load import load_app_data
+from money_map.core.relations import build_bridge_relations
+from money_map.core.variant_index import build_variant_index
+from money_map.core.variant_store import build_variant_store
+from money_map.ui.logic.route_catalog import build_route_catalog
+
+
+def _catalog():
+    data = load_app_data()
+    index = build_variant_index(build_variant_store(data.variants))
+    return data, build_route_catalog(data, build_bridge_relations(data), index)
+
+
+def test_route_views_match_paths() -> None:
+    data, catalog = _catalog()
+    assert [route.route_id for route in catalog.routes] == [path.id for path in data.paths]
+
+    for path in data.paths:
+        route = catalog.route(path.id)
+        assert route is not None
+        assert list(route.cells) == path.sequence
+        assert list(route.transitions) == [f"{a}->{b}" for a, b in zip(path.sequence, path.sequence[1:])]
+        for transition in route.transitions:
+            start, end = transition.split("->")
+            bridges = sorted(
+                (bridge for bridge in data.bridges if (bridge.from_cell, bridge.to_cell) == (start, end)),
+                key=lambda item: item.name,
+            )
+            assert route.recommended_bridges_by_transition[transition] == tuple(bridge.id for bridge in bridges)
+        expected = [
+            variant
+            for variant in data.variants
+            if path.sequence[0] in variant.matrix_cells and path.sequence[-1] in variant.matrix_cells
+        ]
+        assert route.variants == len(expected)
+        assert len(route.step_variant_masks) == len(route.transitions)
+
+    assert catalog.route("missing") is None
+    assert catalog.route(None) is None
+
+
+def test_route_filter_matches_direct_scan() -> None:
+    data, catalog = _catalog()
+    cells = sorted({cell_id for path in data.paths for cell_id in path.sequence})
+
+    assert catalog.filter() == list(catalog.routes)
+    for start in [None, *cells]:
+        for target in [None, *cells]:
+            for allowed in (None, {cells[0]}, set(cells[1:3])):
+                expected = [
+                    route
+                    for route in catalog.routes
+                    if (not start or route.cells[0] == start)
+                    and (not target or route.cells[-1] == target)
+                    and (allowed is None or any(cell_id in allowed for cell_id in route.cells))
+                ]
+                assert catalog.filter(start_cell=start, target_cell=target, allowed_cells=allowed) == expected
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from money_map.core.load import load_app_data
+from money_map.core.route_planner import CRITERIA, build_route_planner, normalize_weights
+
+
+def _all_routes(planner, start: str, end: str) -> list[tuple[float, ...]]:
+    found = []
+
+    def walk(cell_id: str, visited: tuple[str, ...], costs: tuple[float, ...]) -> None:
+        if cell_id == end:
+            found.append(costs)
+            return
+        for step in planner.steps_from.get(cell_id, []):
+            if step.to_cell not in visited:
+                walk(step.to_cell, visited + (step.to_cell,), tuple(a + b for a, b in zip(costs, step.costs)))
+
+    walk(start, (start,), tuple(0.0 for _ in CRITERIA))
+    return found
+
+
+def test_best_route_is_optimal_for_weights() -> None:
+    planner = build_route_planner(load_app_data())
+    for weights in (None, {"risk": 3.0}, {"effort": 0.0, "hops": 1.0}):
+        vector = normalize_weights(weights)
+        route = planner.best_route("A1", "A4", weights)
+        assert route is not None
+        assert route.cells[0] == "A1" and route.cells[-1] == "A4"
+        best = min(sum(c * w for c, w in zip(costs, vector)) for costs in _all_routes(planner, "A1", "A4"))
+        assert route.score == pytest.approx(best)
+
+
+def test_pareto_front_is_non_dominated() -> None:
+    planner = build_route_planner(load_app_data())
+    front = planner.pareto_routes("A1", "A4")
+    costs = _all_routes(planner, "A1", "A4")
+    expected = {
+        item
+        for item in costs
+        if not any(other != item and all(a <= b for a, b in zip(other, item)) for other in costs)
+    }
+    assert {route.costs for route in front} == expected
+    assert [route.score for route in front] == sorted(route.score for route in front)
+
+
+def test_route_planner_edge_cases() -> None:
+    planner = build_route_planner(load_app_data())
+    assert planner.best_route("P4", "A1") is None
+    assert planner.pareto_routes("P4", "A1") == []
+    with pytest.raises(ValueError):
+        planner.best_route("A1", "A4", {"speed": 1.0})
+
+
+def test_route_planner_cache_is_shared_between_threads() -> None:
+    data = load_app_data()
+    planner = build_route_planner(data, cache_size=4)
+    cells = [cell.id for cell in data.cells]
+    expected = {(start, end): planner.best_route(start, end) for start in cells for end in cells}
+
+    def plan(offset: int) -> bool:
+        return all(
+            planner.best_route(start, end) == expected[(start, end)]
+            for start in cells[offset:] + cells[:offset]
+            for end in cells
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(plan, range(16)))
+    assert len(planner._cache) <= 4
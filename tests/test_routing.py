@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections import deque
+
+import pytest
+
+from money_map.core import routing
+from money_map.core.graph import outgoing_bridges, shortest_path
+from money_map.core.cell_stats import build_cell_aggregates
+from money_map.core.load import load_app_data
+from money_map.core.model import BridgeItem
+from money_map.core.relations import build_bridge_relations
+from money_map.core.routing import alternative_routes, bridges_for_transition, build_routing_table, routing_table
+
+
+def _all_simple_paths(start: str, successors: dict[str, list[str]], limit: int) -> dict[str, list[list[str]]]:
+    found: dict[str, list[list[str]]] = {start: [[start]]}
+    queue = deque([[start]])
+    while queue:
+        path = queue.popleft()
+        for neighbor in successors.get(path[-1], []):
+            if neighbor not in path:
+                routes = found.setdefault(neighbor, [])
+                if len(routes) < limit:
+                    routes.append(path + [neighbor])
+                queue.append(path + [neighbor])
+    return found
+
+
+def test_routing_table_is_built_at_load() -> None:
+    data = load_app_data()
+    assert data.routing.cells[: len(data.cells)] == [cell.id for cell in data.cells]
+    assert shortest_path(data, "A1", "A4") == ["A1", "A2", "A4"]
+    assert shortest_path(data, "A1", "A1") == ["A1"]
+    assert shortest_path(data, "P4", "A1") == []
+
+
+def test_routing_alternatives_are_ordered_simple_paths() -> None:
+    data = load_app_data()
+    routes = alternative_routes(data, "A1", "A4")
+    assert routes[0] == shortest_path(data, "A1", "A4")
+    assert [len(route) for route in routes] == sorted(len(route) for route in routes)
+    assert all(len(set(route)) == len(route) for route in routes)
+
+
+def test_routing_bridge_lists_match_scan() -> None:
+    data = load_app_data()
+    assert outgoing_bridges(data, "A1") == [bridge for bridge in data.bridges if bridge.from_cell == "A1"]
+    assert bridges_for_transition(data, "A1", "A2") == [
+        bridge for bridge in data.bridges if bridge.from_cell == "A1" and bridge.to_cell == "A2"
+    ]
+
+
+def test_routing_table_without_bridges() -> None:
+    data = load_app_data()
+    table = build_routing_table(data.cells, [])
+    assert table.shortest_paths["A1->A1"] == ["A1"]
+    assert "A1->A2" not in table.shortest_paths
+
+
+def test_routing_table_follows_copied_bridges() -> None:
+    data = load_app_data()
+    copied = data.model_copy(update={"bridges": data.bridges[1:]})
+    assert routing_table(data) is data.routing
+    assert routing_table(copied) is not copied.routing
+
+    for start, end in {(bridge.from_cell, bridge.to_cell) for bridge in data.bridges}:
+        assert bridges_for_transition(copied, start, end) == [
+            bridge for bridge in copied.bridges if (bridge.from_cell, bridge.to_cell) == (start, end)
+        ]
+    assert outgoing_bridges(copied, "A1") == [bridge for bridge in copied.bridges if bridge.from_cell == "A1"]
+
+    relations = build_bridge_relations(copied)
+    last = copied.bridges[-1]
+    assert last in relations.transition_bridges(copied, last.from_cell, last.to_cell)
+    aggregates = build_cell_aggregates(copied, relations)
+    assert sum(len(stats.outgoing_bridges) for stats in aggregates.cells.values()) == len(copied.bridges)
+
+
+def _bridge(bridge_id: str, start: str, end: str, template: BridgeItem) -> BridgeItem:
+    return template.model_copy(update={"id": bridge_id, "from_cell": start, "to_cell": end})
+
+
+def test_pruned_search_matches_full_enumeration() -> None:
+    data = load_app_data()
+    template = data.bridges[0]
+    # Хаб B набирает лимит маршрутов через C раньше, чем появляется путь S-P-Q-R-B-C.
+    edges = ["S-C", "C-X", "C-Y", "C-Z", "X-B", "Y-B", "Z-B", "S-P", "P-Q", "Q-R", "R-B", "B-C"]
+    synthetic = [_bridge(f"b{index}", *edge.split("-"), template) for index, edge in enumerate(edges)]
+
+    for cells, bridges in ((data.cells, data.bridges), ([], synthetic)):
+        table = build_routing_table(cells, bridges)
+        successors: dict[str, list[str]] = {}
+        for bridge in bridges:
+            targets = successors.setdefault(bridge.from_cell, [])
+            if bridge.to_cell not in targets:
+                targets.append(bridge.to_cell)
+        for start in table.cells:
+            for end, routes in _all_simple_paths(start, successors, routing.ROUTE_ALTERNATIVES).items():
+                assert table.alternative_paths[f"{start}->{end}"] == routes
+
+    table = build_routing_table([], synthetic)
+    assert table.alternative_paths["S->C"] == [["S", "C"], ["S", "P", "Q", "R", "B", "C"]]
+
+
+def test_routing_table_checks_source_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    data = load_app_data()
+    copied = data.model_copy(update={"bridges": data.bridges[1:]})
+    calls = []
+    original = routing.routing_source
+    monkeypatch.setattr(routing, "routing_source", lambda *args: calls.append(1) or original(*args))
+
+    for _ in range(3):
+        assert routing_table(data) is data.routing
+        rebuilt = routing_table(copied)
+    assert routing_table(copied) is rebuilt
+    # Две проверки и source пересобранной таблицы.
+    assert len(calls) == 3
+
+    copied.bridges = data.bridges
+    assert routing_table(copied) is copied.routing
+    assert len(calls) == 4
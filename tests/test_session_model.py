@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from money_map.core.load import load_app_data
+from money_map.ui.logic.session_model import SHORTLIST_LIMIT, SessionModel, deep_sizeof, measure_state
+from money_map.ui.views.compare import resolve_compare_item
+
+
+def test_session_model_keeps_only_ids() -> None:
+    model = SessionModel()
+    assert model.add_compare("way", "w1")
+    assert not model.add_compare("way", "w1")
+    assert not model.add_compare("", "w2")
+    model.add_compare("bridge", "b1")
+    model.remove_compare("way", "w1")
+    assert model.compare == [("bridge", "b1")]
+
+    for index in range(SHORTLIST_LIMIT):
+        assert model.add_to_shortlist(f"v{index}")
+    assert not model.add_to_shortlist("extra")
+    model.set_shortlist_status("v0", "finalist")
+    model.set_shortlist_status("v1", "unknown")
+    assert model.shortlist["v0"] == "finalist"
+    assert model.shortlist["v1"] == "candidate"
+    assert not hasattr(model, "__dict__")
+
+
+def test_compare_items_resolve_from_app_data() -> None:
+    data = load_app_data()
+    bridge = data.bridges[0]
+    entry = resolve_compare_item(data, "bridge", bridge.id)
+    assert entry is not None
+    assert entry.name == bridge.name
+    assert entry.transition == f"{bridge.from_cell}->{bridge.to_cell}"
+    variant = data.variants[0]
+    entry = resolve_compare_item(data, "variant", variant.id)
+    assert entry is not None
+    assert entry.name == variant.title
+    assert resolve_compare_item(data, "variant", "missing") is None
+
+
+def test_measure_state_skips_shared_objects() -> None:
+    shared = list(range(1000))
+    state = {"ids": ["a", "b"], "data": shared, "nested": {"rows": shared}}
+    size = measure_state(state.items(), shared=(shared,))
+    by_key = dict(size.by_key)
+    assert by_key["data"] == 0
+    assert by_key["ids"] == deep_sizeof(["a", "b"])
+    assert size.by_key[0][0] in ("ids", "nested")
+    assert size.total == sum(by_key.values())
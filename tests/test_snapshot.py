@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from money_map.core import snapshot
+from money_map.core.graph_model import build_base_graph, filter_graph
+from money_map.core.load import load_app_data
+from money_map.core.snapshot import (
+    data_fingerprint,
+    graph_layout_artifact_name,
+    load_artifact,
+    save_artifact,
+    snapshot_graph_model,
+)
+
+
+def test_snapshot_graph_model_roundtrip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path))
+    data = load_app_data()
+    version = data_fingerprint()
+
+    built = snapshot_graph_model(data, version)
+    stored = load_artifact(version, "graph_model")
+
+    assert stored is not None
+    assert stored.edges == built.edges
+    assert data_fingerprint() == version
+
+
+def test_snapshot_key_tracks_code_and_artifact_format(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path))
+    version = data_fingerprint()
+    assert save_artifact(version, "graph_model", {"built": "old"})
+
+    monkeypatch.setattr(snapshot, "code_version", lambda: "9.9.9")
+    assert data_fingerprint() != version
+
+    monkeypatch.setitem(snapshot.ARTIFACT_FORMATS, "graph_model", snapshot.ARTIFACT_FORMATS["graph_model"] + 1)
+    assert load_artifact(version, "graph_model") is None
+    monkeypatch.undo()
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setitem(snapshot.ARTIFACT_FORMATS, "graph_layout", snapshot.ARTIFACT_FORMATS["graph_layout"] + 1)
+    assert data_fingerprint() != version
+
+
+def test_cache_root_defaults_to_user_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("MONEY_MAP_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert snapshot.snapshot_dir("abc") == tmp_path / "money-map" / "snapshots" / "abc"
+
+    monkeypatch.setenv("MONEY_MAP_CACHE_DIR", str(tmp_path / "override"))
+    assert snapshot.snapshot_dir("abc") == tmp_path / "override" / "abc"
+
+
+def test_layout_name_separates_all_types_from_none() -> None:
+    names = {
+        graph_layout_artifact_name(),
+        graph_layout_artifact_name(node_types=[]),
+        graph_layout_artifact_name(edge_types=[]),
+        graph_layout_artifact_name(node_types=[], edge_types=[]),
+        graph_layout_artifact_name(node_types=["cell"]),
+    }
+    assert len(names) == 5
+    assert graph_layout_artifact_name(["cell", "bridge"], None) == graph_layout_artifact_name(["bridge", "cell"])
+
+
+def test_filter_graph_keeps_only_allowed_types() -> None:
+    model = build_base_graph(load_app_data())
+    view = filter_graph(model, node_types=["cell", "bridge"], edge_types=["bridge_for_transition"])
+
+    assert set(view.nodes_by_type) == {"cell", "bridge"}
+    assert set(view.edges_by_type) == {"bridge_for_transition"}
+    assert all(edge.source in view.nodes_by_id for edge in view.edges)
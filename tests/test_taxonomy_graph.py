@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from money_map.core.load import load_app_data
 from money_map.core.taxonomy_graph import build_taxonomy_star
+from money_map.render.taxonomy_graph import apply_taxonomy_selection
 
 
 def test_taxonomy_star_graph_basic() -> None:
@@ -34,3 +35,18 @@ def test_taxonomy_star_graph_with_tags() -> None:
         and graph.nodes[target].get("kind") == "tag"
     ]
     assert tag_edges
+
+
+def test_taxonomy_selection_overlay() -> None:
+    data = load_app_data()
+    graph = build_taxonomy_star(data, include_tags=False, outside_only=False)
+    base_html = "<html><body><div id=\"mynetwork\"></div></body></html>"
+    selected_id = data.taxonomy[0].id
+
+    html = apply_taxonomy_selection(base_html, graph, selected_id)
+
+    assert html.startswith(base_html[: base_html.rfind("</body>")])
+    assert html.endswith("</body></html>")
+    assert f'"id": "tax:{selected_id}"' in html
+    assert apply_taxonomy_selection(base_html, graph, None) == base_html
+    assert apply_taxonomy_selection(base_html, graph, "missing") == base_html
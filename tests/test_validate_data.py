@@ -1,8 +1,147 @@
+from concurrent.futures import Future
+
+import pytest
+
+from money_map.core import validate
 from money_map.core.load import load_app_data
-from money_map.core.validate import validate_app_data
+from money_map.core.validate import (
+    RULES,
+    ValidationState,
+    ValidationSummary,
+    iter_findings,
+    limit_findings,
+    validate_app_data,
+)
 
 
 def test_validate_data_ok() -> None:
     data = load_app_data()
     errors = validate_app_data(data)
     assert errors == []
+
+
+def _broken_data():
+    data = load_app_data()
+    variants = []
+    for idx, variant in enumerate(data.variants[:120]):
+        update = {}
+        if idx % 7 == 0:
+            update["sell_tags"] = [*variant.sell_tags, "unknown_sell"]
+        if idx % 11 == 0:
+            update["risk_level"] = "unknown_risk"
+        if idx % 13 == 0:
+            update["matrix_cells"] = ["Z9", *variant.matrix_cells]
+        variants.append(variant.model_copy(update=update))
+    profiles = [*data.activity_profiles, data.activity_profiles[0]]
+    return data.model_copy(update={"variants": variants, "activity_profiles": profiles})
+
+
+def test_validate_findings_are_structured() -> None:
+    data = _broken_data()
+    findings = list(iter_findings(data))
+    rule_ids = {rule.id for rule in RULES}
+
+    assert [finding.message for finding in findings] == validate_app_data(data)
+    assert {finding.rule_id for finding in findings} >= {"variant.tags", "variant.axes", "variant.cells"}
+    assert all(finding.rule_id in rule_ids for finding in findings)
+    assert all(finding.entity.startswith("variant:") for finding in findings if finding.rule_id == "variant.tags")
+    duplicates = [finding for finding in findings if finding.rule_id == "profiles.unique"]
+    assert duplicates and data.activity_profiles[0].id in duplicates[0].message
+
+
+def test_validate_parallel_matches_sequential() -> None:
+    data = _broken_data()
+    sequential = list(iter_findings(data, workers=1))
+    parallel = list(iter_findings(data, workers=2, chunk_size=17))
+    assert parallel == sequential
+
+
+def test_incremental_validation_rechecks_only_changed() -> None:
+    data = _broken_data()
+    state = ValidationState()
+    assert validate_app_data(data, state=state) == validate_app_data(data)
+
+    reloaded = data.model_copy(update={"variants": [variant.model_copy() for variant in data.variants]})
+    assert validate_app_data(reloaded, state=state) == validate_app_data(reloaded)
+    assert state.rechecked == 0
+    # Состояние держит сущности последней загрузки, а не первой.
+    assert state.entities["variant"][data.variants[0].id] is reloaded.variants[0]
+
+    variants = list(reloaded.variants)
+    variants[1] = variants[1].model_copy(update={"value_tags": ["unknown_value"]})
+    del variants[2]
+    edited = reloaded.model_copy(update={"variants": variants})
+    assert validate_app_data(edited, state=state) == validate_app_data(edited)
+    assert state.rechecked == 1
+    assert variants[1].id in state.findings["variant"]
+    assert data.variants[2].id not in state.entities["variant"]
+
+    # Новый справочник тегов инвалидирует правила, которые от него зависят.
+    value_measures = {**edited.mappings.value_measures, "unknown_value": "x"}
+    remapped = edited.model_copy(
+        update={"mappings": edited.mappings.model_copy(update={"value_measures": value_measures})}
+    )
+    errors = validate_app_data(remapped, state=state)
+    assert errors == validate_app_data(remapped)
+    assert not any("unknown_value" in error for error in errors)
+
+    # Один удалён и один добавлен при том же числе: удалённый не остаётся ни в сущностях, ни в находках.
+    removed = remapped.variants[0]
+    assert removed.id in state.findings["variant"]
+    swapped = [*remapped.variants[1:], remapped.variants[1].model_copy(update={"id": "variant-added"})]
+    swapped_data = remapped.model_copy(update={"variants": swapped})
+    assert validate_app_data(swapped_data, state=state) == validate_app_data(swapped_data)
+    assert removed.id not in state.entities["variant"]
+    assert removed.id not in state.findings["variant"]
+    assert set(state.entities["variant"]) == {variant.id for variant in swapped}
+
+
+def test_limit_findings_counts_and_stops_early() -> None:
+    data = _broken_data()
+    findings = list(iter_findings(data))
+
+    full = ValidationSummary()
+    assert list(limit_findings(iter_findings(data), full)) == findings
+    assert full.total == len(findings) and not full.truncated
+    assert sum(full.counts.values()) == full.total
+
+    limited = ValidationSummary()
+    source = iter_findings(data, workers=2, chunk_size=17)
+    assert list(limit_findings(source, limited, max_errors=3)) == findings[:3]
+    assert limited.total == 3 and limited.truncated
+    # Источник закрыт сразу, пул процессов не доделывает оставшиеся куски.
+    assert source.gi_frame is None
+
+
+class _InlineExecutor:
+    # Выполняет куски в том же процессе и следит, сколько отправлено, но ещё не забрано.
+    pending = 0
+    max_pending = 0
+
+    def __init__(self, max_workers, mp_context, initializer, initargs) -> None:
+        initializer(*initargs)
+
+    def submit(self, fn, *args):
+        owner = type(self)
+        owner.pending += 1
+        owner.max_pending = max(owner.max_pending, owner.pending)
+        future = _TakenFuture()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait: bool, cancel_futures: bool) -> None:
+        pass
+
+
+class _TakenFuture(Future):
+    def result(self, timeout=None):
+        _InlineExecutor.pending -= 1
+        return super().result(timeout)
+
+
+def test_parallel_validation_keeps_bounded_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(validate, "ProcessPoolExecutor", _InlineExecutor)
+    data = _broken_data()
+    findings = list(iter_findings(data, workers=2, chunk_size=1))
+    assert findings == list(iter_findings(data, workers=1))
+    assert _InlineExecutor.max_pending <= 2 * 2
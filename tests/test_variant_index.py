@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+
+from money_map.core.load import load_app_data
+from money_map.core.variant_index import build_variant_index, iter_rows, mask_from_rows
+from money_map.core.variant_store import build_variant_store
+from money_map.ui.logic.variants_filter import (
+    build_variant_catalog,
+    candidate_mask,
+    match_score,
+    normalize_variant,
+)
+
+
+def test_mask_roundtrip() -> None:
+    rows = [0, 3, 7, 8, 64, 129]
+    assert list(iter_rows(mask_from_rows(rows, 130))) == rows
+    assert list(iter_rows(0)) == []
+
+
+def test_variant_index_matches_scan() -> None:
+    variants = load_app_data().variants
+    index = build_variant_index(build_variant_store(variants))
+    sample = variants[0]
+
+    assert index.rows(index.bitmap("risk_level", sample.risk_level)) == [
+        row for row, variant in enumerate(variants) if variant.risk_level == sample.risk_level
+    ]
+    tags = sample.sell_tags[:2]
+    assert index.rows(index.any_of("sell_tags", tags)) == [
+        row for row, variant in enumerate(variants) if set(tags) & set(variant.sell_tags)
+    ]
+    assert index.equals(risk_level="all", activity="all") == index.all_rows
+    assert index.bitmap("profile_id", "missing") == 0
+
+
+def _random_selection(rng: random.Random, variants) -> dict:
+    sample = rng.choice(variants)
+
+    def pick(values: list[str]) -> list[str]:
+        return list(values[:1]) if values and rng.random() < 0.5 else []
+
+    return {
+        "selected_mechanism_ids": [sample.primary_way_id] if rng.random() < 0.5 else [],
+        "selected_matrix_cell": sample.matrix_cells[0] if sample.matrix_cells and rng.random() < 0.5 else None,
+        "selected_classifiers": {
+            "sell": pick(sample.sell_tags),
+            "to_whom": pick(sample.to_whom_tags),
+            "measure": pick(sample.value_tags),
+        },
+        "selected_route_cells": list(sample.matrix_cells) if rng.random() < 0.3 else None,
+        "selected_bridge_ids": pick(sample.bridge_ids),
+        "selected_profile_id": sample.profile_id if rng.random() < 0.5 else None,
+        "selected_subprofile_id": sample.subprofile_id if rng.random() < 0.3 else None,
+        "selected_work_formats": pick(sample.work_format_ids),
+        "selected_entry_levels": pick(sample.entry_level_ids),
+        "include_untagged": rng.random() < 0.5,
+    }
+
+
+def test_candidate_mask_agrees_with_match_score() -> None:
+    variants = load_app_data().variants
+    index = build_variant_index(build_variant_store(variants))
+    normalized = [normalize_variant(variant) for variant in variants]
+    rng = random.Random(7)
+
+    for _ in range(200):
+        selection = _random_selection(rng, variants)
+        for strict in (True, False):
+            accepted = {
+                row
+                for row, variant in enumerate(normalized)
+                if match_score(variant, **selection, strict=strict) is not None
+            }
+            candidates = set(iter_rows(candidate_mask(index, **selection, strict=strict)))
+            if strict:
+                assert candidates == accepted
+            else:
+                assert candidates >= accepted
+
+
+def test_variant_catalog_rows_align_with_index() -> None:
+    variants = load_app_data().variants
+    catalog = build_variant_catalog(variants)
+
+    assert [variant.id for variant in catalog.variants] == [variant.id for variant in variants]
+    assert catalog.by_id[variants[0].id] is catalog.variants[0]
+    assert not hasattr(catalog.variants[0], "__dict__")
+    sample = variants[0]
+    rows = catalog.index.rows(catalog.index.bitmap("primary_way_id", sample.primary_way_id))
+    assert {catalog.variants[row].mechanism_id for row in rows} == {sample.primary_way_id}
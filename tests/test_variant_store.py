@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from money_map.core.load import load_app_data
+from money_map.core.variant_store import (
+    CATEGORICAL_FIELDS,
+    FLAG_FIELDS,
+    MULTI_VALUE_FIELDS,
+    TEXT_FIELDS,
+    build_variant_store,
+)
+
+
+def test_variant_store_roundtrips_fields() -> None:
+    variants = load_app_data().variants
+    store = build_variant_store(variants)
+
+    assert store.size == len(variants)
+    for row, variant in enumerate(variants):
+        assert store.row_of[variant.id] == row
+        for field in (*CATEGORICAL_FIELDS, *MULTI_VALUE_FIELDS, *TEXT_FIELDS, *FLAG_FIELDS):
+            assert store.value(field, row) == getattr(variant, field)
+
+
+def test_variant_store_filters_match_models() -> None:
+    variants = load_app_data().variants
+    store = build_variant_store(variants)
+    sample = variants[0]
+
+    rows = store.rows_equal("risk_level", sample.risk_level)
+    rows = store.rows_containing("matrix_cells", sample.matrix_cells[0], rows)
+    expected = [
+        row
+        for row, variant in enumerate(variants)
+        if variant.risk_level == sample.risk_level and sample.matrix_cells[0] in variant.matrix_cells
+    ]
+    assert rows == expected
+    assert store.rows_equal("profile_id", "missing_profile") == []
+    assert store.rows_containing("sell_tags", "missing_tag") == []
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from array import array
+
+from money_map.core.load import load_app_data
+from money_map.ui.logic.variants_filter import build_variant_catalog
+from money_map.ui.logic.variants_library import LibraryQuery, ResultSetCache, query_library_rows
+
+
+def _scan(catalog, query: LibraryQuery) -> list[str]:
+    rows = [
+        variant
+        for variant in catalog.variants
+        if query.mechanism in ("all", variant.mechanism_id)
+        and query.kind in ("all", variant.kind)
+        and (query.cell == "all" or query.cell in variant.matrix_cells)
+        and query.risk in ("all", variant.risk)
+        and (query.search in variant.title.lower() or query.search in variant.summary.lower())
+    ]
+    if query.sort == "coverage":
+        rows.sort(key=lambda item: (-catalog.coverage[catalog.row_of[item.id]], item.title))
+    else:
+        rows.sort(key=lambda item: item.title)
+    return [item.id for item in rows]
+
+
+def test_library_query_refines_previous_result() -> None:
+    catalog = build_variant_catalog(load_app_data().variants)
+    sample = catalog.variants[0]
+    search = sample.title.lower()[:2]
+    broad = LibraryQuery(version="v", search=search[:1], sort="coverage")
+    narrow = LibraryQuery(
+        version="v",
+        cell=sample.matrix_cells[0],
+        risk=sample.risk,
+        search=search,
+        sort="coverage",
+    )
+
+    assert narrow.narrows(broad)
+    assert not broad.narrows(narrow)
+    assert not LibraryQuery(version="v", sort="title").narrows(broad)
+
+    broad_rows = query_library_rows(catalog, broad)
+    refined = query_library_rows(catalog, narrow, (broad, broad_rows))
+    full = query_library_rows(catalog, narrow)
+    assert refined == full
+    assert [catalog.variants[row].id for row in full] == _scan(catalog, narrow)
+    assert [catalog.variants[row].id for row in broad_rows] == _scan(catalog, broad)
+
+    # Несовместимый прошлый результат игнорируется.
+    other = LibraryQuery(version="v", mechanism=sample.mechanism_id)
+    assert query_library_rows(catalog, other, (narrow, full)) == query_library_rows(catalog, other)
+
+
+def test_result_set_cache_evicts_lru_within_limits() -> None:
+    cache = ResultSetCache(max_entries=2, max_bytes=40)
+    cache.put("a", array("I", [1, 2]))
+    cache.put("b", array("I", [3]))
+    assert cache.get("a") is not None
+    cache.put("c", array("I", [4]))
+    assert cache.get("b") is None
+    assert len(cache) == 2 and cache.bytes == 12
+
+    cache.put("big", array("I", range(8)))
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.bytes == 36
+    cache.put("huge", array("I", range(20)))
+    assert cache.get("huge") is None
+    assert cache.hits == 2 and cache.misses == 3
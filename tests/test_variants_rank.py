@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import random
+
+from money_map.core.load import load_app_data
+from money_map.ui.logic.variants_filter import build_variant_catalog, match_score
+from money_map.ui.logic.variants_rank import SelectionContext, match_arguments, rank_variants
+
+
+def _random_context(rng: random.Random, variants) -> SelectionContext:
+    def pick(values: list[str]) -> list[str]:
+        if not values or rng.random() < 0.4:
+            return []
+        chosen = rng.sample(values, rng.randint(1, len(values)))
+        # Чужие значения и повторы тоже должны обрабатываться как в match_score.
+        if rng.random() < 0.3:
+            chosen.append(rng.choice(["unknown", chosen[0]]))
+        return chosen
+
+    sample = rng.choice(variants)
+    other = rng.choice(variants)
+    return SelectionContext(
+        selected_matrix_cell=rng.choice([None, *sample.matrix_cells, *other.matrix_cells]),
+        selected_transition=None,
+        selected_mechanism_ids=pick([sample.primary_way_id, other.primary_way_id]),
+        selected_classifiers={
+            "sell": pick([*sample.sell_tags, *other.sell_tags]),
+            "to_whom": pick([*sample.to_whom_tags, *other.to_whom_tags]),
+            "measure": pick([*sample.value_tags, *other.value_tags]),
+        },
+        selected_route_id=None,
+        selected_route_cells=rng.choice([None, [*sample.matrix_cells, *other.matrix_cells]]),
+        selected_bridge_ids=pick([*sample.bridge_ids, *other.bridge_ids]),
+        selected_profile_id=rng.choice([None, sample.profile_id, other.profile_id]),
+        selected_subprofile_id=rng.choice([None, None, sample.subprofile_id]),
+        selected_work_formats=pick([*sample.work_format_ids, *other.work_format_ids]),
+        selected_entry_levels=pick([*sample.entry_level_ids, *other.entry_level_ids]),
+        include_untagged=rng.random() < 0.7,
+    )
+
+
+def test_rank_variants_matches_match_score() -> None:
+    variants = load_app_data().variants
+    catalog = build_variant_catalog(variants)
+    rng = random.Random(11)
+
+    for _ in range(300):
+        context = _random_context(rng, variants)
+        strict = rng.random() < 0.5
+        arguments = match_arguments(context, strict)
+        expected = [
+            result
+            for variant in catalog.variants
+            if (result := match_score(variant, **arguments)) is not None
+        ]
+        expected.sort(key=lambda item: (-item.score, -item.data_coverage, item.variant.title))
+
+        ranked = rank_variants(catalog, context, strict=strict)
+        assert ranked.total == len(expected)
+        assert ranked.results() == expected
+        assert [ranked.scores[row] for row in ranked.rows] == [item.score for item in expected]
+
+        top = rank_variants(catalog, context, strict=strict, top_k=7)
+        assert top.total == len(expected)
+        assert [catalog.variants[row].id for row in top.rows] == [item.variant.id for item in expected[:7]]
+
+
+def test_rank_variants_respects_global_mask_and_lookup() -> None:
+    variants = load_app_data().variants
+    catalog = build_variant_catalog(variants)
+    context = _random_context(random.Random(3), variants)
+    context = SelectionContext(**{**context.__dict__, "include_untagged": True})
+    risk = variants[0].risk_level
+
+    ranked = rank_variants(
+        catalog,
+        context,
+        strict=False,
+        global_mask=catalog.index.bitmap("risk_level", risk),
+    )
+    assert all(catalog.variants[row].risk == risk for row in ranked.rows)
+    outside = next(variant for variant in variants if variant.risk_level != risk)
+    assert ranked.match(outside.id) is None
+    if ranked.rows:
+        first = catalog.variants[ranked.rows[0]]
+        assert ranked.match(first.id) == ranked.result(ranked.rows[0])